@@ -1,14 +1,22 @@
 import atexit
 import os
 import pickle
+import shutil
+import subprocess
 import tarfile
 import tempfile
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional, Union
 
 import docker
+from docker.utils.socket import STDOUT, next_frame_header, read_exactly
+from docker.utils.socket import read as socket_read
 import shortuuid
 
+from .env_cache import get_conda_env_cache
+from .scripts.model_worker import attach_arrays, read_frame, share_arrays, write_frame
 from .utils import install_environment, remove_enviroment, system_execute
 from ..config import C
 from ..learnware import Learnware
@@ -77,30 +85,279 @@ class ModelContainer(BaseModel):
         raise NotImplementedError("finetune method is not implemented!")
 
 
+class ModelWorker:
+    """A long-running process serving the calls of a model, see `scripts/model_worker.py`"""
+
+    def __init__(self, python_path: str, model_config: dict, share_min_bytes: Optional[int] = -1):
+        """
+        Parameters
+        ----------
+        python_path : str
+            The python executable of the model environment
+        model_config : dict
+            The model config, whose module_path is absolute
+        share_min_bytes : Optional[int], optional
+            The numpy arrays of at least share_min_bytes are exchanged by shared memory instead of pickles,
+            by default C.conda_model_worker_share_min_bytes. None means all the arrays are pickled
+
+        Raises
+        ------
+        Exception
+            The error of instantiating the model in the worker
+        """
+        self.share_min_bytes = C.conda_model_worker_share_min_bytes if share_min_bytes == -1 else share_min_bytes
+        self._lock = threading.Lock()
+        self._start(python_path)
+        try:
+            self.metadata = self._request(model_config)["metadata"]
+        except Exception:
+            self.close()
+            raise
+
+    def _start(self, python_path: str):
+        worker_script = os.path.join(C.package_path, "client", "scripts", "model_worker.py")
+        self.process = subprocess.Popen([python_path, worker_script], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.input_stream, self.output_stream = self.process.stdin, self.process.stdout
+
+    def _get_exit_code(self) -> Optional[int]:
+        """The exit code of the worker, None if it is running"""
+        return self.process.poll()
+
+    def _wait(self, timeout: float):
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def _close_streams(self):
+        for stream in (self.input_stream, self.output_stream):
+            stream.close()
+
+    def _request(self, message: dict) -> dict:
+        with self._lock:
+            exit_code = self._get_exit_code()
+            if exit_code is not None:
+                raise RuntimeError(f"The model worker exited with code {exit_code}")
+            try:
+                write_frame(self.input_stream, message)
+                response = read_frame(self.output_stream)
+            except (BrokenPipeError, EOFError) as err:
+                raise RuntimeError(f"The model worker exited unexpectedly due to {err}")
+        if response is None:
+            raise RuntimeError("The model worker exited unexpectedly")
+        if response["status"] != "success":
+            logger.warning(f"The model worker failed: {response.get('traceback', '')}")
+            raise response["error_info"]
+        return response
+
+    def call(self, method: str, **kargs):
+        blocks = []
+        try:
+            request = {
+                "method": method,
+                "kargs": share_arrays(kargs, self.share_min_bytes, blocks),
+                "share_min_bytes": self.share_min_bytes,
+            }
+            response = self._request(request)
+        finally:
+            # the blocks are unlinked by the worker, unless it fails before receiving them
+            for block in blocks:
+                block.close()
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    pass
+        return attach_arrays(response["result"], [], copy=True)
+
+    def close(self, timeout: float = 10):
+        if self._get_exit_code() is None:
+            try:
+                with self._lock:
+                    write_frame(self.input_stream, {"method": "close"})
+            except Exception:
+                pass
+            self._wait(timeout)
+        self._close_streams()
+
+
+class DockerExecStream:
+    """The stdin and the demultiplexed stdout of a docker exec, which are used as the streams of a model worker"""
+
+    def __init__(self, exec_socket):
+        self.exec_socket = exec_socket
+        # the socket of docker exec is wrapped by SocketIO on unix
+        self.raw_socket = getattr(exec_socket, "_sock", exec_socket)
+        self.frame_remaining = 0
+
+    def read(self, size: int) -> bytes:
+        while self.frame_remaining == 0:
+            stream, frame_size = next_frame_header(self.exec_socket)
+            if stream == -1:
+                return b""
+            if stream != STDOUT:
+                read_exactly(self.exec_socket, frame_size)
+                continue
+            self.frame_remaining = frame_size
+        data = socket_read(self.exec_socket, min(size, self.frame_remaining)) or b""
+        self.frame_remaining -= len(data)
+        return data
+
+    def write(self, data: bytes):
+        self.raw_socket.sendall(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.exec_socket.close()
+        self.raw_socket.close()
+
+
+class DockerModelWorker(ModelWorker):
+    """A long-running process in a docker container serving the calls of a model, whose frames are streamed over
+    the socket of docker exec"""
+
+    def __init__(self, docker_container, python_path: str, worker_script: str, model_config: dict):
+        """
+        Parameters
+        ----------
+        docker_container : docker.models.containers.Container
+            The docker container
+        python_path : str
+            The python executable of the model environment in the container
+        worker_script : str
+            The path of `scripts/model_worker.py` in the container
+        model_config : dict
+            The model config, whose module_path is the absolute path in the container
+        """
+        self.docker_container = docker_container
+        self.worker_script = worker_script
+        # the container does not share the memory of the host
+        super(DockerModelWorker, self).__init__(python_path, model_config, share_min_bytes=None)
+
+    def _start(self, python_path: str):
+        self.docker_api = self.docker_container.client.api
+        self.exec_id = self.docker_api.exec_create(
+            self.docker_container.id,
+            [python_path, self.worker_script],
+            stdin=True,
+            stdout=True,
+            stderr=False,
+            environment={"PYTHONDONTWRITEBYTECODE": "1"},
+        )["Id"]
+        self.input_stream = self.output_stream = DockerExecStream(self.docker_api.exec_start(self.exec_id, socket=True))
+
+    def _get_exit_code(self) -> Optional[int]:
+        exec_info = self.docker_api.exec_inspect(self.exec_id)
+        return None if exec_info["Running"] else exec_info["ExitCode"]
+
+    def _wait(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while self._get_exit_code() is None and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if self._get_exit_code() is None:
+            # the worker exits at the end of stdin when the socket is closed
+            logger.warning(f"The model worker in docker container {self.docker_container.id[:12]} is still running.")
+
+    def _close_streams(self):
+        self.input_stream.close()
+
+
 class ModelCondaContainer(ModelContainer):
-    def __init__(self, model_config: dict, learnware_dirpath: str, conda_env: Optional[str] = None, build: bool = True):
+    def __init__(
+        self,
+        model_config: dict,
+        learnware_dirpath: str,
+        conda_env: Optional[str] = None,
+        build: bool = True,
+        persistent_worker: Optional[bool] = None,
+        env_cache: Optional[bool] = None,
+    ):
+        """
+        Parameters
+        ----------
+        conda_env : Optional[str], optional
+            The name of the conda env, by default a new name, or the name of the cached env if env_cache is True
+        persistent_worker : Optional[bool], optional
+            Whether to keep the model in a long-running process of the conda env, which serves all the calls and
+            keeps the model state between them, by default C.conda_model_worker.
+            If False, each call runs the model in a new process by `conda run`
+        env_cache : Optional[bool], optional
+            Whether to reuse the conda env of the learnwares with equivalent dependencies, which is kept after
+            the container is removed, by default C.conda_env_cache. It is ignored if conda_env is given.
+            The shared env is changed by the learnwares modifying their envs, and it must only be used by one process
+        """
         self.conda_env = f"learnware_{shortuuid.uuid()}" if conda_env is None else conda_env
+        self.env_cache = (C.conda_env_cache if env_cache is None else env_cache) and conda_env is None
+        self.persistent_worker = C.conda_model_worker if persistent_worker is None else persistent_worker
+        self.model_worker = None
         super(ModelCondaContainer, self).__init__(model_config, learnware_dirpath, build)
 
+    def remove_env(self):
+        self._stop_model_worker()
+        super(ModelCondaContainer, self).remove_env()
+
+    def _get_model_config(self) -> dict:
+        model_config = self.model_config.copy()
+        model_config["module_path"] = Learnware.get_model_module_abspath(
+            self.learnware_dirpath, model_config["module_path"]
+        )
+        return model_config
+
+    def _get_env_python_path(self) -> str:
+        com_process = system_execute(
+            [
+                "conda",
+                "run",
+                "-n",
+                f"{self.conda_env}",
+                "python",
+                "-c",
+                "'import sys; print(sys.executable)'",
+            ],
+            stdout=subprocess.PIPE,
+        )
+        return com_process.stdout.decode().strip().splitlines()[-1]
+
+    def _start_model_worker(self):
+        self._stop_model_worker()
+        self.model_worker = ModelWorker(self._get_env_python_path(), self._get_model_config())
+        atexit.register(self._stop_model_worker)
+        logger.info(f"Model worker of conda env {self.conda_env} is started.")
+
+    def _stop_model_worker(self):
+        atexit.unregister(self._stop_model_worker)
+        model_worker, self.model_worker = self.model_worker, None
+        if model_worker is not None:
+            model_worker.close()
+
     def _init_env(self):
+        if self.env_cache:
+            self.conda_env = get_conda_env_cache().acquire(self.learnware_dirpath)
+            return
         install_environment(self.learnware_dirpath, self.conda_env)
         logger.info(f"Conda env {self.conda_env} is generated.")
 
     def _remove_env(self):
+        if self.env_cache:
+            get_conda_env_cache().release(self.conda_env)
+            return
         remove_enviroment(self.conda_env)
         logger.info(f"Conda env {self.conda_env} is removed.")
 
     def _setup_env_and_metadata(self):
+        if self.persistent_worker:
+            self._start_model_worker()
+            self.reset(**self.model_worker.metadata)
+            return
+
         with tempfile.TemporaryDirectory(prefix="learnware_") as tempdir:
             output_path = os.path.join(tempdir, "output.pkl")
             model_path = os.path.join(tempdir, "model.pkl")
 
-            model_config = self.model_config.copy()
-            model_config["module_path"] = Learnware.get_model_module_abspath(
-                self.learnware_dirpath, model_config["module_path"]
-            )
             with open(model_path, "wb") as model_fp:
-                pickle.dump(model_config, model_fp)
+                pickle.dump(self._get_model_config(), model_fp)
 
             system_execute(
                 [
@@ -129,18 +386,16 @@ class ModelCondaContainer(ModelContainer):
         self.reset(input_shape=input_shape, output_shape=output_shape)
 
     def _run_model_with_script(self, method, **kargs):
+        if self.model_worker is not None:
+            return self.model_worker.call(method, **kargs)
+
         with tempfile.TemporaryDirectory(prefix="learnware_") as tempdir:
             input_path = os.path.join(tempdir, "input.pkl")
             output_path = os.path.join(tempdir, "output.pkl")
             model_path = os.path.join(tempdir, "model.pkl")
 
-            model_config = self.model_config.copy()
-            model_config["module_path"] = Learnware.get_model_module_abspath(
-                self.learnware_dirpath, model_config["module_path"]
-            )
-
             with open(model_path, "wb") as model_fp:
-                pickle.dump(model_config, model_fp)
+                pickle.dump(self._get_model_config(), model_fp)
 
             with open(input_path, "wb") as input_fp:
                 pickle.dump({"method": method, "kargs": kargs}, input_fp)
@@ -188,6 +443,8 @@ class ModelDockerContainer(ModelContainer):
         learnware_dirpath: str,
         docker_container: object = None,
         build: bool = True,
+        exchange_dirpath: Optional[str] = None,
+        persistent_worker: Optional[bool] = None,
     ):
         """_summary_
 
@@ -195,9 +452,20 @@ class ModelDockerContainer(ModelContainer):
         ----------
         build : bool, optional
             Whether to build the docker env, by default True
+        exchange_dirpath : Optional[str], optional
+            The host folder mounted at EXCHANGE_MOUNT_PATH of docker_container, through which the learnware files are
+            placed in the container instead of tar archives. A new folder is created if the docker env is built by
+            a local docker daemon, the remote daemons cannot mount the host folders and receive tar archives
+        persistent_worker : Optional[bool], optional
+            Whether to keep the model in a long-running process of the container, whose calls are streamed over the
+            socket of docker exec, by default C.docker_model_worker. It requires the exchange folder
         """
 
         self.docker_container = docker_container
+        self.exchange_dirpath = exchange_dirpath
+        self.owns_exchange_dirpath = False
+        self.persistent_worker = C.docker_model_worker if persistent_worker is None else persistent_worker
+        self.model_worker = None
         self.conda_env = f"learnware_{shortuuid.uuid()}"
         self.docker_model_config = None
         self.docker_model_script_path = None
@@ -205,8 +473,16 @@ class ModelDockerContainer(ModelContainer):
         # call init method of parent of parent class
         super(ModelDockerContainer, self).__init__(model_config, learnware_dirpath, build)
 
+    EXCHANGE_MOUNT_PATH = "/learnware_exchange"
+
+    @staticmethod
+    def _is_local_docker_daemon() -> bool:
+        """Whether the docker daemon of `docker.from_env` runs on this host, so that it can mount the host folders"""
+        docker_host = os.environ.get("DOCKER_HOST", "")
+        return len(docker_host) == 0 or docker_host.startswith(("unix://", "npipe://"))
+
     @staticmethod
-    def _generate_docker_container():
+    def _generate_docker_container(exchange_dirpath: Optional[str] = None):
         client = docker.from_env()
         http_proxy = os.environ.get("http_proxy")
         https_proxy = os.environ.get("https_proxy")
@@ -220,6 +496,10 @@ class ModelDockerContainer(ModelContainer):
             "environment": {"http_proxy": http_proxy, "https_proxy": https_proxy},
             "pids_limit": -1,
         }
+        if exchange_dirpath is not None:
+            container_config["volumes"] = {
+                exchange_dirpath: {"bind": ModelDockerContainer.EXCHANGE_MOUNT_PATH, "mode": "rw"}
+            }
         container = client.containers.run(**container_config)
         logger.info(f"Docker container {container.id[:12]} is generated.")
 
@@ -297,6 +577,31 @@ class ModelDockerContainer(ModelContainer):
             with open(tar_file_path, "rb") as file_data:
                 self.docker_container.put_archive(directory_path, file_data.read())
 
+    def _share_with_container(self, local_path: str) -> str:
+        """Place a file or a folder in the container, by the mounted exchange folder if it exists
+
+        Returns
+        -------
+        str
+            The path in the container
+        """
+        container_path = self._change_path_to_container(local_path)
+        if self.exchange_dirpath is None:
+            self._copy_file_to_container(local_path, container_path)
+            return container_path
+
+        relative_path = os.path.relpath(container_path, "/tmp")
+        exchange_path = os.path.join(self.exchange_dirpath, relative_path)
+        os.makedirs(os.path.dirname(exchange_path), exist_ok=True)
+        if os.path.isdir(local_path):
+            shutil.copytree(local_path, exchange_path, dirs_exist_ok=True)
+        else:
+            # the shared files, e.g., the scripts, may be placed by several learnwares at the same time
+            temp_path = f"{exchange_path}.{shortuuid.uuid()}.tmp"
+            shutil.copyfile(local_path, temp_path)
+            os.replace(temp_path, exchange_path)
+        return f"{self.EXCHANGE_MOUNT_PATH}/{relative_path}"
+
     def _copy_file_from_container(self, container_path, local_path):
         try:
             data, stat = self.docker_container.get_archive(container_path)
@@ -324,15 +629,17 @@ class ModelDockerContainer(ModelContainer):
             Lack of the environment configuration file.
         """
         run_cmd_times = 10
-        self.learnware_dirpath_container = self._change_path_to_container(self.learnware_dirpath)
-        self._copy_file_to_container(self.learnware_dirpath, self.learnware_dirpath_container)
+        self.learnware_dirpath_container = self._share_with_container(self.learnware_dirpath)
 
         with tempfile.TemporaryDirectory(prefix="learnware_") as tempdir:
-            env_script_container_path = self._change_path_to_container(os.path.join(tempdir, "install_env.py"))
-            self._copy_file_to_container(self.env_script, env_script_container_path)
+            if self.exchange_dirpath is None:
+                env_script_container_path = self._change_path_to_container(os.path.join(tempdir, "install_env.py"))
+                self._copy_file_to_container(self.env_script, env_script_container_path)
+            else:
+                env_script_container_path = self._share_with_container(self.env_script)
 
             success_flag = False
-            logger.info("Install environment dependencies in docker.")
+            logger.info(f"Install environment dependencies of {self.learnware_dirpath_container} in docker.")
             for i in range(run_cmd_times):
                 result = self.docker_container.exec_run(
                     " ".join(
@@ -354,14 +661,55 @@ class ModelDockerContainer(ModelContainer):
                 if result.exit_code == 0:
                     success_flag = True
                     break
-                else:
-                    self.docker_container.exec_run("conda clean --all")
+                elif i + 1 < run_cmd_times:
+                    # the packages may be used by the concurrent installations, so only the index cache is cleaned
+                    self.docker_container.exec_run("conda clean --index-cache --yes")
+                    retry_delay = min(C.docker_setup_retry_delay * 2**i, 60)
+                    logger.warning(
+                        f"Install environment dependencies of {self.learnware_dirpath_container} in docker failed, "
+                        f"retry in {retry_delay} seconds ({i + 1}/{run_cmd_times})."
+                    )
+                    time.sleep(retry_delay)
             if not success_flag:
                 logger.error(f"Install environment dependencies in docker failed!\n{result.output.decode('utf-8')}")
+                raise RuntimeError(f"Install environment dependencies of {self.learnware_dirpath} in docker failed!")
+
+    def _get_docker_model_config(self) -> dict:
+        docker_model_config = self.model_config.copy()
+        docker_model_config["module_path"] = self.learnware_dirpath_container + "/" + docker_model_config["module_path"]
+        return docker_model_config
+
+    def _start_model_worker(self):
+        self._stop_model_worker()
+        result = self.docker_container.exec_run(
+            ["conda", "run", "-n", self.conda_env, "python", "-c", "import sys; print(sys.executable)"]
+        )
+        if result.exit_code != 0:
+            raise RuntimeError(f"Find the python of conda env {self.conda_env} in docker failed!")
+        python_path = result.output.decode("utf-8").strip().splitlines()[-1]
+        worker_script = self._share_with_container(os.path.join(C.package_path, "client", "scripts", "model_worker.py"))
+        self.model_worker = DockerModelWorker(
+            self.docker_container, python_path, worker_script, self._get_docker_model_config()
+        )
+        logger.info(f"Model worker of conda env {self.conda_env} in docker is started.")
+
+    def _stop_model_worker(self):
+        model_worker, self.model_worker = self.model_worker, None
+        if model_worker is not None:
+            model_worker.close()
+
+    def remove_env(self):
+        self._stop_model_worker()
+        super(ModelDockerContainer, self).remove_env()
 
     def _setup_env_and_metadata(self):
         """setup env and set the input and output shape by communicating with docker"""
         self._install_environment(self.conda_env)
+        if self.persistent_worker and self.exchange_dirpath is not None:
+            self._start_model_worker()
+            self.reset(**self.model_worker.metadata)
+            return
+
         with tempfile.TemporaryDirectory(prefix="learnware_") as tempdir:
             output_path = os.path.join(tempdir, "output.pkl")
             model_path = os.path.join(tempdir, "model.pkl")
@@ -370,10 +718,7 @@ class ModelDockerContainer(ModelContainer):
             output_path_container = self._change_path_to_container(output_path)
             model_path_container = self._change_path_to_container(model_path)
 
-            docker_model_config = self.model_config.copy()
-            docker_model_config["module_path"] = (
-                self.learnware_dirpath_container + "/" + docker_model_config["module_path"]
-            )
+            docker_model_config = self._get_docker_model_config()
 
             with open(model_path, "wb") as model_fp:
                 pickle.dump(docker_model_config, model_fp)
@@ -411,13 +756,21 @@ class ModelDockerContainer(ModelContainer):
 
     def _init_env(self):
         """create docker container according to the str"""
-        self.docker_container = ModelDockerContainer._generate_docker_container()
+        if self.exchange_dirpath is None and ModelDockerContainer._is_local_docker_daemon():
+            self.exchange_dirpath = tempfile.mkdtemp(prefix="learnware_exchange_")
+            self.owns_exchange_dirpath = True
+        self.docker_container = ModelDockerContainer._generate_docker_container(self.exchange_dirpath)
 
     def _remove_env(self):
         """remove the docker container"""
         ModelDockerContainer._destroy_docker_container(self.docker_container)
+        if self.owns_exchange_dirpath:
+            shutil.rmtree(self.exchange_dirpath, ignore_errors=True)
 
     def _run_model_with_script(self, method, **kargs):
+        if self.model_worker is not None:
+            return self.model_worker.call(method, **kargs)
+
         with tempfile.TemporaryDirectory(prefix="learnware_") as tempdir:
             input_path = os.path.join(tempdir, "input.pkl")
             output_path = os.path.join(tempdir, "output.pkl")
@@ -427,10 +780,7 @@ class ModelDockerContainer(ModelContainer):
             output_path_container = self._change_path_to_container(output_path)
             model_path_container = self._change_path_to_container(model_path)
 
-            docker_model_config = self.model_config.copy()
-            docker_model_config["module_path"] = (
-                self.learnware_dirpath_container + "/" + docker_model_config["module_path"]
-            )
+            docker_model_config = self._get_docker_model_config()
             with open(model_path, "wb") as model_fp:
                 pickle.dump(docker_model_config, model_fp)
 
@@ -514,8 +864,11 @@ class LearnwaresContainer:
 
     def _destroy_docker_container(self):
         try:
-            if self._docker_container is not None:
-                ModelDockerContainer._destroy_docker_container(self._docker_container)
+            while len(self._docker_containers) > 0:
+                ModelDockerContainer._destroy_docker_container(self._docker_containers[-1])
+                self._docker_containers.pop()
+            if self._exchange_dirpath is not None:
+                shutil.rmtree(self._exchange_dirpath, ignore_errors=True)
         except KeyboardInterrupt:
             logger.warning("The KeyboardInterrupt is ignored when removing the container env!")
             self._destroy_docker_container()
@@ -532,36 +885,48 @@ class LearnwaresContainer:
                 for _learnware in self.learnware_list
             ]
         else:
-            self._docker_container = None
+            self._docker_containers = []
+            self._exchange_dirpath = None
+            if ModelDockerContainer._is_local_docker_daemon():
+                self._exchange_dirpath = tempfile.mkdtemp(prefix="learnware_exchange_")
             atexit.register(self._destroy_docker_container)
-            self._docker_container = ModelDockerContainer._generate_docker_container()
+            # the learnwares are sharded across the containers, which mount the same exchange folder if it exists
+            container_num = max(min(C.docker_setup_containers, len(self.learnware_list)), 1)
+            with ThreadPoolExecutor(max_workers=container_num) as executor:
+                futures = [
+                    executor.submit(ModelDockerContainer._generate_docker_container, self._exchange_dirpath)
+                    for _ in range(container_num)
+                ]
+                for future in futures:
+                    try:
+                        self._docker_containers.append(future.result())
+                    except Exception as err:
+                        logger.warning(f"Generate docker container failed due to {err}")
+            if len(self._docker_containers) == 0:
+                raise RuntimeError("No docker container is generated for the learnwares!")
             self.learnware_containers = [
                 Learnware(
                     _learnware.id,
                     ModelDockerContainer(
-                        _learnware.get_model(), _learnware.get_dirpath(), self._docker_container, build=False
+                        _learnware.get_model(),
+                        _learnware.get_dirpath(),
+                        self._docker_containers[i % len(self._docker_containers)],
+                        build=False,
+                        exchange_dirpath=self._exchange_dirpath,
                     ),
                     _learnware.get_specification(),
                     _learnware.get_dirpath(),
                 )
-                for _learnware in self.learnware_list
+                for i, _learnware in enumerate(self.learnware_list)
             ]
 
         model_list = [_learnware.get_model() for _learnware in self.learnware_containers]
-        if self.mode == "conda":
-            with ThreadPoolExecutor(max_workers=max(os.cpu_count() // 2, 1)) as executor:
-                results = executor.map(
-                    self._initialize_model_container, model_list, [self.ignore_error] * len(model_list)
-                )
-            self.results = list(results)
-        else:
-            self.results = []
-            for model_item in model_list:
-                self.results.append(self._initialize_model_container(model_item, self.ignore_error))
+        max_workers = max(os.cpu_count() // 2, 1) if self.mode == "conda" else C.docker_setup_workers
+        self.results = self._initialize_model_containers(model_list, max_workers)
 
         if sum(self.results) < len(self.learnware_list):
             logger.warning(
-                f"{len(self.learnware_list) - sum(results)} of {len(self.learnware_list)} learnwares init failed! These learnwares will be ignored"
+                f"{len(self.learnware_list) - sum(self.results)} of {len(self.learnware_list)} learnwares init failed! These learnwares will be ignored"
             )
 
         return self
@@ -580,7 +945,24 @@ class LearnwaresContainer:
         self.results = None
 
         if self.mode == "docker":
-            ModelDockerContainer._destroy_docker_container(self._docker_container)
+            self._destroy_docker_container()
+
+    def _initialize_model_containers(self, model_list: List[ModelContainer], max_workers: int) -> List[bool]:
+        """Setup the envs of the models concurrently, and log the progress of each learnware"""
+        results = [False] * len(model_list)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._initialize_model_container, model, self.ignore_error): idx
+                for idx, model in enumerate(model_list)
+            }
+            for finished_num, future in enumerate(as_completed(futures), start=1):
+                idx = futures[future]
+                results[idx] = future.result()
+                logger.info(
+                    f"Env of learnware {self.learnware_list[idx].id} is {'ready' if results[idx] else 'failed'} "
+                    f"({finished_num}/{len(model_list)})."
+                )
+        return results
 
     @staticmethod
     def _initialize_model_container(model: ModelCondaContainer, ignore_error=True):
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Dict, Optional
+
+import shortuuid
+import yaml
+
+from .utils import install_environment, remove_enviroment, system_execute
+from .package_utils import parse_pip_requirement
+from ..config import C
+from ..logger import get_module_logger
+
+logger = get_module_logger(module_name="client_env_cache")
+
+
+def _normalize_requirement(line: str) -> Optional[str]:
+    line = line.split("#", 1)[0].strip()
+    if len(line) == 0:
+        return None
+    package_name, _ = parse_pip_requirement(line)
+    if package_name is None:
+        # the options, e.g., --index-url, are kept as they are
+        return " ".join(line.split())
+    # the names of pip packages are case-insensitive, and "-", "_" and "." are equivalent
+    normalized_name = re.sub(r"[-_.]+", "-", package_name).lower()
+    return normalized_name + "".join(line[len(package_name) :].split())
+
+
+def _normalize_dependencies(dependencies: list) -> list:
+    normalized_dependencies = []
+    for dependency in dependencies:
+        if isinstance(dependency, dict):
+            normalized_dependencies.append(
+                {
+                    key: sorted(set(filter(None, map(_normalize_requirement, value))))
+                    for key, value in dependency.items()
+                }
+            )
+        else:
+            normalized_dependencies.append(" ".join(str(dependency).lower().split()))
+    return sorted(normalized_dependencies, key=lambda dependency: json.dumps(dependency, sort_keys=True))
+
+
+def get_env_key(learnware_dirpath: str) -> str:
+    """Get the key of the environment of a learnware, which is the same for equivalent dependency files
+
+    The dependencies of `environment.yaml` or `requirements.txt` are normalized, i.e., the comments, the whitespaces,
+    the order and the duplicates are ignored and the package names are lowercased, and the env name is ignored.
+
+    Parameters
+    ----------
+    learnware_dirpath : str
+        Path of the learnware folder
+
+    Returns
+    -------
+    str
+        The sha256 of the normalized dependencies
+
+    Raises
+    ------
+    Exception
+        Lack of the environment configuration file.
+    """
+    yaml_path = os.path.join(learnware_dirpath, "environment.yaml")
+    requirements_path = os.path.join(learnware_dirpath, "requirements.txt")
+    if os.path.exists(yaml_path):
+        with open(yaml_path, "r") as fin:
+            env_desc = yaml.safe_load(fin) or {}
+        normalized_desc = {
+            "type": "environment.yaml",
+            "channels": env_desc.get("channels", []),
+            "dependencies": _normalize_dependencies(env_desc.get("dependencies", [])),
+        }
+    elif os.path.exists(requirements_path):
+        with open(requirements_path, "r") as fin:
+            requirements = sorted(set(filter(None, map(_normalize_requirement, fin))))
+        normalized_desc = {"type": "requirements.txt", "requirements": requirements}
+    else:
+        raise Exception("Environment.yaml or requirements.txt not found in the learnware folder.")
+    return hashlib.sha256(json.dumps(normalized_desc, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _get_dir_size(dirpath: str) -> int:
+    total_size, inodes = 0, set()
+    for root, _, files in os.walk(dirpath):
+        for file in files:
+            try:
+                file_stat = os.lstat(os.path.join(root, file))
+            except OSError:
+                continue
+            # the hard links in the env are counted once
+            if (file_stat.st_dev, file_stat.st_ino) not in inodes:
+                inodes.add((file_stat.st_dev, file_stat.st_ino))
+                total_size += file_stat.st_size
+    return total_size
+
+
+class CondaEnvCache:
+    """A cache of conda envs shared by the learnwares with equivalent dependencies
+
+    The envs are named by `get_env_key`, created on the first acquisition, and kept after the last release. The
+    released envs are removed in least recently used order when their total size exceeds the budget. The index of
+    the envs is saved in a json file, so that they are reused by later processes. The reference counts are kept
+    by this process, which is expected to be the only one using the cache.
+    """
+
+    ENV_PREFIX = "learnware_env_"
+
+    def __init__(self, index_path: str, budget: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        index_path : str
+            The json file of the index of the envs
+        budget : Optional[int], optional
+            The bytes of the released envs kept in the cache, None means no limit
+        """
+        self.index_path = index_path
+        self.budget = budget
+        self.ref_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.index = self._load_index()
+
+    def _load_index(self) -> Dict[str, dict]:
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as fin:
+                    return json.load(fin)
+            except (OSError, ValueError) as err:
+                logger.warning(f"Failed to load the conda env cache index due to {err}, the index is rebuilt")
+        return {}
+
+    def _save_index(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        temp_path = f"{self.index_path}.{shortuuid.uuid()}.tmp"
+        with open(temp_path, "w") as fout:
+            json.dump(self.index, fout, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def _get_key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def _get_env_prefix(conda_env: str) -> Optional[str]:
+        com_process = system_execute(["conda", "env", "list", "--json"], stdout=subprocess.PIPE)
+        for env_prefix in json.loads(com_process.stdout.decode())["envs"]:
+            if os.path.basename(env_prefix) == conda_env:
+                return env_prefix
+        return None
+
+    def _is_env_valid(self, key: str) -> bool:
+        env_info = self.index.get(key)
+        return env_info is not None and env_info["prefix"] is not None and os.path.isdir(env_info["prefix"])
+
+    def acquire(self, learnware_dirpath: str, clone: bool = False) -> str:
+        """Acquire the conda env of a learnware, which should be released by `release`
+
+        Parameters
+        ----------
+        learnware_dirpath : str
+            Path of the learnware folder
+        clone : bool, optional
+            Whether to return a private clone of the cached env by `conda create --clone`, which can be modified
+            by the caller, by default False
+
+        Returns
+        -------
+        str
+            The name of the conda env
+        """
+        key = get_env_key(learnware_dirpath)
+        conda_env = f"{self.ENV_PREFIX}{key[:16]}"
+        with self._get_key_lock(key):
+            if self._is_env_valid(key):
+                logger.info(f"Conda env {conda_env} is reused for {learnware_dirpath}.")
+            else:
+                try:
+                    # the env is left by an interrupted creation or a lost index
+                    if self._get_env_prefix(conda_env) is not None:
+                        remove_enviroment(conda_env)
+                    install_environment(learnware_dirpath, conda_env)
+                    env_prefix = self._get_env_prefix(conda_env)
+                except BaseException:
+                    try:
+                        remove_enviroment(conda_env)
+                    except Exception:
+                        pass
+                    raise
+                with self._lock:
+                    self.index[key] = {
+                        "env": conda_env,
+                        "prefix": env_prefix,
+                        "size": _get_dir_size(env_prefix) if env_prefix is not None else 0,
+                        "last_used": time.time(),
+                    }
+                    self._save_index()
+                logger.info(f"Conda env {conda_env} is created and cached.")
+
+            with self._lock:
+                self.ref_counts[key] = self.ref_counts.get(key, 0) + 1
+                self.index[key]["last_used"] = time.time()
+                self._save_index()
+
+        if not clone:
+            return conda_env
+
+        cloned_env = f"learnware_{shortuuid.uuid()}"
+        try:
+            system_execute(["conda", "create", "-y", "--name", cloned_env, "--clone", conda_env])
+        finally:
+            self.release(conda_env)
+        return cloned_env
+
+    def release(self, conda_env: str):
+        """Release an env returned by `acquire`, the cloned envs are removed
+
+        Parameters
+        ----------
+        conda_env : str
+            The name of the conda env
+        """
+        if not conda_env.startswith(self.ENV_PREFIX):
+            remove_enviroment(conda_env)
+            return
+
+        with self._lock:
+            key = next((key for key, env_info in self.index.items() if env_info["env"] == conda_env), None)
+            if key is None or self.ref_counts.get(key, 0) == 0:
+                logger.warning(f"Conda env {conda_env} is not acquired from the cache.")
+                return
+            self.ref_counts[key] -= 1
+            if self.ref_counts[key] == 0:
+                del self.ref_counts[key]
+            self.index[key]["last_used"] = time.time()
+            self._save_index()
+        self.collect_garbage()
+
+    def collect_garbage(self, budget: Optional[int] = -1) -> int:
+        """Remove the released envs in least recently used order until their total size is within the budget
+
+        Parameters
+        ----------
+        budget : Optional[int], optional
+            The bytes of the released envs kept in the cache, by default the budget of the cache
+
+        Returns
+        -------
+        int
+            The number of the removed envs
+        """
+        budget = self.budget if budget == -1 else budget
+        if budget is None:
+            return 0
+
+        with self._lock:
+            released_keys = sorted(
+                (key for key in self.index if key not in self.ref_counts), key=lambda key: self.index[key]["last_used"]
+            )
+            total_size = sum(self.index[key]["size"] for key in released_keys)
+
+        removed_num = 0
+        for key in released_keys:
+            if total_size <= budget:
+                break
+            key_lock = self._get_key_lock(key)
+            if not key_lock.acquire(blocking=False):
+                continue
+            try:
+                with self._lock:
+                    if key in self.ref_counts or key not in self.index:
+                        continue
+                    env_info = self.index.pop(key)
+                    self._save_index()
+                total_size -= env_info["size"]
+                try:
+                    remove_enviroment(env_info["env"])
+                    removed_num += 1
+                    logger.info(f"Conda env {env_info['env']} is evicted from the cache.")
+                except Exception as err:
+                    logger.warning(f"Failed to remove the cached conda env {env_info['env']} due to {err}")
+            finally:
+                key_lock.release()
+        return removed_num
+
+
+_conda_env_cache = None
+_conda_env_cache_lock = threading.Lock()
+
+
+def get_conda_env_cache() -> CondaEnvCache:
+    """Get the conda env cache of this process, whose index is in C.cache_path"""
+    global _conda_env_cache
+    with _conda_env_cache_lock:
+        if _conda_env_cache is None:
+            _conda_env_cache = CondaEnvCache(
+                os.path.join(C.cache_path, "conda_envs.json"), budget=C.conda_env_cache_budget
+            )
+        return _conda_env_cache
@@ -18,6 +18,7 @@ from ..learnware import get_learnware_from_dirpath
 from ..logger import get_module_logger
 from ..market import BaseChecker, BaseUserInfo
 from ..specification import generate_semantic_spec
+from ..utils import unload_modules_in_dirpath
 
 CHUNK_SIZE = 1024 * 1024
 logger = get_module_logger(module_name="LearnwareClient")
@@ -446,10 +447,12 @@ class LearnwareClient:
             )
 
             check_status, message = LearnwareClient._check_stat_specification(learnware)
+            unload_modules_in_dirpath(tempdir)
             assert check_status is True, message
 
         logger.info("The learnware has passed the test.")
 
     def cleanup(self):
         for tempdir in self.tempdir_list:
+            unload_modules_in_dirpath(tempdir.name)
             tempdir.cleanup()
@@ -0,0 +1,207 @@
+"""Serve the calls of a learnware model in a long-running process of the model environment.
+
+The process reads the requests from stdin and writes the responses to stdout. Each message is a frame of an 8-byte
+big-endian length followed by a pickle. The first request is the model config, which is answered by the metadata of
+the model, and the following requests are {"method": str, "kargs": dict, "share_min_bytes": Optional[int]}, which are
+answered by the results. The process exits at the end of stdin or on the "close" method.
+
+The large numpy arrays of the messages are placed in shared memory, and only their descriptors are pickled. The
+receiver of a block unlinks it: the worker uses the blocks of the requests without copying them, and the host copies
+the blocks of the responses.
+"""
+
+import os
+import pickle
+import struct
+import sys
+import traceback
+
+import numpy as np
+
+from learnware.utils import get_module_by_module_path
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    shared_memory = None
+
+FRAME_HEADER = struct.Struct(">Q")
+# the pickles are exchanged with the python of the model environment, which may be older
+PICKLE_PROTOCOL = 4
+
+
+def _read_exact(stream, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            if len(data) == 0:
+                return None
+            raise EOFError("The frame is truncated")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def read_frame(stream):
+    """Read a message, None at the end of the stream"""
+    header = _read_exact(stream, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    return pickle.loads(_read_exact(stream, size))
+
+
+def write_frame(stream, message):
+    data = pickle.dumps(message, protocol=PICKLE_PROTOCOL)
+    stream.write(FRAME_HEADER.pack(len(data)))
+    stream.write(data)
+    stream.flush()
+
+
+SHARED_ARRAY_KEY = "__learnware_shared_array__"
+
+
+def _untrack(block):
+    # the blocks are unlinked by their receivers, so the resource tracker of this process must not unlink them
+    try:
+        resource_tracker.unregister(block._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def share_arrays(message, min_bytes, blocks):
+    """Replace the numpy arrays of at least min_bytes in a message by the descriptors of shared memory blocks
+
+    Parameters
+    ----------
+    message : Any
+        The message, whose dicts, lists and tuples are searched for arrays
+    min_bytes : Optional[int]
+        The minimum bytes of the shared arrays, None means no array is shared
+    blocks : list
+        The created blocks are appended, which should be closed by the sender after the message is sent
+
+    Returns
+    -------
+    Any
+        The message with the descriptors
+    """
+    if min_bytes is None or shared_memory is None:
+        return message
+    if isinstance(message, dict):
+        return {key: share_arrays(value, min_bytes, blocks) for key, value in message.items()}
+    if isinstance(message, (list, tuple)) and type(message) in (list, tuple):
+        return type(message)(share_arrays(value, min_bytes, blocks) for value in message)
+    if (
+        isinstance(message, np.ndarray)
+        and type(message) is np.ndarray
+        and not message.dtype.hasobject
+        and message.dtype.fields is None
+        and message.nbytes >= min_bytes
+    ):
+        block = shared_memory.SharedMemory(create=True, size=max(message.nbytes, 1))
+        _untrack(block)
+        blocks.append(block)
+        np.ndarray(message.shape, dtype=message.dtype, buffer=block.buf)[...] = message
+        return {SHARED_ARRAY_KEY: block.name, "shape": message.shape, "dtype": message.dtype.str}
+    return message
+
+
+def attach_arrays(message, blocks, copy):
+    """Replace the descriptors of a received message by the arrays, and unlink the blocks
+
+    Parameters
+    ----------
+    message : Any
+        The received message
+    blocks : list
+        The attached blocks are appended, which should be closed when the arrays are not used if copy is False
+    copy : bool
+        Whether to copy the arrays out of the blocks, the copied blocks are closed at once
+
+    Returns
+    -------
+    Any
+        The message with the arrays
+    """
+    if isinstance(message, dict):
+        if SHARED_ARRAY_KEY in message:
+            block = shared_memory.SharedMemory(name=message[SHARED_ARRAY_KEY])
+            _untrack(block)
+            block.unlink()
+            array = np.ndarray(message["shape"], dtype=np.dtype(message["dtype"]), buffer=block.buf)
+            if not copy:
+                blocks.append(block)
+                return array
+            copied_array = array.copy()
+            del array
+            block.close()
+            return copied_array
+        return {key: attach_arrays(value, blocks, copy) for key, value in message.items()}
+    if isinstance(message, (list, tuple)) and type(message) in (list, tuple):
+        return type(message)(attach_arrays(value, blocks, copy) for value in message)
+    return message
+
+
+def close_blocks(blocks):
+    """Close the blocks, the ones whose arrays are still referenced, e.g., kept by the model, are returned"""
+    retained_blocks = []
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            retained_blocks.append(block)
+    return retained_blocks
+
+
+def _get_error_response(err):
+    try:
+        pickle.dumps(err, protocol=PICKLE_PROTOCOL)
+    except Exception:
+        err = RuntimeError(f"{type(err).__name__}: {err}")
+    return {"status": "fail", "error_info": err, "traceback": traceback.format_exc()}
+
+
+def serve(input_stream, output_stream):
+    model_config = read_frame(input_stream)
+    if model_config is None:
+        return
+
+    try:
+        model_module = get_module_by_module_path(model_config["module_path"])
+        cls = getattr(model_module, model_config["class_name"])
+        setattr(sys.modules["__main__"], model_config["class_name"], cls)
+        model = cls(**model_config.get("kwargs", {}))
+    except Exception as err:
+        write_frame(output_stream, _get_error_response(err))
+        return
+    write_frame(
+        output_stream,
+        {"status": "success", "metadata": {"input_shape": model.input_shape, "output_shape": model.output_shape}},
+    )
+
+    retained_blocks = []
+    while True:
+        request = read_frame(input_stream)
+        if request is None or request.get("method") == "close":
+            return
+
+        request_blocks, response_blocks = [], []
+        try:
+            kargs = attach_arrays(request.get("kargs", {}), request_blocks, copy=False)
+            result = getattr(model, request.get("method", "predict"))(**kargs)
+            response = {"status": "success", "result": result}
+            response = share_arrays(response, request.get("share_min_bytes"), response_blocks)
+        except Exception as err:
+            response = _get_error_response(err)
+        kargs = result = None
+        write_frame(output_stream, response)
+        close_blocks(response_blocks)
+        retained_blocks = close_blocks(retained_blocks + request_blocks)
+
+
+if __name__ == "__main__":
+    # the prints of the model are redirected to stderr, so that stdout only carries the responses
+    output_stream = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    serve(sys.stdin.buffer, output_stream)
@@ -165,6 +165,36 @@ _DEFAULT_CONFIG = {
     },
     "database_url": f"sqlite:///{DATABASE_PATH}",
     "max_reduced_set_size": 1310720,
+    "market_reload_workers": None,  # None means using all the cores
+    "market_reload_executor": "thread",  # "thread" or "process", the executor constructing the reloaded learnwares
+    "market_reload_process_threshold": 2000,  # the minimum number of learnwares reloaded by the process executor
+    "market_snapshot": True,
+    "stat_spec_storage_dtype": "float64",  # dtype of the arrays of loaded specifications, "float32" halves the memory
+    "semantic_spec_interning": True,
+    "binary_hetero_specs": False,  # save new hetero specs as npz, which the markets migrated to npz always do
+    "semantic_text_search": False,  # rank the exact semantic matches by BM25 and fall back to the keyword matches
+    "learnware_pool_hard_link": False,  # share the identical files of learnwares by read-only hard links, or write copies
+    "unzipped_learnware_budget": None,  # bytes of the unzipped learnware folders before evicting the cold ones
+    "model_pool_max_models": None,  # the number of instantiated models kept by Learnware.predict, None means no limit
+    "model_pool_max_bytes": None,  # the estimated bytes of instantiated models kept by Learnware.predict
+    "model_pool_prewarm_workers": 2,
+    "conda_model_worker": True,  # serve the calls of ModelCondaContainer by a long-running process of the conda env
+    "conda_model_worker_share_min_bytes": 1 << 16,  # arrays exchanged with the worker by shared memory, None to pickle
+    "docker_model_worker": True,  # serve the calls of ModelDockerContainer by a long-running process in the container
+    "docker_setup_workers": 4,  # the number of learnware envs of LearnwaresContainer set up concurrently in docker
+    "docker_setup_containers": 1,  # the number of docker containers across which LearnwaresContainer shards learnwares
+    "docker_setup_retry_delay": 1,  # seconds before the first retry of installing an env in docker, doubled each time
+    "conda_env_cache": False,  # share conda envs between learnwares with equivalent dependencies, in one process
+    "conda_env_cache_budget": None,  # bytes of the released cached conda envs before evicting the least recently used
+    "ingestion_workers": 2,  # the number of background workers checking the submitted learnwares
+    "ingestion_checker_timeout": None,  # seconds for each checker of the submitted learnwares, None means no limit
+    "checker_max_workers": None,  # the number of checkers running concurrently, None means all the checkers
+    "checker_result_cache": True,  # cache the check results in the market database by the content of learnwares
+    "async_cpu_executor": "thread",  # "thread" or "process", the executor of the checkers of AsyncLearnwareMarket
+    "async_cpu_workers": None,  # None means using all the cores
+    "async_io_workers": None,  # None means the default of ThreadPoolExecutor
+    "async_max_searches": 16,  # the number of concurrent searches of AsyncLearnwareMarket
+    "async_max_writes": 4,  # the number of concurrent additions, updates and deletions of AsyncLearnwareMarket
     "backend_host": "https://bmwu.cloud/api",
     "random_seed": 0,
 }
@@ -4,6 +4,7 @@ import traceback
 from typing import Optional
 
 from .base import Learnware
+from .pool import ModelPool, get_model_pool, set_model_pool
 from .utils import get_stat_spec_from_config
 from ..config import C
 from ..logger import get_module_logger
@@ -88,3 +89,6 @@ def get_learnware_from_dirpath(
     return Learnware(
         id=id, model=learnware_config["model"], specification=learnware_spec, learnware_dirpath=learnware_dirpath
     )
+
+
+__all__ = ["Learnware", "ModelPool", "get_learnware_from_dirpath", "get_model_pool", "set_model_pool"]
@@ -1,9 +1,10 @@
 import os
 import sys
-from typing import Union
+from typing import Callable, Union
 
 import numpy as np
 
+from .pool import get_model_pool
 from ..logger import get_module_logger
 from ..model import BaseModel
 from ..specification import BaseStatSpecification, Specification
@@ -11,10 +12,38 @@ from ..utils import get_module_by_module_path
 
 logger = get_module_logger("Learnware")
 
+# the callbacks restoring the evicted learnware folders, keyed by the directories containing the folders
+_folder_restorers = {}
+
+
+def register_folder_restorer(folder_pool_path: str, restorer: Callable[[str], None]):
+    """Register a callback which restores the learnware folders in folder_pool_path before they are used
+
+    Parameters
+    ----------
+    folder_pool_path : str
+        The directory containing the learnware folders
+    restorer : Callable[[str], None]
+        Called with the path of a learnware folder before the model is instantiated or the folder is returned
+    """
+    _folder_restorers[os.path.normpath(folder_pool_path)] = restorer
+
+
+def unregister_folder_restorer(folder_pool_path: str):
+    _folder_restorers.pop(os.path.normpath(folder_pool_path), None)
+
+
+def restore_learnware_folder(learnware_dirpath: str):
+    restorer = _folder_restorers.get(os.path.dirname(os.path.normpath(learnware_dirpath)))
+    if restorer is not None:
+        restorer(learnware_dirpath)
+
 
 class Learnware:
     """The learnware class, which is the basic components in learnware market"""
 
+    __slots__ = ("id", "model", "specification", "learnware_dirpath", "model_config")
+
     def __init__(self, id: str, model: Union[BaseModel, dict], specification: Specification, learnware_dirpath: str):
         """The initialization method for learnware.
 
@@ -43,6 +72,8 @@ class Learnware:
 
         self.id = id
         self.model = model
+        # kept to release the instantiated model, see `release_model`
+        self.model_config = model if isinstance(model, dict) else None
         self.specification = specification
         self.learnware_dirpath = learnware_dirpath
 
@@ -59,6 +90,7 @@ class Learnware:
         if isinstance(self.model, BaseModel):
             logger.info("The learnware had been instantiated, thus the instantiation operation is ignored!")
         elif isinstance(self.model, dict):
+            restore_learnware_folder(self.learnware_dirpath)
             module_path = Learnware.get_model_module_abspath(self.learnware_dirpath, self.model["module_path"])
             model_module = get_module_by_module_path(module_path)
             cls = getattr(model_module, self.model["class_name"])
@@ -67,7 +99,24 @@ class Learnware:
         else:
             raise TypeError(f"Model must be BaseModel or dict, not {type(self.model)}")
 
+    def release_model(self) -> bool:
+        """Return the instantiated model to its configuration, so that the model is instantiated again when used
+
+        Returns
+        -------
+        bool
+            A flag indicating whether the model is released, False if the model is not instantiated from a
+            configuration
+        """
+        if isinstance(self.model, BaseModel) and self.model_config is not None:
+            self.model = self.model_config
+            return True
+        return False
+
     def predict(self, X: np.ndarray) -> np.ndarray:
+        model_pool = get_model_pool()
+        if model_pool is not None:
+            return model_pool.predict(self, X)
         if isinstance(self.model, dict):
             self.instantiate_model()
         return self.model.predict(X)
@@ -79,6 +128,7 @@ class Learnware:
         return self.specification
 
     def get_dirpath(self) -> str:
+        restore_learnware_folder(self.learnware_dirpath)
         return self.learnware_dirpath
 
     def update_stat_spec(self, name, new_stat_spec: BaseStatSpecification):
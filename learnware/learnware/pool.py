@@ -0,0 +1,238 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+from ..config import C
+from ..logger import get_module_logger
+from ..model import BaseModel
+
+logger = get_module_logger("model_pool")
+
+
+class _ByteCounter:
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+
+def estimate_model_bytes(model: BaseModel) -> int:
+    """Estimate the memory of an instantiated model by the size of its pickle, 0 if it cannot be pickled"""
+    counter = _ByteCounter()
+    try:
+        pickle.dump(model, counter, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return 0
+    return counter.size
+
+
+class ModelPool:
+    """Keep the instantiated models of the learnwares like a LRU cache.
+
+    The models are instantiated by the pool on first use, and the least recently used models are released, i.e., the
+    learnwares return to their model configurations, when the pool exceeds the number of models or the estimated
+    bytes. The learnwares expected to be used soon, e.g., the recent search results, can be prewarmed in the
+    background.
+    """
+
+    def __init__(self, max_models: Optional[int] = None, max_bytes: Optional[int] = None, prewarm_workers: int = None):
+        """
+        Parameters
+        ----------
+        max_models : Optional[int], optional
+            The maximum number of instantiated models, by default None which means no limit
+        max_bytes : Optional[int], optional
+            The maximum estimated bytes of the instantiated models, by default None which means no limit
+        prewarm_workers : int, optional
+            The number of threads instantiating the prewarmed models, by default C.model_pool_prewarm_workers
+        """
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.prewarm_workers = C.model_pool_prewarm_workers if prewarm_workers is None else prewarm_workers
+        self._lock = threading.Lock()
+        self._model_bytes = OrderedDict()  # learnware: estimated bytes, the least recently used first
+        self._load_locks = {}
+        self._prewarm_executor = None
+        self._prewarm_futures = set()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "load_seconds": 0.0}
+
+    def _get_load_lock(self, learnware) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(learnware, threading.Lock())
+
+    def get_model(self, learnware) -> BaseModel:
+        """Get the instantiated model of a learnware, which is instantiated if it is not in the pool
+
+        Parameters
+        ----------
+        learnware : Learnware
+            The learnware whose model is returned
+
+        Returns
+        -------
+        BaseModel
+            The instantiated model
+        """
+        with self._lock:
+            model = learnware.get_model()
+            if learnware in self._model_bytes and isinstance(model, BaseModel):
+                self._model_bytes.move_to_end(learnware)
+                self._stats["hits"] += 1
+                return model
+
+        with self._get_load_lock(learnware):
+            with self._lock:
+                model = learnware.get_model()
+                if learnware in self._model_bytes and isinstance(model, BaseModel):
+                    self._model_bytes.move_to_end(learnware)
+                    self._stats["hits"] += 1
+                    return model
+
+            start = time.perf_counter()
+            if not isinstance(learnware.get_model(), BaseModel):
+                learnware.instantiate_model()
+            model = learnware.get_model()
+            load_seconds = time.perf_counter() - start
+            model_bytes = estimate_model_bytes(model) if self.max_bytes is not None else 0
+
+            with self._lock:
+                self._stats["misses"] += 1
+                self._stats["load_seconds"] += load_seconds
+                self._model_bytes[learnware] = model_bytes
+                self._model_bytes.move_to_end(learnware)
+                self._evict(exclude=learnware)
+        return model
+
+    def _evict(self, exclude=None):
+        """Release the least recently used models beyond the limits, called with the lock of the pool"""
+        for learnware in list(self._model_bytes.keys()):
+            if not self._is_over_limits():
+                break
+            if learnware is exclude:
+                continue
+            self._model_bytes.pop(learnware)
+            self._load_locks.pop(learnware, None)
+            if learnware.release_model():
+                self._stats["evictions"] += 1
+
+    def _is_over_limits(self) -> bool:
+        if self.max_models is not None and len(self._model_bytes) > self.max_models:
+            return True
+        return self.max_bytes is not None and sum(self._model_bytes.values()) > self.max_bytes
+
+    def predict(self, learnware, X):
+        return self.get_model(learnware).predict(X)
+
+    def prewarm(self, learnwares: List) -> List[Future]:
+        """Instantiate the models of the learnwares in the background, in the order of the list
+
+        Parameters
+        ----------
+        learnwares : List[Learnware]
+            The learnwares expected to be used soon
+
+        Returns
+        -------
+        List[Future]
+            The futures of the instantiations, whose exceptions are logged
+        """
+        with self._lock:
+            if self._prewarm_executor is None:
+                self._prewarm_executor = ThreadPoolExecutor(
+                    max_workers=self.prewarm_workers, thread_name_prefix="learnware-prewarm"
+                )
+            executor = self._prewarm_executor
+
+        def prewarm_model(learnware):
+            try:
+                self.get_model(learnware)
+            except Exception as err:
+                logger.warning(f"Prewarm the model of learnware {learnware.id} failed! Due to {err}.")
+
+        futures = [executor.submit(prewarm_model, learnware) for learnware in learnwares]
+        for future in futures:
+            self._prewarm_futures.add(future)
+            future.add_done_callback(self._prewarm_futures.discard)
+        return futures
+
+    def prewarm_search_results(self, search_results, top: Optional[int] = None) -> List[Future]:
+        """Prewarm the learnwares of the search results, the single results first
+
+        Parameters
+        ----------
+        search_results : SearchResults
+            The results returned by `LearnwareMarket.search_learnware`
+        top : Optional[int], optional
+            The number of prewarmed learnwares, by default None which means all the learnwares
+        """
+        learnwares = [item.learnware for item in search_results.get_single_results()]
+        for item in search_results.get_multiple_results():
+            learnwares.extend(item.learnwares)
+        learnwares = list({id(learnware): learnware for learnware in learnwares}.values())
+        return self.prewarm(learnwares if top is None else learnwares[:top])
+
+    def get_stats(self) -> dict:
+        """Get the metrics of the pool
+
+        Returns
+        -------
+        dict
+            - hits, misses, evictions: the numbers of the requests found in the pool, the instantiations and the
+              released models
+            - load_seconds: the total seconds of the instantiations
+            - models, bytes: the number and the estimated bytes of the models in the pool
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["models"] = len(self._model_bytes)
+            stats["bytes"] = sum(self._model_bytes.values())
+        return stats
+
+    def clear(self):
+        """Release all the models of the pool"""
+        with self._lock:
+            for learnware in self._model_bytes:
+                learnware.release_model()
+            self._model_bytes.clear()
+            self._load_locks.clear()
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._prewarm_executor = self._prewarm_executor, None
+        if executor is not None:
+            # the pending instantiations are cancelled, shutdown has no cancel_futures before Python 3.9
+            for future in list(self._prewarm_futures):
+                future.cancel()
+            executor.shutdown(wait=wait)
+
+
+_model_pool = None
+_model_pool_lock = threading.Lock()
+
+
+def get_model_pool() -> Optional[ModelPool]:
+    """Get the model pool used by `Learnware.predict`, which is created from C.model_pool_max_models and
+    C.model_pool_max_bytes on first use
+
+    Returns
+    -------
+    Optional[ModelPool]
+        The model pool, None if the pool is not set and no limit is configured
+    """
+    global _model_pool
+    if _model_pool is None and (C.model_pool_max_models is not None or C.model_pool_max_bytes is not None):
+        with _model_pool_lock:
+            if _model_pool is None:
+                _model_pool = ModelPool(max_models=C.model_pool_max_models, max_bytes=C.model_pool_max_bytes)
+    return _model_pool
+
+
+def set_model_pool(model_pool: Optional[ModelPool]):
+    """Set the model pool used by `Learnware.predict`, None means the models are kept by the learnwares"""
+    global _model_pool
+    with _model_pool_lock:
+        _model_pool = model_pool
@@ -1,16 +1,19 @@
 from .anchor import AnchoredOrganizer, AnchoredSearcher, AnchoredUserInfo
+from .async_market import AsyncLearnwareMarket
 from .base import BaseChecker, BaseOrganizer, BaseSearcher, BaseUserInfo, LearnwareMarket
 from .classes import CondaChecker
 from .easy import EasyOrganizer, EasySearcher, EasySemanticChecker, EasyStatChecker
 from .evolve import EvolvedOrganizer
 from .evolve_anchor import EvolvedAnchoredOrganizer
 from .heterogeneous import HeteroMapTableOrganizer, HeteroSearcher
+from .ingestion import IngestionQueue
 from .module import instantiate_learnware_market
 
 __all__ = [
     "AnchoredOrganizer",
     "AnchoredSearcher",
     "AnchoredUserInfo",
+    "AsyncLearnwareMarket",
     "BaseChecker",
     "BaseOrganizer",
     "BaseSearcher",
@@ -25,5 +28,6 @@ __all__ = [
     "EvolvedAnchoredOrganizer",
     "HeteroMapTableOrganizer",
     "HeteroSearcher",
+    "IngestionQueue",
     "instantiate_learnware_market",
 ]
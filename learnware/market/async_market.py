@@ -0,0 +1,245 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+from .base import BaseChecker, BaseUserInfo, LearnwareMarket, OrganizerRelatedChecker, SearchResults
+from .base import check_learnware_zip
+from ..config import C
+from ..learnware import Learnware
+from ..logger import get_module_logger
+
+logger = get_module_logger("async_market")
+
+
+class AsyncLearnwareMarket:
+    """An asyncio facade of `LearnwareMarket` for service deployments.
+
+    The blocking stages run on executors instead of the event loop: the checkers and the searches are CPU-bound and
+    run on the CPU executor, the file and database operations of the organizer run on the I/O executor. The number
+    of concurrent searches and modifications is bounded by semaphores, and the callers wait when they are exhausted.
+
+    Cancelling a call cancels the stages which are not started, e.g., the learnware is not added if the call is
+    cancelled during the check. A stage which is running cannot be interrupted, it finishes in the background and its
+    result is discarded.
+    """
+
+    def __init__(
+        self,
+        market: LearnwareMarket,
+        cpu_executor: Union[str, Executor] = None,
+        io_executor: Optional[Executor] = None,
+        cpu_workers: Optional[int] = None,
+        io_workers: Optional[int] = None,
+        max_searches: Optional[int] = None,
+        max_writes: Optional[int] = None,
+    ):
+        """
+        Parameters
+        ----------
+        market : LearnwareMarket
+            The wrapped market
+        cpu_executor : Union[str, Executor], optional
+            "thread", "process" or an executor for the checkers and the searches, by default C.async_cpu_executor.
+            The searches always run on threads since the market cannot be shared with other processes, so a process
+            executor is only used by the checkers which are not related to the organizer
+        io_executor : Optional[Executor], optional
+            The executor for the file and database operations, by default a thread pool
+        cpu_workers : Optional[int], optional
+            The number of workers of the created CPU executor, by default C.async_cpu_workers
+        io_workers : Optional[int], optional
+            The number of workers of the created I/O executor, by default C.async_io_workers
+        max_searches : Optional[int], optional
+            The maximum number of concurrent searches, by default C.async_max_searches
+        max_writes : Optional[int], optional
+            The maximum number of concurrent additions, updates and deletions, by default C.async_max_writes
+        """
+        self.market = market
+        self._own_executors = []
+        self._futures = set()
+
+        cpu_executor = C.async_cpu_executor if cpu_executor is None else cpu_executor
+        cpu_workers = C.async_cpu_workers if cpu_workers is None else cpu_workers
+        if cpu_executor == "process":
+            self.check_executor = ProcessPoolExecutor(max_workers=cpu_workers)
+            self.search_executor = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="learnware-search")
+            self._own_executors.extend([self.check_executor, self.search_executor])
+        elif cpu_executor == "thread":
+            self.check_executor = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="learnware-cpu")
+            self.search_executor = self.check_executor
+            self._own_executors.append(self.check_executor)
+        elif isinstance(cpu_executor, Executor):
+            self.check_executor = cpu_executor
+            self.search_executor = (
+                cpu_executor
+                if isinstance(cpu_executor, ThreadPoolExecutor)
+                else ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="learnware-search")
+            )
+            if self.search_executor is not cpu_executor:
+                self._own_executors.append(self.search_executor)
+        else:
+            raise ValueError(f"cpu_executor must be 'thread', 'process' or an Executor, not {cpu_executor}")
+
+        if io_executor is None:
+            io_workers = C.async_io_workers if io_workers is None else io_workers
+            io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="learnware-io")
+            self._own_executors.append(io_executor)
+        self.io_executor = io_executor
+
+        self.max_searches = C.async_max_searches if max_searches is None else max_searches
+        self.max_writes = C.async_max_writes if max_writes is None else max_writes
+        # the semaphores are bound to an event loop, so they are created in the running loop on first use
+        self._semaphore_loop = None
+        self._search_semaphore = None
+        self._write_semaphore = None
+
+    def _get_semaphores(self) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._search_semaphore = asyncio.Semaphore(self.max_searches)
+            self._write_semaphore = asyncio.Semaphore(self.max_writes)
+            self._semaphore_loop = loop
+        return self._search_semaphore, self._write_semaphore
+
+    async def _run(self, executor: Executor, func, *args, **kwargs):
+        future = executor.submit(func, *args, **kwargs)
+        if executor in self._own_executors:
+            # the stages not started are cancelled when the facade is closed
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+        return await asyncio.wrap_future(future)
+
+    async def check_learnware(self, zip_path: str, semantic_spec: dict, checker_names: List[str] = None) -> int:
+        """Check a zipped learnware, see `LearnwareMarket.check_learnware`
+
+        Returns
+        -------
+        int
+            The final learnware check_status
+        """
+        checkers = self.market._get_checkers(checker_names)
+        if checkers is None:
+            return BaseChecker.INVALID_LEARNWARE
+
+        zip_digest, cached_results = await self._run(
+            self.io_executor, self.market._lookup_check_results, zip_path, semantic_spec, checkers
+        )
+        # the organizer cannot be shared with other processes
+        if isinstance(self.check_executor, ProcessPoolExecutor) and any(
+            isinstance(checker, OrganizerRelatedChecker) for checker in checkers
+        ):
+            check_executor = self.search_executor
+        else:
+            check_executor = self.check_executor
+        report = await self._run(check_executor, check_learnware_zip, zip_path, semantic_spec, checkers, cached_results)
+        await self._run(
+            self.io_executor,
+            self.market._save_check_results,
+            zip_digest,
+            semantic_spec,
+            checkers,
+            cached_results,
+            report.results,
+        )
+        return report.final_status
+
+    async def search_learnware(self, user_info: BaseUserInfo, check_status: int = None, **kwargs) -> SearchResults:
+        async with self._get_semaphores()[0]:
+            return await self._run(
+                self.search_executor, self.market.search_learnware, user_info, check_status, **kwargs
+            )
+
+    async def add_learnware(
+        self, zip_path: str, semantic_spec: dict, checker_names: List[str] = None, **kwargs
+    ) -> Tuple[str, int]:
+        """Check and add a learnware, see `LearnwareMarket.add_learnware`
+
+        Returns
+        -------
+        Tuple[str, int]
+            - str indicating model_id
+            - int indicating the final learnware check_status
+        """
+        async with self._get_semaphores()[1]:
+            checker_names = list(self.market.learnware_checker.keys()) if checker_names is None else checker_names
+            check_status = await self.check_learnware(zip_path, semantic_spec, checker_names)
+            return await self._run(
+                self.io_executor,
+                self.market.learnware_organizer.add_learnware,
+                zip_path=zip_path,
+                semantic_spec=semantic_spec,
+                check_status=check_status,
+                **kwargs,
+            )
+
+    async def update_learnware(
+        self,
+        id: str,
+        zip_path: str = None,
+        semantic_spec: dict = None,
+        checker_names: List[str] = None,
+        check_status: int = None,
+        **kwargs,
+    ) -> int:
+        """Check and update a learnware, see `LearnwareMarket.update_learnware`
+
+        Returns
+        -------
+        int
+            The final learnware check_status.
+        """
+        async with self._get_semaphores()[1]:
+            zip_path_for_check = (
+                await self._run(self.io_executor, self.market.get_learnware_zip_path_by_ids, id)
+                if zip_path is None
+                else zip_path
+            )
+            if semantic_spec is None:
+                learnware = await self.get_learnware_by_ids(id)
+                semantic_spec = learnware.get_specification().get_semantic_spec()
+            checker_names = list(self.market.learnware_checker.keys()) if checker_names is None else checker_names
+            update_status = await self.check_learnware(zip_path_for_check, semantic_spec, checker_names)
+            check_status = (
+                update_status
+                if check_status is None or update_status == BaseChecker.INVALID_LEARNWARE
+                else check_status
+            )
+            return await self._run(
+                self.io_executor,
+                self.market.learnware_organizer.update_learnware,
+                id,
+                zip_path=zip_path,
+                semantic_spec=semantic_spec,
+                check_status=check_status,
+                **kwargs,
+            )
+
+    async def delete_learnware(self, id: str, **kwargs) -> bool:
+        async with self._get_semaphores()[1]:
+            return await self._run(self.io_executor, self.market.delete_learnware, id, **kwargs)
+
+    async def get_learnware_ids(self, top: int = None, check_status: int = None, **kwargs) -> List[str]:
+        return await self._run(self.io_executor, self.market.get_learnware_ids, top, check_status, **kwargs)
+
+    async def get_learnware_by_ids(self, ids: Union[str, List[str]], **kwargs) -> Union[Learnware, List[Learnware]]:
+        return await self._run(self.io_executor, self.market.get_learnware_by_ids, ids, **kwargs)
+
+    def close(self, wait: bool = True):
+        """Shut down the executors created by the facade
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Whether to wait for the running stages, by default True
+        """
+        # shutdown has no cancel_futures before Python 3.9
+        for future in list(self._futures):
+            future.cancel()
+        for executor in self._own_executors:
+            executor.shutdown(wait=wait)
+        self._own_executors = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
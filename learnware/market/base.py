@@ -1,17 +1,217 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
+import shutil
 import tempfile
+import threading
+import time
 import traceback
 import zipfile
-from dataclasses import dataclass
-from typing import Any, List, Optional, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+from ..config import C
 from ..learnware import Learnware, get_learnware_from_dirpath
 from ..logger import get_module_logger
+from ..utils import unload_modules_in_dirpath
+from ..utils.lock import ReadWriteLock
 
 logger = get_module_logger("market_base")
 
 
+@dataclass
+class CheckReport:
+    """The result of checking a learnware by the checker pipeline
+
+    Attributes
+    ----------
+    final_status : int
+        The final learnware check_status
+    results : List[Optional[Tuple[int, str]]]
+        The (check_status, message) of each checker, None for the checkers which are not finished
+    timings : Dict[str, float]
+        The seconds spent by each checker which is run, by name
+    message : str
+        The message of the checker which invalidates the learnware, or of the last checker
+    """
+
+    final_status: int
+    results: List[Optional[Tuple[int, str]]]
+    timings: Dict[str, float] = field(default_factory=dict)
+    message: str = ""
+
+
+def check_learnware_zip(
+    zip_path: str,
+    semantic_spec: dict,
+    checkers: List[BaseChecker],
+    cached_results: Optional[List[Optional[Tuple[int, str]]]] = None,
+    max_workers: Optional[int] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+) -> CheckReport:
+    """Check a zipped learnware by the checker pipeline.
+
+    A checker starts when the checkers named by its `prerequisites` are finished, and the independent checkers run
+    concurrently on a thread pool. The pipeline stops at the first checker which returns INVALID_LEARNWARE, the
+    checkers not started are cancelled and the results of the running ones are discarded. The unzipped learnware
+    is kept until the discarded checkers finish.
+
+    Parameters
+    ----------
+    zip_path : str
+        Filepath for learnware model, a zipped file.
+    semantic_spec : dict
+        semantic_spec for new learnware, in dictionary format.
+    checkers : List[BaseChecker]
+        The checkers, which are started in order when they are ready
+    cached_results : Optional[List[Optional[Tuple[int, str]]]], optional
+        The known (check_status, message) of each checker, which is not run again, None for the checkers to be run.
+        The learnware is not unzipped if all the results are known.
+    max_workers : Optional[int], optional
+        The maximum number of checkers running at the same time, by default C.checker_max_workers,
+        1 means the checkers run one by one
+    timeouts : Optional[Dict[str, float]], optional
+        The timeout in seconds of the checkers by name, by default None which means no limit.
+        The learnware is invalid if a checker times out, and the result is not recorded in `CheckReport.results`
+
+    Returns
+    -------
+    CheckReport
+        The final check_status, the result and the timing of each checker
+    """
+    report = CheckReport(
+        final_status=BaseChecker.NONUSABLE_LEARNWARE,
+        results=[None] * len(checkers) if cached_results is None else list(cached_results),
+    )
+    if len(checkers) == 0:
+        return report
+
+    tempdir = tempfile.mkdtemp(prefix="pending_learnware_")
+    running = {}
+    try:
+        if any(result is None for result in report.results):
+            with zipfile.ZipFile(zip_path, mode="r") as z_file:
+                z_file.extractall(tempdir)
+
+        def run_checker(checker: BaseChecker) -> Tuple[Tuple[int, str], float]:
+            # each checker has its own learnware, since the checkers may modify it, e.g., instantiate the model
+            start = time.perf_counter()
+            pending_learnware = get_learnware_from_dirpath(
+                id="pending", semantic_spec=semantic_spec, learnware_dirpath=tempdir
+            )
+            return checker(pending_learnware), time.perf_counter() - start
+
+        _run_checker_pipeline(checkers, run_checker, report, max_workers, {} if timeouts is None else timeouts, running)
+    except Exception as err:
+        traceback.print_exc()
+        logger.warning(f"Check learnware failed! Due to {err}.")
+        report.final_status, report.message = BaseChecker.INVALID_LEARNWARE, str(err)
+    finally:
+        _remove_pending_learnware(tempdir, [future for future in running if not future.done()])
+
+    if len(report.timings):
+        logger.debug(f"Check timings of {zip_path}: {report.timings}")
+    return report
+
+
+def _remove_pending_learnware(tempdir: str, discarded_futures: List[Future]):
+    """Remove the unzipped pending learnware, after the discarded checkers which still use it are finished"""
+
+    def remove():
+        # the checkers share the model modules of the pending learnware, which are removed with it
+        unload_modules_in_dirpath(tempdir)
+        shutil.rmtree(tempdir, ignore_errors=True)
+
+    if len(discarded_futures) == 0:
+        remove()
+        return
+
+    lock, unfinished = threading.Lock(), [len(discarded_futures)]
+
+    def on_done(future: Future):
+        with lock:
+            unfinished[0] -= 1
+            if unfinished[0] > 0:
+                return
+        remove()
+
+    for future in discarded_futures:
+        future.add_done_callback(on_done)
+
+
+def _run_checker_pipeline(
+    checkers: List[BaseChecker],
+    run_checker: Callable[[BaseChecker], Tuple[Tuple[int, str], float]],
+    report: CheckReport,
+    max_workers: Optional[int],
+    timeouts: Dict[str, float],
+    running: Dict[Future, Tuple[int, Optional[float]]],
+):
+    names = [checker.__class__.__name__ for checker in checkers]
+    indices = {name: i for i, name in enumerate(names)}
+    prerequisites = [[indices[name] for name in checker.prerequisites if name in indices] for checker in checkers]
+    max_workers = C.checker_max_workers if max_workers is None else max_workers
+    max_workers = len(checkers) if max_workers is None else max(1, max_workers)
+
+    def finish(i: int, result: Tuple[int, str]) -> bool:
+        check_status, report.message = result
+        report.final_status = max(report.final_status, check_status)
+        if check_status == BaseChecker.INVALID_LEARNWARE:
+            report.final_status = BaseChecker.INVALID_LEARNWARE
+            return False
+        return True
+
+    finished, pending = set(), list(range(len(checkers)))
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="learnware-checker")
+    try:
+        while len(pending) or len(running):
+            for i in list(pending):
+                if len(running) >= max_workers:
+                    break
+                if not all(j in finished for j in prerequisites[i]):
+                    continue
+                pending.remove(i)
+                if report.results[i] is None:
+                    timeout = timeouts.get(names[i])
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    running[pool.submit(run_checker, checkers[i])] = (i, deadline)
+                elif finish(i, report.results[i]):
+                    finished.add(i)
+                else:
+                    return
+
+            if len(running) == 0:
+                if len(pending) == 0:
+                    break
+                if any(all(j in finished for j in prerequisites[i]) for i in pending):
+                    continue
+                raise ValueError(f"The prerequisites of checkers {[names[i] for i in pending]} are cyclic")
+
+            deadlines = [deadline for _, deadline in running.values() if deadline is not None]
+            timeout = None if len(deadlines) == 0 else max(0, min(deadlines) - time.monotonic())
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, _ = running.pop(future)
+                report.results[i], report.timings[names[i]] = future.result()
+                if not finish(i, report.results[i]):
+                    return
+                finished.add(i)
+
+            now = time.monotonic()
+            for future, (i, deadline) in running.items():
+                if deadline is not None and deadline <= now:
+                    logger.warning(f"Checker {names[i]} timed out after {timeouts[names[i]]} seconds")
+                    finish(i, (BaseChecker.INVALID_LEARNWARE, f"Checker {names[i]} timed out"))
+                    return
+    finally:
+        # the checkers not started yet are cancelled, shutdown has no cancel_futures before Python 3.9
+        for future in running:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
 class BaseUserInfo:
     """User Information for searching learnware"""
 
@@ -108,6 +308,10 @@ class LearnwareMarket:
         self.learnware_searcher = searcher
         checker_list = [] if checker_list is None else checker_list
         self.learnware_checker = {checker.__class__.__name__: checker for checker in checker_list}
+        self.ingestion_queue = None
+        self.check_result_cache = None
+        # the report of the last check for diagnostics, including the timings of the checkers
+        self.last_check_report = None
 
         for checker in self.learnware_checker.values():
             checker.reset(organizer=self.learnware_organizer)
@@ -137,30 +341,135 @@ class LearnwareMarket:
     def reload_market(self, **kwargs) -> bool:
         self.learnware_organizer.reload_market(**kwargs)
 
-    def check_learnware(self, zip_path: str, semantic_spec: dict, checker_names: List[str] = None, **kwargs) -> bool:
+    def _get_checkers(self, checker_names: List[str] = None) -> Optional[List[BaseChecker]]:
         try:
-            final_status = BaseChecker.NONUSABLE_LEARNWARE
-            if checker_names is not None and len(checker_names):
-                with tempfile.TemporaryDirectory(prefix="pending_learnware_") as tempdir:
-                    with zipfile.ZipFile(zip_path, mode="r") as z_file:
-                        z_file.extractall(tempdir)
-
-                    pending_learnware = get_learnware_from_dirpath(
-                        id="pending", semantic_spec=semantic_spec, learnware_dirpath=tempdir
-                    )
-                    for name in checker_names:
-                        checker = self.learnware_checker[name]
-                        check_status, message = checker(pending_learnware)
-                        final_status = max(final_status, check_status)
-
-                        if check_status == BaseChecker.INVALID_LEARNWARE:
-                            return BaseChecker.INVALID_LEARNWARE
-            return final_status
-        except Exception as err:
-            traceback.print_exc()
-            logger.warning(f"Check learnware failed! Due to {err}.")
+            return [] if checker_names is None else [self.learnware_checker[name] for name in checker_names]
+        except KeyError as err:
+            logger.warning(f"Check learnware failed! Due to checker {err} is not found.")
+            return None
+
+    def get_check_result_cache(self):
+        """Get the cache of the check results saved in the market database
+
+        Returns
+        -------
+        CheckResultCache
+            The cache, None if it is disabled by C.checker_result_cache or the organizer has no database
+        """
+        from .check_cache import CheckResultCache
+
+        dbops = getattr(self.learnware_organizer, "dbops", None)
+        if not C.checker_result_cache or dbops is None:
+            return None
+        if self.check_result_cache is None or self.check_result_cache.dbops is not dbops:
+            self.check_result_cache = CheckResultCache(dbops)
+        return self.check_result_cache
+
+    def _lookup_check_results(
+        self, zip_path: str, semantic_spec: dict, checkers: List[BaseChecker]
+    ) -> Tuple[Optional[str], List[Optional[Tuple[int, str]]]]:
+        check_cache = self.get_check_result_cache()
+        if check_cache is None:
+            return None, [None] * len(checkers)
+        return check_cache.lookup(zip_path, semantic_spec, checkers)
+
+    def _save_check_results(
+        self,
+        zip_digest: Optional[str],
+        semantic_spec: dict,
+        checkers: List[BaseChecker],
+        cached_results: List[Optional[Tuple[int, str]]],
+        check_results: List[Optional[Tuple[int, str]]],
+    ):
+        check_cache = self.get_check_result_cache()
+        if check_cache is not None:
+            check_cache.update(zip_digest, semantic_spec, checkers, cached_results, check_results)
+
+    def check_learnware(self, zip_path: str, semantic_spec: dict, checker_names: List[str] = None, **kwargs) -> bool:
+        checkers = self._get_checkers(checker_names)
+        if checkers is None:
             return BaseChecker.INVALID_LEARNWARE
 
+        return self._check_learnware_zip(zip_path, semantic_spec, checkers).final_status
+
+    def _check_learnware_zip(
+        self,
+        zip_path: str,
+        semantic_spec: dict,
+        checkers: List[BaseChecker],
+        timeouts: Optional[Dict[str, float]] = None,
+    ) -> CheckReport:
+        zip_digest, cached_results = self._lookup_check_results(zip_path, semantic_spec, checkers)
+        report = check_learnware_zip(zip_path, semantic_spec, checkers, cached_results, timeouts=timeouts)
+        self._save_check_results(zip_digest, semantic_spec, checkers, cached_results, report.results)
+        self.last_check_report = report
+        return report
+
+    def check_learnwares(
+        self,
+        items: List[Tuple[str, dict]],
+        checker_names: List[str] = None,
+        max_workers: int = None,
+        executor: str = "thread",
+    ) -> List[int]:
+        """Check zipped learnwares in parallel
+
+        Parameters
+        ----------
+        items : List[Tuple[str, dict]]
+            The list of (zip_path, semantic_spec) of the learnwares
+        checker_names : List[str], optional
+            List contains checker names, by default None
+        max_workers : int, optional
+            The number of workers, by default None which means using all the cores
+        executor : str, optional
+            The type of worker pool, "process" or "thread", by default "thread".
+            The processes are spawned rather than forked, since the market may hold locks of other threads.
+            The checkers related to the organizer are always run in threads, since the organizer is not shared
+            with other processes.
+
+        Returns
+        -------
+        List[int]
+            The final check_status of each learnware
+        """
+        if executor not in ("process", "thread"):
+            raise ValueError(f"executor must be 'process' or 'thread', not {executor}")
+
+        checkers = self._get_checkers(checker_names)
+        if checkers is None:
+            return [BaseChecker.INVALID_LEARNWARE] * len(items)
+
+        max_workers = os.cpu_count() if max_workers is None else max_workers
+        max_workers = max(1, min(max_workers, len(items)))
+        zip_paths = [zip_path for zip_path, _ in items]
+        semantic_specs = [semantic_spec for _, semantic_spec in items]
+        zip_digests, cached_results_list = [], []
+        for zip_path, semantic_spec in items:
+            zip_digest, cached_results = self._lookup_check_results(zip_path, semantic_spec, checkers)
+            zip_digests.append(zip_digest)
+            cached_results_list.append(cached_results)
+        checkers_list = [checkers] * len(items)
+
+        if max_workers == 1 or len(checkers) == 0:
+            reports = list(map(check_learnware_zip, zip_paths, semantic_specs, checkers_list, cached_results_list))
+        elif executor == "process" and not any(isinstance(checker, OrganizerRelatedChecker) for checker in checkers):
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                reports = list(
+                    pool.map(check_learnware_zip, zip_paths, semantic_specs, checkers_list, cached_results_list)
+                )
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                reports = list(
+                    pool.map(check_learnware_zip, zip_paths, semantic_specs, checkers_list, cached_results_list)
+                )
+
+        for zip_digest, semantic_spec, cached_results, report in zip(
+            zip_digests, semantic_specs, cached_results_list, reports
+        ):
+            self._save_check_results(zip_digest, semantic_spec, checkers, cached_results, report.results)
+        return [report.final_status for report in reports]
+
     def add_learnware(
         self, zip_path: str, semantic_spec: dict, checker_names: List[str] = None, **kwargs
     ) -> Tuple[str, int]:
@@ -187,6 +496,98 @@ class LearnwareMarket:
             zip_path=zip_path, semantic_spec=semantic_spec, check_status=check_status, **kwargs
         )
 
+    def add_learnwares(
+        self,
+        items: List[Tuple[str, dict]],
+        checker_names: List[str] = None,
+        max_workers: int = None,
+        executor: str = "thread",
+        **kwargs,
+    ) -> List[Tuple[str, int]]:
+        """Add learnwares into the market in bulk, e.g., when seeding a new market or replaying a backup.
+
+        The learnwares are checked in parallel, and then added by the organizer, which stages the files in parallel
+        and saves all the records in one transaction.
+
+        Parameters
+        ----------
+        items : List[Tuple[str, dict]]
+            The list of (zip_path, semantic_spec) of the learnwares
+        checker_names : List[str], optional
+            List contains checker names, by default None which means all the checkers
+        max_workers : int, optional
+            The number of workers, by default None which means using all the cores
+        executor : str, optional
+            The type of worker pool used by the checkers, "process" or "thread", by default "thread"
+
+        Returns
+        -------
+        List[Tuple[str, int]]
+            The (model_id, check_status) of each learnware in the order of items, model_id is None for the
+            learnwares which are not added
+        """
+        checker_names = list(self.learnware_checker.keys()) if checker_names is None else checker_names
+        check_status_list = self.check_learnwares(items, checker_names, max_workers=max_workers, executor=executor)
+        return self.learnware_organizer.add_learnwares(
+            [
+                (zip_path, semantic_spec, check_status)
+                for (zip_path, semantic_spec), check_status in zip(items, check_status_list)
+            ],
+            max_workers=max_workers,
+            **kwargs,
+        )
+
+    def start_ingestion_queue(self, **kwargs):
+        """Start the queue checking and adding the submitted learnwares in the background,
+        the pending submissions saved in the market are resumed
+
+        Returns
+        -------
+        IngestionQueue
+            The started queue, see `IngestionQueue` for the arguments
+        """
+        from .ingestion import IngestionQueue
+
+        if self.ingestion_queue is not None:
+            self.ingestion_queue.shutdown()
+        self.ingestion_queue = IngestionQueue(self, **kwargs)
+        return self.ingestion_queue
+
+    def submit_learnware(
+        self, zip_path: str, semantic_spec: dict, checker_names: List[str] = None, priority: int = 0
+    ) -> str:
+        """Submit a learnware without waiting for the checkers, the learnware is checked and added in the background
+
+        Parameters
+        ----------
+        zip_path : str
+            Filepath for learnware model, a zipped file.
+        semantic_spec : dict
+            semantic_spec for new learnware, in dictionary format.
+        checker_names : List[str], optional
+            List contains checker names, by default None which means all the checkers
+        priority : int, optional
+            The learnwares with higher priority are checked first, by default 0
+
+        Returns
+        -------
+        str
+            The id of the submission, which is used by `get_submission_status` and `wait_submission`
+        """
+        if self.ingestion_queue is None:
+            self.start_ingestion_queue()
+        return self.ingestion_queue.submit(zip_path, semantic_spec, checker_names=checker_names, priority=priority)
+
+    def get_submission_status(self, task_id: str) -> Optional[dict]:
+        if self.ingestion_queue is None:
+            self.start_ingestion_queue()
+        return self.ingestion_queue.status(task_id)
+
+    def wait_submission(self, task_id: str, timeout: float = None) -> Optional[dict]:
+        if self.ingestion_queue is None:
+            self.start_ingestion_queue()
+        return self.ingestion_queue.wait(task_id, timeout=timeout)
+
     def search_learnware(self, user_info: BaseUserInfo, check_status: int = None, **kwargs) -> SearchResults:
         """Search learnwares based on user_info from learnwares with check_status
 
@@ -203,7 +604,9 @@ class LearnwareMarket:
         SearchResults
             Search results
         """
-        return self.learnware_searcher(user_info, check_status, **kwargs)
+        # the learnwares are not modified during the search, while searches do not block each other
+        with self.learnware_organizer.lock.read_lock():
+            return self.learnware_searcher(user_info, check_status, **kwargs)
 
     def delete_learnware(self, id: str, **kwargs) -> bool:
         return self.learnware_organizer.delete_learnware(id, **kwargs)
@@ -307,6 +710,8 @@ class LearnwareMarket:
 
 class BaseOrganizer:
     def __init__(self, market_id, **kwargs):
+        # searches share the read lock, and modifications of the learnwares hold the write lock
+        self.lock = ReadWriteLock()
         self.reset(market_id=market_id, **kwargs)
 
     def reset(self, market_id, rebuild=False, **kwargs):
@@ -354,6 +759,23 @@ class BaseOrganizer:
         """
         raise NotImplementedError("add learnware is Not Implemented in BaseOrganizer")
 
+    def add_learnwares(self, items: List[Tuple[str, dict, int]], **kwargs) -> List[Tuple[str, int]]:
+        """Add learnwares into the market in bulk, the learnwares are added one by one by default
+
+        Parameters
+        ----------
+        items : List[Tuple[str, dict, int]]
+            The list of (zip_path, semantic_spec, check_status) of the learnwares
+
+        Returns
+        -------
+        List[Tuple[str, int]]
+            The (model_id, check_status) of each learnware in the order of items
+        """
+        return [
+            self.add_learnware(zip_path, semantic_spec, check_status) for zip_path, semantic_spec, check_status in items
+        ]
+
     def delete_learnware(self, id: str) -> bool:
         """Delete a learnware from market
 
@@ -506,9 +928,32 @@ class BaseChecker:
     NONUSABLE_LEARNWARE = 0
     USABLE_LEARNWARE = 1
 
+    # the names of the checkers which must be finished before this checker starts
+    prerequisites: Tuple[str, ...] = ()
+    # the cached check results are only reused by the checker of the same version
+    version = "1"
+    # whether the check result only depends on the learnware, so that it can be cached by the content
+    cacheable = True
+
     def reset(self, **kwargs):
         pass
 
+    def get_cache_fields(self, semantic_spec: dict) -> Any:
+        """Get the parts of the semantic specification the check result depends on, which are a part of the key of
+        the cached check result besides the zipped learnware
+
+        Parameters
+        ----------
+        semantic_spec : dict
+            The semantic specification of the checked learnware
+
+        Returns
+        -------
+        Any
+            The json serializable fields, the whole semantic specification by default
+        """
+        return semantic_spec
+
     def __call__(self, learnware: Learnware) -> Tuple[int, str]:
         """Check the utility of a learnware
 
@@ -535,6 +980,9 @@ class BaseChecker:
 class OrganizerRelatedChecker(BaseChecker):
     """Here this is the interface for checker who is related to the organizer"""
 
+    # the check result depends on the learnwares in the market
+    cacheable = False
+
     def __init__(self, organizer: BaseOrganizer, **kwargs):
         self.reset(organizer=organizer, **kwargs)
 
@@ -0,0 +1,149 @@
+"""Cache the results of the checkers by the content of the checked learnwares.
+
+The key of a result is the digest of the checker name and version, the zipped learnware and the parts of the
+semantic specification the checker depends on, so re-uploads of identical zips and updates of irrelevant semantic
+specifications are not checked again. The results are saved in the market database. The INVALID results are not
+cached, since they may be caused by transient failures, e.g., a conda env failing to build on a network error.
+
+Invalidate the cached results of a market::
+
+    python -m learnware.market.check_cache --market-id <market_id> [--checker <checker_name>]
+"""
+
+import argparse
+import hashlib
+import json
+from typing import List, Optional, Tuple
+
+from .base import BaseChecker
+from .easy.database_ops import DatabaseOperations
+from ..config import C
+from ..logger import get_module_logger
+
+logger = get_module_logger("check_cache")
+
+
+def get_zip_digest(zip_path: str, chunk_size: int = 1 << 20) -> str:
+    """Compute the sha256 digest of a zipped learnware
+
+    Parameters
+    ----------
+    zip_path : str
+        Filepath for learnware model, a zipped file.
+    chunk_size : int, optional
+        The number of bytes read at a time, by default 1MB
+
+    Returns
+    -------
+    str
+        The hex digest
+    """
+    sha256 = hashlib.sha256()
+    with open(zip_path, "rb") as fin:
+        for chunk in iter(lambda: fin.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class CheckResultCache:
+    def __init__(self, dbops: DatabaseOperations):
+        """
+        Parameters
+        ----------
+        dbops : DatabaseOperations
+            The database of the market where the results are saved
+        """
+        self.dbops = dbops
+
+    @staticmethod
+    def get_key(checker: BaseChecker, zip_digest: str, semantic_spec: dict) -> str:
+        content = [
+            checker.__class__.__name__,
+            checker.version,
+            zip_digest,
+            checker.get_cache_fields(semantic_spec),
+        ]
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, checker: BaseChecker, zip_digest: str, semantic_spec: dict) -> Optional[Tuple[int, str]]:
+        """Get the cached result of a checker
+
+        Returns
+        -------
+        Optional[Tuple[int, str]]
+            The check_status and message, None if the result is not cached or the checker is not cacheable
+        """
+        if not checker.cacheable:
+            return None
+        return self.dbops.get_check_result(self.get_key(checker, zip_digest, semantic_spec))
+
+    def set(self, checker: BaseChecker, zip_digest: str, semantic_spec: dict, check_status: int, message: str):
+        if checker.cacheable and check_status != BaseChecker.INVALID_LEARNWARE:
+            key = self.get_key(checker, zip_digest, semantic_spec)
+            self.dbops.save_check_result(key, checker.__class__.__name__, check_status, message)
+
+    def lookup(
+        self, zip_path: str, semantic_spec: dict, checkers: List[BaseChecker]
+    ) -> Tuple[Optional[str], List[Optional[Tuple[int, str]]]]:
+        """Get the cached results of the checkers for a zipped learnware
+
+        Returns
+        -------
+        Tuple[Optional[str], List[Optional[Tuple[int, str]]]]
+            The digest of the zip, None if it cannot be read, and the cached result of each checker
+        """
+        try:
+            zip_digest = get_zip_digest(zip_path)
+            return zip_digest, [self.get(checker, zip_digest, semantic_spec) for checker in checkers]
+        except Exception as err:
+            logger.warning(f"Lookup cached check results failed! Due to {err}.")
+            return None, [None] * len(checkers)
+
+    def update(
+        self,
+        zip_digest: Optional[str],
+        semantic_spec: dict,
+        checkers: List[BaseChecker],
+        cached_results: List[Optional[Tuple[int, str]]],
+        check_results: List[Optional[Tuple[int, str]]],
+    ):
+        """Save the new results of the checkers returned by `check_learnware_zip`"""
+        if zip_digest is None:
+            return
+
+        for checker, cached_result, check_result in zip(checkers, cached_results, check_results):
+            if cached_result is None and check_result is not None:
+                try:
+                    self.set(checker, zip_digest, semantic_spec, *check_result)
+                except Exception as err:
+                    logger.warning(f"Save the check result of {checker.__class__.__name__} failed! Due to {err}.")
+
+    def invalidate(self, checker_name: str = None) -> int:
+        """Remove the cached results
+
+        Parameters
+        ----------
+        checker_name : str, optional
+            The name of the checker whose results are removed, by default None which means all the checkers
+
+        Returns
+        -------
+        int
+            The number of removed results
+        """
+        return self.dbops.delete_check_results(checker_name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Invalidate the cached results of the checkers of a market")
+    parser.add_argument("--market-id", type=str, required=True, help="id of the market")
+    parser.add_argument("--checker", type=str, default=None, help="name of the checker, all checkers by default")
+    args = parser.parse_args()
+
+    check_cache = CheckResultCache(DatabaseOperations(C.database_url, "market_" + args.market_id))
+    removed_num = check_cache.invalidate(args.checker)
+    print(f"Market {args.market_id}: {removed_num} cached check results removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,17 @@ logger = get_module_logger("market_classes")
 
 
 class CondaChecker(BaseChecker):
+    prerequisites = ("EasySemanticChecker",)
+
     def __init__(self, inner_checker, **kwargs):
         self.inner_checker = inner_checker
+        self.version = f"1-{inner_checker.__class__.__name__}-{inner_checker.version}"
+        self.cacheable = inner_checker.cacheable
         super(CondaChecker, self).__init__(**kwargs)
 
+    def get_cache_fields(self, semantic_spec: dict):
+        return self.inner_checker.get_cache_fields(semantic_spec)
+
     def __call__(self, learnware: Learnware) -> Tuple[int, str]:
         try:
             with LearnwaresContainer(learnware, ignore_error=False) as env_container:
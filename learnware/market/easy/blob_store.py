@@ -0,0 +1,319 @@
+"""Content-addressed storage of the files of a learnware pool.
+
+If hard links are enabled, every file of the zipped and unzipped learnwares is saved once in the store by its sha256
+digest and hard-linked into the learnware directories. The files saved to each learnware path are recorded in its
+manifest, the number of records of a blob is its reference count, and a blob is removed when it is not referenced.
+Otherwise, the files are written to the learnware directories directly as before, and no blob is kept.
+
+The hard-linked files are shared by the learnwares with the same content, so the blobs are read-only (0o444), and the
+files must be replaced (e.g., by `os.replace`) instead of being modified in place. The reference counts are kept by
+the process owning the learnware pool.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+import zipfile
+from shutil import copyfile, copyfileobj, rmtree
+from typing import BinaryIO, Callable, Dict, Optional
+
+from ...logger import get_module_logger
+
+logger = get_module_logger("blob_store")
+
+
+class BlobStore:
+    def __init__(self, root_path: str, hard_link: bool = False):
+        """
+        Parameters
+        ----------
+        root_path : str
+            The directory of the blobs, which should be on the same file system as the learnware directories
+        hard_link : bool, optional
+            Whether to hard-link the read-only blobs into the learnware directories, by default False.
+            The files are written without blobs if False, and the blobs are copied if the file system does not
+            support hard links
+        """
+        self.root_path = root_path
+        self.blob_path = os.path.join(root_path, "objects")
+        self.manifest_path = os.path.join(root_path, "manifests")
+        self.temp_path = os.path.join(root_path, "tmp")
+        self.hard_link = hard_link
+        # guards the reference counts and the removal of the blobs, so that a blob is not removed while it is saved
+        self._lock = threading.Lock()
+        for path in (self.blob_path, self.manifest_path, self.temp_path):
+            os.makedirs(path, exist_ok=True)
+        self._ref_counts = self._count_references()
+
+    def _count_references(self) -> Dict[str, int]:
+        ref_counts = {}
+        for filename in os.listdir(self.manifest_path):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.manifest_path, filename), "r") as fin:
+                    manifest = json.load(fin)
+            except (OSError, ValueError) as err:
+                logger.warning(f"Failed to load the blob manifest {filename} due to {err}")
+                continue
+            for digest in manifest.values():
+                if digest is None:
+                    continue
+                ref_counts[digest] = ref_counts.get(digest, 0) + 1
+        return ref_counts
+
+    def _get_blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_path, digest[:2], digest)
+
+    def _get_manifest_path(self, target_path: str) -> str:
+        target_digest = hashlib.sha256(os.path.abspath(target_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.manifest_path, f"{target_digest}.json")
+
+    def _save_blob(self, fin: BinaryIO, target_path: str, chunk_size: int = 1 << 20) -> Optional[str]:
+        """Hash a stream into a temporary file, which becomes the blob if the blob does not exist,
+        and link or copy the blob to target_path. The blob is referenced until it is released.
+        The stream is written to target_path without a blob if hard links are disabled
+
+        Returns
+        -------
+        Optional[str]
+            The hex digest of the stream, None if no blob is saved
+        """
+        if not self.hard_link:
+            with open(target_path, "wb") as fout:
+                copyfileobj(fin, fout, chunk_size)
+            return None
+
+        sha256 = hashlib.sha256()
+        temp_path = os.path.join(self.temp_path, uuid.uuid4().hex)
+        try:
+            with open(temp_path, "wb") as fout:
+                for chunk in iter(lambda: fin.read(chunk_size), b""):
+                    sha256.update(chunk)
+                    fout.write(chunk)
+            digest = sha256.hexdigest()
+            blob_path = self._get_blob_path(digest)
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+            with self._lock:
+                if not os.path.exists(blob_path):
+                    # the blob may be hard-linked into several learnwares, which must not modify it in place
+                    os.chmod(temp_path, 0o444)
+                    os.replace(temp_path, blob_path)
+                self._ref_counts[digest] = self._ref_counts.get(digest, 0) + 1
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        # the referenced blob is not removed, so it is linked or copied without the lock
+        try:
+            try:
+                os.link(blob_path, target_path)
+            except OSError:
+                copyfile(blob_path, target_path)
+                os.chmod(target_path, 0o644)
+        except BaseException:
+            self._release_blobs([digest])
+            raise
+        return digest
+
+    def _load_manifest(self, target_path: str) -> Dict[str, Optional[str]]:
+        manifest_path = self._get_manifest_path(target_path)
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, "r") as fin:
+            return json.load(fin)
+
+    def _save_manifest(self, target_path: str, manifest: Dict[str, Optional[str]]):
+        manifest_path = self._get_manifest_path(target_path)
+        temp_path = f"{manifest_path}.{uuid.uuid4().hex}"
+        with open(temp_path, "w") as fout:
+            json.dump(manifest, fout)
+        os.replace(temp_path, manifest_path)
+
+    def _release_blobs(self, digests):
+        with self._lock:
+            for digest in digests:
+                if digest is None:
+                    continue
+                ref_count = self._ref_counts.get(digest, 0) - 1
+                if ref_count > 0:
+                    self._ref_counts[digest] = ref_count
+                    continue
+                self._ref_counts.pop(digest, None)
+                try:
+                    os.remove(self._get_blob_path(digest))
+                except FileNotFoundError:
+                    pass
+
+    def save_file(self, file_path: str, target_path: str):
+        """Save a file into the store and link it to target_path, which is replaced atomically
+
+        Parameters
+        ----------
+        file_path : str
+            The file to save
+        target_path : str
+            The path of the file in the learnware pool
+        """
+        temp_path = f"{target_path}.{uuid.uuid4().hex}"
+        try:
+            with open(file_path, "rb") as fin:
+                digest = self._save_blob(fin, temp_path)
+            old_manifest = self._load_manifest(target_path)
+            os.replace(temp_path, target_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self._save_manifest(target_path, {"": digest})
+        self._release_blobs(old_manifest.values())
+
+    def extract_zip(self, zip_path: str, target_path: str, validate: Optional[Callable[[str], bool]] = None) -> bool:
+        """Extract a zipped learnware into target_path, which is replaced atomically by renaming
+
+        Parameters
+        ----------
+        zip_path : str
+            Filepath for learnware model, a zipped file.
+        target_path : str
+            The directory of the unzipped learnware in the learnware pool
+        validate : Optional[Callable[[str], bool]], optional
+            Called with the extracted directory before it replaces target_path, the extraction is discarded if it
+            returns False or raises, by default None
+
+        Returns
+        -------
+        bool
+            A flag indicating whether target_path is replaced
+        """
+        staging_path = f"{target_path}.staging-{uuid.uuid4().hex}"
+        manifest = {}
+        try:
+            os.makedirs(staging_path)
+            with zipfile.ZipFile(zip_path, "r") as z_file:
+                for info in z_file.infolist():
+                    member_path = _get_member_path(staging_path, info.filename)
+                    if info.is_dir():
+                        os.makedirs(member_path, exist_ok=True)
+                        continue
+                    os.makedirs(os.path.dirname(member_path), exist_ok=True)
+                    with z_file.open(info, "r") as fin:
+                        manifest[os.path.relpath(member_path, staging_path)] = self._save_blob(fin, member_path)
+
+            if validate is not None and not validate(staging_path):
+                self._discard(staging_path, manifest.values())
+                return False
+        except Exception:
+            self._discard(staging_path, manifest.values())
+            raise
+
+        old_manifest = self._load_manifest(target_path)
+        old_path = None
+        if os.path.exists(target_path):
+            old_path = f"{target_path}.old-{uuid.uuid4().hex}"
+            os.rename(target_path, old_path)
+        os.rename(staging_path, target_path)
+        self._save_manifest(target_path, manifest)
+        if old_path is not None:
+            rmtree(old_path, ignore_errors=True)
+        self._release_blobs(old_manifest.values())
+        return True
+
+    def _discard(self, path: str, digests):
+        rmtree(path, ignore_errors=True)
+        self._release_blobs(digests)
+
+    def remove(self, target_path: str):
+        """Remove a file or directory of the learnware pool and release its blobs
+
+        Parameters
+        ----------
+        target_path : str
+            The path saved by `save_file` or `extract_zip`
+        """
+        manifest = self._load_manifest(target_path)
+        if os.path.isdir(target_path):
+            rmtree(target_path, ignore_errors=True)
+        elif os.path.exists(target_path):
+            os.remove(target_path)
+        manifest_path = self._get_manifest_path(target_path)
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        self._release_blobs(manifest.values())
+
+    def prune(self, target_path: str, keep: Callable[[str], bool]):
+        """Remove the files of a directory saved by `extract_zip` except the kept ones, and release their blobs
+
+        Parameters
+        ----------
+        target_path : str
+            The directory saved by `extract_zip`
+        keep : Callable[[str], bool]
+            Called with the path of a file relative to target_path, the file is kept if it returns True
+        """
+        manifest = self._load_manifest(target_path)
+        released_digests = []
+        for dirpath, _, filenames in os.walk(target_path, topdown=False):
+            for filename in filenames:
+                relpath = os.path.relpath(os.path.join(dirpath, filename), target_path)
+                if not keep(relpath):
+                    os.remove(os.path.join(dirpath, filename))
+                    if relpath in manifest:
+                        released_digests.append(manifest.pop(relpath))
+            if dirpath != target_path and len(os.listdir(dirpath)) == 0:
+                os.rmdir(dirpath)
+        self._save_manifest(target_path, manifest)
+        self._release_blobs(released_digests)
+
+    def collect_garbage(self) -> int:
+        """Remove the blobs which are not referenced by any manifest, e.g., left by an interrupted market
+
+        Returns
+        -------
+        int
+            The number of removed blobs
+        """
+        removed_num = 0
+        with self._lock:
+            manifest_ref_counts = self._count_references()
+            for dirpath, _, filenames in os.walk(self.blob_path):
+                for filename in filenames:
+                    # the blobs being saved are referenced by this process, but not by the manifests yet
+                    if filename not in manifest_ref_counts and filename not in self._ref_counts:
+                        os.remove(os.path.join(dirpath, filename))
+                        removed_num += 1
+        return removed_num
+
+    def get_usage(self) -> dict:
+        """Get the disk usage of the store
+
+        Returns
+        -------
+        dict
+            - blob_num: the number of blobs
+            - blob_bytes: the bytes of the blobs on the disk
+            - linked_bytes: the bytes of the learnware files referencing the blobs, i.e., the bytes without deduplication
+
+            The blobs are saved only if hard links are enabled, so the usage is zero otherwise
+        """
+        usage = {"blob_num": 0, "blob_bytes": 0, "linked_bytes": 0}
+        with self._lock:
+            ref_counts = dict(self._ref_counts)
+        for dirpath, _, filenames in os.walk(self.blob_path):
+            for filename in filenames:
+                blob_size = os.stat(os.path.join(dirpath, filename)).st_size
+                usage["blob_num"] += 1
+                usage["blob_bytes"] += blob_size
+                usage["linked_bytes"] += blob_size * ref_counts.get(filename, 0)
+        return usage
+
+
+def _get_member_path(root_path: str, member_name: str) -> str:
+    """Get the extracted path of a zip member, the members outside root_path are rejected like `ZipFile.extract`"""
+    parts = [part for part in member_name.replace("\\", "/").split("/") if part not in ("", ".", "..")]
+    member_path = os.path.join(root_path, *parts)
+    if os.path.commonpath([os.path.abspath(root_path), os.path.abspath(member_path)]) != os.path.abspath(root_path):
+        raise ValueError(f"Zip member {member_name} is outside the extracted directory")
+    return member_path
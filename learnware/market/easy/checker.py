@@ -14,6 +14,9 @@ logger = get_module_logger("easy_checker", "INFO")
 
 
 class EasySemanticChecker(BaseChecker):
+    # checking the semantic specification is cheaper than looking up the cache
+    cacheable = False
+
     @staticmethod
     def check_semantic_spec(semantic_spec):
         try:
@@ -67,6 +70,9 @@ class EasySemanticChecker(BaseChecker):
 
 
 class EasyStatChecker(BaseChecker):
+    # the dimensions of the semantic specification are used by the check
+    prerequisites = ("EasySemanticChecker",)
+
     @staticmethod
     def _generate_random_text_list(num, text_type="en", min_len=10, max_len=1000):
         text_list = []
@@ -83,6 +89,14 @@ class EasyStatChecker(BaseChecker):
                 raise ValueError("Type should be en or zh")
         return text_list
 
+    def get_cache_fields(self, semantic_spec: dict) -> dict:
+        # only the types and the dimensions of the semantic specification are checked
+        fields = {key: semantic_spec.get(key) for key in ("Data", "Task")}
+        for key in ("Input", "Output"):
+            spec = semantic_spec.get(key)
+            fields[key] = spec.get("Dimension") if isinstance(spec, dict) else spec
+        return fields
+
     def __call__(self, learnware):
         semantic_spec = learnware.get_specification().get_semantic_spec()
 
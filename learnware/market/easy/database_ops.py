@@ -1,10 +1,18 @@
 import json
+import multiprocessing
 import os
+import pickle
+import time
 import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, Tuple
 
-from sqlalchemy import Column, String, Text, create_engine, text
+from sqlalchemy import Column, Float, Index, Integer, String, Text, bindparam, create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 
+from .semantic_index import iter_semantic_postings, parse_tag_constraints
+from ...config import C
 from ...learnware import get_learnware_from_dirpath
 from ...logger import get_module_logger
 
@@ -22,6 +30,138 @@ class Learnware(DeclarativeBase):
     use_flag = Column(Text, nullable=False)
 
 
+class LearnwareSemantic(DeclarativeBase):
+    """The normalized tags of semantic specifications, one row per (learnware_id, key, kind, value).
+
+    kind is "key" if the learnware has the key, "empty" if the values of the key are empty, "class" for the (first)
+    value matched by Class keys and "tag" for each value matched by Tag keys. The values are saved in json. The
+    learnwares whose tags cannot be saved have one row of kind "unindexed" and are always returned as candidates.
+    """
+
+    __tablename__ = "tb_learnware_semantic"
+    __table_args__ = (
+        Index("ix_learnware_semantic_key_kind_value", "key", "kind", "value"),
+        Index("ix_learnware_semantic_learnware_id", "learnware_id"),
+    )
+
+    row_id = Column(Integer, primary_key=True, autoincrement=True)
+    learnware_id = Column(String(10), nullable=False)
+    key = Column(String(64), nullable=False)
+    kind = Column(String(16), nullable=False)
+    value = Column(String(256), nullable=True)
+
+
+class IngestionTask(DeclarativeBase):
+    """The learnwares submitted to the ingestion queue, which are checked and added in the background"""
+
+    __tablename__ = "tb_ingestion_task"
+    __table_args__ = (Index("ix_ingestion_task_status", "status"),)
+
+    id = Column(String(32), primary_key=True, nullable=False)
+    zip_path = Column(Text, nullable=False)
+    semantic_spec = Column(Text, nullable=False)
+    checker_names = Column(Text, nullable=True)
+    priority = Column(Integer, nullable=False)
+    status = Column(String(16), nullable=False)
+    submit_time = Column(Float, nullable=False)
+    check_status = Column(Integer, nullable=True)
+    learnware_id = Column(String(10), nullable=True)
+    message = Column(Text, nullable=True)
+
+
+class CheckResult(DeclarativeBase):
+    """The cached results of the checkers, keyed by the digest of the checker and the checked content"""
+
+    __tablename__ = "tb_check_result"
+    __table_args__ = (Index("ix_check_result_checker_name", "checker_name"),)
+
+    key = Column(String(64), primary_key=True, nullable=False)
+    checker_name = Column(String(64), nullable=False)
+    check_status = Column(Integer, nullable=False)
+    message = Column(Text, nullable=True)
+    create_time = Column(Float, nullable=False)
+
+
+INGESTION_TASK_COLUMNS = (
+    "id",
+    "zip_path",
+    "semantic_spec",
+    "checker_names",
+    "priority",
+    "status",
+    "submit_time",
+    "check_status",
+    "learnware_id",
+    "message",
+)
+
+
+def _load_ingestion_task_from_record(record) -> dict:
+    task = dict(zip(INGESTION_TASK_COLUMNS, record))
+    task["semantic_spec"] = json.loads(task["semantic_spec"])
+    task["checker_names"] = None if task["checker_names"] is None else json.loads(task["checker_names"])
+    return task
+
+
+SEMANTIC_POSTING_KINDS = {"key_ids": "key", "empty_ids": "empty", "class_postings": "class", "tag_postings": "tag"}
+# the version of the rows in tb_learnware_semantic, the table is rebuilt if it is not up to date
+SEMANTIC_TABLE_VERSION = 1
+
+
+def _get_semantic_rows(id: str, semantic_spec: dict) -> List[dict]:
+    try:
+        rows = []
+        for postings_name, key, value in iter_semantic_postings(semantic_spec):
+            value = None if value is None else json.dumps(value)
+            if len(key) > 64 or (value is not None and len(value) > 256):
+                raise ValueError(f"the tag {key}: {value} is too long")
+            rows.append(dict(learnware_id=id, key=key, kind=SEMANTIC_POSTING_KINDS[postings_name], value=value))
+        return rows
+    except Exception:
+        return [dict(learnware_id=id, key="", kind="unindexed", value=None)]
+
+
+class MarketMeta(DeclarativeBase):
+    __tablename__ = "tb_market_meta"
+
+    key = Column(String(64), primary_key=True, nullable=False)
+    value = Column(Integer, nullable=False)
+
+
+def _load_learnware_from_record(record, serialize=False):
+    """Construct the learnware stored in one row of tb_learnware.
+
+    Parameters
+    ----------
+    record : tuple
+        (id, semantic_spec, zip_path, folder_path, use_flag) selected from tb_learnware
+    serialize : bool, optional
+        Whether to return the learnware as pickled bytes, used when the record is loaded in a worker process
+
+    Returns
+    -------
+    tuple
+        (id, learnware or None, error message or None)
+    """
+    id, semantic_spec, zip_path, folder_path, use_flag = record
+    try:
+        semantic_spec_dict = json.loads(semantic_spec)
+        if "License" not in semantic_spec_dict:
+            semantic_spec_dict["License"] = {
+                "Values": ["Apache-2.0"],
+                "Type": "Class",
+            }
+        new_learnware = get_learnware_from_dirpath(
+            id=id, semantic_spec=semantic_spec_dict, learnware_dirpath=folder_path, ignore_error=False
+        )
+    except Exception as err:
+        return id, None, f"{err}\n{traceback.format_exc()}"
+
+    if serialize:
+        new_learnware = pickle.dumps(new_learnware)
+    return id, new_learnware, None
+
+
 class DatabaseOperations(object):
     def __init__(self, url: str, database_name: str):
         if url.startswith("sqlite"):
@@ -73,12 +213,122 @@ class DatabaseOperations(object):
 
         self.engine = create_engine(url, future=True)
 
-        if not database_exists:
-            DeclarativeBase.metadata.create_all(self.engine)
+        # tables are created with checkfirst, so that new tables are also added to existing databases
+        DeclarativeBase.metadata.create_all(self.engine)
+        self._build_semantic_table_if_outdated()
+
+    def _build_semantic_table_if_outdated(self):
+        """Fill tb_learnware_semantic from tb_learnware for databases created before the table existed"""
+        with self.engine.connect() as conn:
+            r = conn.execute(text("SELECT value FROM tb_market_meta WHERE key='semantic_table_version';"))
+            row = r.fetchone()
+            if row is not None and int(row[0]) == SEMANTIC_TABLE_VERSION:
+                return
+
+            conn.execute(text("DELETE FROM tb_learnware_semantic;"))
+            rows = []
+            for id, semantic_spec in conn.execute(text("SELECT id, semantic_spec FROM tb_learnware;")):
+                rows.extend(_get_semantic_rows(id.strip(), json.loads(semantic_spec)))
+            self._insert_semantic_rows(conn, rows)
+
+            conn.execute(text("DELETE FROM tb_market_meta WHERE key='semantic_table_version';"))
+            conn.execute(
+                text("INSERT INTO tb_market_meta (key, value) VALUES ('semantic_table_version', :value);"),
+                dict(value=SEMANTIC_TABLE_VERSION),
+            )
+            conn.commit()
+
+    @staticmethod
+    def _insert_semantic_rows(conn, rows: List[dict]):
+        if len(rows) > 0:
+            conn.execute(
+                text(
+                    "INSERT INTO tb_learnware_semantic (learnware_id, key, kind, value) "
+                    "VALUES (:learnware_id, :key, :kind, :value);"
+                ),
+                rows,
+            )
+
+    @staticmethod
+    def _increase_meta_value(conn, key: str, step: int = 1, initial_value: Callable[[], int] = lambda: 0):
+        """Increase a meta value, which is created by initial_value on the first use"""
+        update = text("UPDATE tb_market_meta SET value=value+:step WHERE key=:key;")
+        if conn.execute(update, dict(key=key, step=step)).rowcount == 0:
+            # the row may be created by another process at the same time, which is kept
+            conn.execute(
+                text("INSERT INTO tb_market_meta (key, value) VALUES (:key, :value) ON CONFLICT (key) DO NOTHING;"),
+                dict(key=key, value=initial_value()),
+            )
+            conn.execute(update, dict(key=key, step=step))
+
+    def get_generation(self) -> int:
+        """Get the generation of the market, which is increased by every modification of the learnware table
+
+        Returns
+        -------
+        int
+            The current generation number
+        """
+        with self.engine.connect() as conn:
+            r = conn.execute(text("SELECT value FROM tb_market_meta WHERE key='generation';"))
+            row = r.fetchone()
+            return 0 if row is None else int(row[0])
+
+    def get_meta_value(self, key: str, default: int = 0) -> int:
+        """Get a meta value of the market, default if it is not set"""
+        with self.engine.connect() as conn:
+            r = conn.execute(text("SELECT value FROM tb_market_meta WHERE key=:key;"), dict(key=key))
+            row = r.fetchone()
+            return default if row is None else int(row[0])
+
+    def set_meta_value(self, key: str, value: int):
+        with self.engine.connect() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO tb_market_meta (key, value) VALUES (:key, :value) "
+                    "ON CONFLICT (key) DO UPDATE SET value=:value;"
+                ),
+                dict(key=key, value=value),
+            )
+            conn.commit()
+
+    def allocate_learnware_ids(self, num: int = 1) -> int:
+        """Allocate consecutive learnware ids atomically, the ids are never reused even if learnwares are deleted
+
+        Parameters
+        ----------
+        num : int, optional
+            The number of ids, by default 1
+
+        Returns
+        -------
+        int
+            The first allocated id
+        """
+
+        def get_first_id() -> int:
+            # the counter starts after the existing learnwares
+            r = conn.execute(text("SELECT id FROM tb_learnware;"))
+            return max((int(row[0]) + 1 for row in r.fetchall() if row[0].isdigit()), default=0)
+
+        with self.engine.connect() as conn:
+            self._increase_meta_value(conn, "next_learnware_id", num, initial_value=get_first_id)
+            r = conn.execute(text("SELECT value FROM tb_market_meta WHERE key='next_learnware_id';"))
+            next_id = int(r.fetchone()[0])
+            conn.commit()
+        return next_id - num
 
     def clear_learnware_table(self):
         with self.engine.connect() as conn:
             conn.execute(text("DELETE FROM tb_learnware;"))
+            conn.execute(text("DELETE FROM tb_learnware_semantic;"))
+            conn.execute(text("DELETE FROM tb_market_meta WHERE key='next_learnware_id';"))
+            self._increase_meta_value(conn, "generation")
+            conn.commit()
+
+    def clear_ingestion_task_table(self):
+        with self.engine.connect() as conn:
+            conn.execute(text("DELETE FROM tb_ingestion_task;"))
             conn.commit()
 
     def add_learnware(self, id: str, semantic_spec: dict, zip_path, folder_path, use_flag: str):
@@ -87,7 +337,7 @@ class DatabaseOperations(object):
             conn.execute(
                 text(
                     (
-                        "INSERT INTO tb_learnware (id, semantic_spec, zip_path, folder_path, use_flag)"
+                        "INSERT INTO tb_learnware (id, semantic_spec, zip_path, folder_path, use_flag) "
                         "VALUES (:id, :semantic_spec, :zip_path, :folder_path, :use_flag);"
                     )
                 ),
@@ -99,11 +349,45 @@ class DatabaseOperations(object):
                     use_flag=use_flag,
                 ),
             )
+            self._insert_semantic_rows(conn, _get_semantic_rows(id, semantic_spec))
+            self._increase_meta_value(conn, "generation")
+            conn.commit()
+
+    def add_learnwares(self, records: List[dict]):
+        """Add learnwares in one transaction, the generation is increased once
+
+        Parameters
+        ----------
+        records : List[dict]
+            The records with keys id, semantic_spec, zip_path, folder_path and use_flag
+        """
+        if len(records) == 0:
+            return
+
+        learnware_rows, semantic_rows = [], []
+        for record in records:
+            learnware_rows.append(dict(record, semantic_spec=json.dumps(record["semantic_spec"])))
+            semantic_rows.extend(_get_semantic_rows(record["id"], record["semantic_spec"]))
+
+        with self.engine.connect() as conn:
+            conn.execute(
+                text(
+                    (
+                        "INSERT INTO tb_learnware (id, semantic_spec, zip_path, folder_path, use_flag) "
+                        "VALUES (:id, :semantic_spec, :zip_path, :folder_path, :use_flag);"
+                    )
+                ),
+                learnware_rows,
+            )
+            self._insert_semantic_rows(conn, semantic_rows)
+            self._increase_meta_value(conn, "generation")
             conn.commit()
 
     def delete_learnware(self, id: str):
         with self.engine.connect() as conn:
             conn.execute(text("DELETE FROM tb_learnware WHERE id=:id;"), dict(id=id))
+            conn.execute(text("DELETE FROM tb_learnware_semantic WHERE learnware_id=:id;"), dict(id=id))
+            self._increase_meta_value(conn, "generation")
             conn.commit()
 
     def update_learnware_semantic_specification(self, id: str, semantic_spec: dict):
@@ -113,6 +397,9 @@ class DatabaseOperations(object):
                 text("UPDATE tb_learnware SET semantic_spec=:semantic_spec WHERE id=:id;"),
                 dict(id=id, semantic_spec=semantic_spec_str),
             )
+            conn.execute(text("DELETE FROM tb_learnware_semantic WHERE learnware_id=:id;"), dict(id=id))
+            self._insert_semantic_rows(conn, _get_semantic_rows(id, semantic_spec))
+            self._increase_meta_value(conn, "generation")
             conn.commit()
 
     def update_learnware_use_flag(self, id: str, use_flag: str):
@@ -121,6 +408,7 @@ class DatabaseOperations(object):
                 text("UPDATE tb_learnware SET use_flag=:use_flag WHERE id=:id;"),
                 dict(id=id, use_flag=use_flag),
             )
+            self._increase_meta_value(conn, "generation")
             conn.commit()
 
     def get_learnware_semantic_specification(self, id: str):
@@ -132,6 +420,61 @@ class DatabaseOperations(object):
             else:
                 return json.loads(row[0])
 
+    def get_learnware_ids_by_semantic_spec(
+        self, semantic_spec: dict, use_flag: Optional[int] = None
+    ) -> Optional[List[str]]:
+        """Select the candidate learnwares whose tags are consistent with the user semantic specification.
+
+        The tags are matched in the same way as the semantic searchers, while the name and description are not
+        matched. The learnwares whose tags cannot be saved in tb_learnware_semantic are always returned, so the
+        result is a superset of the exact result.
+
+        Parameters
+        ----------
+        semantic_spec : dict
+            The semantic specification of the user
+        use_flag : int, optional
+            Only select the learnwares with the use_flag, by default None which means all the learnwares
+
+        Returns
+        -------
+        Optional[List[str]]
+            The ids of the candidate learnwares in descending order, None if the tags of semantic_spec cannot be
+            matched in the database
+        """
+        constraints = parse_tag_constraints(semantic_spec)
+        if constraints is None:
+            return None
+
+        conditions, params, bindparams = [], {}, []
+        for i, (key, key_type, values) in enumerate(constraints):
+            params[f"key_{i}"] = key
+            has_key = f"SELECT 1 FROM tb_learnware_semantic s WHERE s.learnware_id=l.id AND s.key=:key_{i}"
+            if key_type in ("Class", "Tag"):
+                try:
+                    params[f"values_{i}"] = sorted({json.dumps(value) for value in values})
+                except (TypeError, ValueError):
+                    return None
+                bindparams.append(bindparam(f"values_{i}", expanding=True))
+                kind = "class" if key_type == "Class" else "tag"
+                conditions.append(
+                    f"(NOT EXISTS ({has_key}) OR EXISTS ({has_key} AND s.kind='{kind}' AND s.value IN :values_{i}))"
+                )
+            else:
+                conditions.append(f"NOT EXISTS ({has_key} AND s.kind='empty')")
+
+        unindexed = "SELECT 1 FROM tb_learnware_semantic s WHERE s.learnware_id=l.id AND s.kind='unindexed'"
+        conditions = [f"(EXISTS ({unindexed}) OR ({' AND '.join(conditions) if conditions else '1=1'}))"]
+        if use_flag is not None:
+            conditions.append("l.use_flag=:use_flag")
+            params["use_flag"] = str(use_flag)
+
+        query = text(f"SELECT l.id FROM tb_learnware l WHERE {' AND '.join(conditions)} ORDER BY l.id DESC;")
+        if len(bindparams) > 0:
+            query = query.bindparams(*bindparams)
+        with self.engine.connect() as conn:
+            return [row[0].strip() for row in conn.execute(query, params)]
+
     def get_learnware_use_flag(self, id: str):
         with self.engine.connect() as conn:
             r = conn.execute(text("SELECT use_flag FROM tb_learnware WHERE id=:id;"), dict(id=id))
@@ -141,6 +484,103 @@ class DatabaseOperations(object):
             else:
                 return int(row[0])
 
+    def add_ingestion_task(self, task: dict):
+        """Save a new task of the ingestion queue
+
+        Parameters
+        ----------
+        task : dict
+            The task with keys id, zip_path, semantic_spec, checker_names, priority, status and submit_time
+        """
+        with self.engine.connect() as conn:
+            conn.execute(
+                text(
+                    "INSERT INTO tb_ingestion_task (id, zip_path, semantic_spec, checker_names, priority, status, "
+                    "submit_time) VALUES (:id, :zip_path, :semantic_spec, :checker_names, :priority, :status, "
+                    ":submit_time);"
+                ),
+                dict(
+                    task,
+                    semantic_spec=json.dumps(task["semantic_spec"]),
+                    checker_names=None if task["checker_names"] is None else json.dumps(task["checker_names"]),
+                ),
+            )
+            conn.commit()
+
+    def update_ingestion_task(self, id: str, **kwargs):
+        """Update the columns of a task of the ingestion queue, e.g., status, check_status, learnware_id and message"""
+        invalid_columns = set(kwargs) - set(INGESTION_TASK_COLUMNS[5:])
+        if len(invalid_columns):
+            raise ValueError(f"Ingestion task columns {invalid_columns} cannot be updated")
+
+        with self.engine.connect() as conn:
+            assignments = ", ".join(f"{column}=:{column}" for column in kwargs)
+            conn.execute(text(f"UPDATE tb_ingestion_task SET {assignments} WHERE id=:id;"), dict(kwargs, id=id))
+            conn.commit()
+
+    def get_ingestion_task(self, id: str) -> Optional[dict]:
+        with self.engine.connect() as conn:
+            r = conn.execute(
+                text(f"SELECT {', '.join(INGESTION_TASK_COLUMNS)} FROM tb_ingestion_task WHERE id=:id;"), dict(id=id)
+            )
+            row = r.fetchone()
+            return None if row is None else _load_ingestion_task_from_record(row)
+
+    def get_ingestion_tasks(self, status_list: List[str]) -> List[dict]:
+        """Get the tasks of the ingestion queue in the given status, in the order of submission"""
+        with self.engine.connect() as conn:
+            r = conn.execute(
+                text(
+                    f"SELECT {', '.join(INGESTION_TASK_COLUMNS)} FROM tb_ingestion_task "
+                    "WHERE status IN :status_list ORDER BY submit_time;"
+                ).bindparams(bindparam("status_list", expanding=True)),
+                dict(status_list=list(status_list)),
+            )
+            return [_load_ingestion_task_from_record(row) for row in r.fetchall()]
+
+    def get_check_result(self, key: str) -> Optional[Tuple[int, str]]:
+        with self.engine.connect() as conn:
+            r = conn.execute(text("SELECT check_status, message FROM tb_check_result WHERE key=:key;"), dict(key=key))
+            row = r.fetchone()
+            return None if row is None else (int(row[0]), row[1])
+
+    def save_check_result(self, key: str, checker_name: str, check_status: int, message: str):
+        with self.engine.connect() as conn:
+            conn.execute(text("DELETE FROM tb_check_result WHERE key=:key;"), dict(key=key))
+            conn.execute(
+                text(
+                    "INSERT INTO tb_check_result (key, checker_name, check_status, message, create_time) "
+                    "VALUES (:key, :checker_name, :check_status, :message, :create_time);"
+                ),
+                dict(
+                    key=key,
+                    checker_name=checker_name,
+                    check_status=check_status,
+                    message=message,
+                    create_time=time.time(),
+                ),
+            )
+            conn.commit()
+
+    def delete_check_results(self, checker_name: str = None) -> int:
+        """Delete the cached results of a checker, or of all the checkers if checker_name is None
+
+        Returns
+        -------
+        int
+            The number of deleted results
+        """
+        with self.engine.connect() as conn:
+            if checker_name is None:
+                r = conn.execute(text("DELETE FROM tb_check_result;"))
+            else:
+                r = conn.execute(
+                    text("DELETE FROM tb_check_result WHERE checker_name=:checker_name;"),
+                    dict(checker_name=checker_name),
+                )
+            conn.commit()
+            return r.rowcount
+
     def get_learnware_info(self, id: str):
         with self.engine.connect() as conn:
             r = conn.execute(
@@ -162,40 +602,77 @@ class DatabaseOperations(object):
                     "use_flag": use_flag,
                 }
 
-    def load_market(self):
+    def load_market(self, max_workers: int = None, executor: str = None):
+        """Load all learnwares recorded in the database.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            The number of workers used to construct learnwares, by default C.market_reload_workers.
+            None means using all the cores; 1 means loading learnwares sequentially.
+        executor : str, optional
+            The type of worker pool, "process" or "thread", by default C.market_reload_executor.
+            The processes are only used for the markets of at least C.market_reload_process_threshold learnwares
+
+        Returns
+        -------
+        tuple
+            learnware_list, zip_list, folder_list, use_flags and the number of loaded learnwares
+        """
+        max_workers = C.get("market_reload_workers") if max_workers is None else max_workers
+        max_workers = os.cpu_count() if max_workers is None else max_workers
+        executor = C.get("market_reload_executor", "thread") if executor is None else executor
+        if executor not in ("process", "thread"):
+            raise ValueError(f"executor must be 'process' or 'thread', not {executor}")
+
         with self.engine.connect() as conn:
             cursor = conn.execute(
                 text("SELECT id, semantic_spec, zip_path, folder_path, use_flag FROM tb_learnware ORDER BY id DESC;")
             )
+            records = [
+                (id.strip(), semantic_spec, zip_path, folder_path, use_flag)
+                for id, semantic_spec, zip_path, folder_path, use_flag in cursor
+            ]
 
-            learnware_list = {}
-            zip_list = {}
-            folder_list = {}
-            use_flags = {}
-            max_count = 0
+        max_workers = max(1, min(max_workers, len(records)))
+        if max_workers == 1:
+            results = [_load_learnware_from_record(record) for record in records]
+        elif executor == "process" and len(records) >= C.get("market_reload_process_threshold", 0):
+            chunksize = max(1, len(records) // (max_workers * 4))
+            # the market may run threads holding locks, which are unsafe to fork
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results = list(
+                    pool.map(partial(_load_learnware_from_record, serialize=True), records, chunksize=chunksize)
+                )
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_load_learnware_from_record, records))
 
-            for id, semantic_spec, zip_path, folder_path, use_flag in cursor:
-                id = id.strip()
-                try:
-                    semantic_spec_dict = json.loads(semantic_spec)
-                    if "License" not in semantic_spec_dict:
-                        semantic_spec_dict["License"] = {
-                            "Values": ["Apache-2.0"],
-                            "Type": "Class",
-                        }
-                    new_learnware = get_learnware_from_dirpath(
-                        id=id, semantic_spec=semantic_spec_dict, learnware_dirpath=folder_path, ignore_error=False
-                    )
-                    logger.info(f"Load learnware {id} succeed!")
-                except Exception as err:
-                    traceback.print_exc()
-                    logger.info(f"Load learnware {id} failed due to {err}!")
-                    continue
-
-                learnware_list[id] = new_learnware
-                zip_list[id] = zip_path
-                folder_list[id] = folder_path
-                use_flags[id] = int(use_flag)
-                max_count += 1
+        learnware_list = {}
+        zip_list = {}
+        folder_list = {}
+        use_flags = {}
+        max_count = 0
+        failed_ids = []
+
+        # results are merged in the order of records, which is the same as loading sequentially
+        for (id, semantic_spec, zip_path, folder_path, use_flag), (_, new_learnware, error) in zip(records, results):
+            if error is not None:
+                logger.info(f"Load learnware {id} failed due to {error}")
+                failed_ids.append(id)
+                continue
+
+            if isinstance(new_learnware, bytes):
+                new_learnware = pickle.loads(new_learnware)
+            logger.info(f"Load learnware {id} succeed!")
+
+            learnware_list[id] = new_learnware
+            zip_list[id] = zip_path
+            folder_list[id] = folder_path
+            use_flags[id] = int(use_flag)
+            max_count += 1
+
+        if len(failed_ids) > 0:
+            logger.warning(f"{len(failed_ids)} of {len(records)} learnwares failed to load: {failed_ids}")
 
         return learnware_list, zip_list, folder_list, use_flags, max_count
@@ -0,0 +1,153 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Set
+
+from .blob_store import BlobStore
+from ...config import C
+from ...logger import get_module_logger
+from ...utils import read_yaml_to_dict
+
+logger = get_module_logger("folder_cache")
+
+# the file marking an evicted learnware folder, which only keeps learnware.yaml and the statistical specifications
+EVICTED_MARKER = ".learnware_evicted"
+
+
+def get_folder_size(folder_path: str) -> int:
+    size = 0
+    for dirpath, _, filenames in os.walk(folder_path):
+        for filename in filenames:
+            size += os.path.getsize(os.path.join(dirpath, filename))
+    return size
+
+
+def get_spec_file_names(folder_path: str) -> Set[str]:
+    """Get the files needed to load a learnware without its model, i.e., learnware.yaml and the statistical
+    specifications, see `get_learnware_from_dirpath`"""
+    yaml_file = C.learnware_folder_config["yaml_file"]
+    yaml_config = read_yaml_to_dict(os.path.join(folder_path, yaml_file))
+    stat_spec_configs = yaml_config.get("stat_specifications", [{"file_name": "stat_spec.json"}])
+    return {yaml_file} | {os.path.normpath(stat_spec["file_name"]) for stat_spec in stat_spec_configs}
+
+
+class FolderCache:
+    """Bound the disk usage of the unzipped learnware folders like a LRU cache.
+
+    When the folders exceed the budget, the least recently used folders are evicted, i.e., only the files needed to
+    load the learnwares without their models are kept. An evicted folder is extracted again from the zipped learnware
+    when it is used, and the extraction of a folder is guarded by its own lock, so concurrent users of a folder wait
+    for one extraction.
+    """
+
+    def __init__(self, blob_store: BlobStore, budget: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        blob_store : BlobStore
+            The store of the learnware files
+        budget : Optional[int], optional
+            The maximum bytes of the unzipped learnware folders, by default None which means no limit
+        """
+        self.blob_store = blob_store
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._folder_sizes = OrderedDict()  # folder_path: bytes, the least recently used first
+        self._folder_locks = {}
+
+    @property
+    def total_size(self) -> int:
+        with self._lock:
+            return sum(self._folder_sizes.values())
+
+    def get_folder_lock(self, folder_path: str) -> threading.Lock:
+        with self._lock:
+            return self._folder_locks.setdefault(folder_path, threading.Lock())
+
+    @staticmethod
+    def is_evicted(folder_path: str) -> bool:
+        return os.path.exists(os.path.join(folder_path, EVICTED_MARKER))
+
+    def add(self, folder_path: str):
+        """Record a folder which is extracted or replaced, the size of the folder is computed only if there is a budget"""
+        if self.budget is None:
+            return
+        folder_size = get_folder_size(folder_path)
+        with self._lock:
+            self._folder_sizes[folder_path] = folder_size
+            self._folder_sizes.move_to_end(folder_path)
+
+    def remove(self, folder_path: str):
+        with self._lock:
+            self._folder_sizes.pop(folder_path, None)
+            self._folder_locks.pop(folder_path, None)
+
+    def restore(self, folder_path: str, zip_path: str) -> bool:
+        """Mark a folder as recently used, and extract it again if it is evicted
+
+        Returns
+        -------
+        bool
+            A flag indicating whether the folder is extracted
+        """
+        with self._lock:
+            if folder_path in self._folder_sizes:
+                self._folder_sizes.move_to_end(folder_path)
+        if not self.is_evicted(folder_path):
+            return False
+
+        with self.get_folder_lock(folder_path):
+            if not self.is_evicted(folder_path):
+                return False
+            logger.info(f"Restore the evicted learnware folder {folder_path}")
+            self.blob_store.extract_zip(zip_path, folder_path)
+            self.add(folder_path)
+        self.evict(exclude=folder_path)
+        return True
+
+    def evict(self, exclude: Optional[str] = None) -> int:
+        """Evict the least recently used folders until the folders fit the budget
+
+        Parameters
+        ----------
+        exclude : Optional[str], optional
+            The folder which should not be evicted, e.g., the one just restored, by default None
+
+        Returns
+        -------
+        int
+            The number of evicted folders
+        """
+        if self.budget is None:
+            return 0
+
+        evicted_num = 0
+        with self._lock:
+            candidates = list(self._folder_sizes.keys())
+        for folder_path in candidates:
+            if self.total_size <= self.budget:
+                break
+            if folder_path == exclude:
+                continue
+
+            folder_lock = self.get_folder_lock(folder_path)
+            # the folders being restored or replaced are skipped
+            if not folder_lock.acquire(blocking=False):
+                continue
+            try:
+                if not os.path.isdir(folder_path) or self.is_evicted(folder_path):
+                    continue
+                kept_file_names = get_spec_file_names(folder_path) | {EVICTED_MARKER}
+                # the marker is written first, so that an interrupted eviction is restored as a whole
+                with open(os.path.join(folder_path, EVICTED_MARKER), "w"):
+                    pass
+                self.blob_store.prune(folder_path, keep=lambda relpath: os.path.normpath(relpath) in kept_file_names)
+                with self._lock:
+                    if folder_path in self._folder_sizes:
+                        self._folder_sizes[folder_path] = get_folder_size(folder_path)
+                evicted_num += 1
+            except Exception as err:
+                logger.warning(f"Evict the learnware folder {folder_path} failed! Due to {err}.")
+            finally:
+                folder_lock.release()
+        return evicted_num
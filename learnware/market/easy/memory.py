@@ -0,0 +1,151 @@
+import sys
+from collections import defaultdict
+from typing import Dict
+
+import numpy as np
+
+from ...learnware import Learnware
+from ...utils import is_torch_available
+
+
+def _freeze(value):
+    """Convert a json-like value into a hashable key, dicts and lists are tagged to avoid collisions"""
+    if isinstance(value, dict):
+        return (dict, tuple((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return (list, tuple(_freeze(v) for v in value))
+    return value
+
+
+class SemanticSpecInterner:
+    """The dedup table of semantic specifications.
+
+    The values of the shared keys (e.g., "Data", "Task", "Scenario", "Input") are identical for many learnwares,
+    they are replaced with one shared object. The interned semantic specifications must be treated as immutable,
+    which is guaranteed by the organizer copying the semantic specifications it receives.
+    """
+
+    # name and description are different for almost every learnware
+    UNSHARED_KEYS = ("Name", "Description")
+
+    def __init__(self):
+        self.table = {}
+
+    def intern(self, semantic_spec: dict) -> dict:
+        """Return a semantic specification equal to the given one whose values are shared with other ones
+
+        Parameters
+        ----------
+        semantic_spec : dict
+            The semantic specification
+
+        Returns
+        -------
+        dict
+            The interned semantic specification
+        """
+        if not isinstance(semantic_spec, dict):
+            return semantic_spec
+
+        interned = {}
+        for key, value in semantic_spec.items():
+            key = sys.intern(key) if isinstance(key, str) else key
+            if key not in self.UNSHARED_KEYS:
+                try:
+                    value = self.table.setdefault(_freeze(value), value)
+                except TypeError:
+                    pass
+            interned[key] = value
+        return interned
+
+    def intern_learnware(self, learnware: Learnware):
+        specification = learnware.get_specification()
+        specification.update_semantic_spec(self.intern(specification.get_semantic_spec()))
+
+    def clear(self):
+        self.table.clear()
+
+    def __len__(self):
+        return len(self.table)
+
+
+def _deep_getsizeof(obj, seen: set) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_getsizeof(k, seen) + _deep_getsizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_getsizeof(v, seen) for v in obj)
+    return size
+
+
+def _array_nbytes(value):
+    """Return the bytes of an array and the bytes it would take in float64, None if value is not an array"""
+    if isinstance(value, np.ndarray):
+        itemsize = 8 if np.issubdtype(value.dtype, np.floating) else value.itemsize
+        return value.nbytes, value.size * itemsize
+
+    if is_torch_available(verbose=False):
+        import torch
+
+        if torch.is_tensor(value):
+            itemsize = 8 if value.is_floating_point() else value.element_size()
+            return value.nelement() * value.element_size(), value.nelement() * itemsize
+
+    return None
+
+
+def get_memory_report(learnware_list: Dict[str, Learnware]) -> dict:
+    """Estimate the memory used by the learnwares of a market
+
+    Parameters
+    ----------
+    learnware_list : Dict[str, Learnware]
+        The learnwares of the market
+
+    Returns
+    -------
+    dict
+        - learnware_num: the number of learnwares
+        - object_bytes: the bytes of learnware, specification and statistical specification objects
+        - semantic_spec_bytes: the bytes of semantic specifications, shared objects are counted once
+        - semantic_spec_unshared_bytes: the bytes of semantic specifications if nothing were shared
+        - stat_spec_bytes: the bytes of the arrays of statistical specifications, by specification type
+        - stat_spec_float64_bytes: the bytes of the same arrays if they were stored in float64
+        - total_bytes: object_bytes + semantic_spec_bytes + all stat_spec_bytes
+    """
+    object_bytes = 0
+    semantic_spec_bytes, semantic_spec_unshared_bytes = 0, 0
+    stat_spec_bytes, stat_spec_float64_bytes = defaultdict(int), defaultdict(int)
+    semantic_seen = set()
+
+    for learnware in learnware_list.values():
+        specification = learnware.get_specification()
+        object_bytes += sys.getsizeof(learnware) + sys.getsizeof(specification)
+
+        semantic_spec = specification.get_semantic_spec()
+        semantic_spec_bytes += _deep_getsizeof(semantic_spec, semantic_seen)
+        semantic_spec_unshared_bytes += _deep_getsizeof(semantic_spec, set())
+
+        for spec_type, stat_spec in specification.get_stat_spec().items():
+            object_bytes += sys.getsizeof(stat_spec)
+            if hasattr(stat_spec, "__dict__"):
+                object_bytes += sys.getsizeof(stat_spec.__dict__)
+            for value in stat_spec.get_states().values():
+                nbytes = _array_nbytes(value)
+                if nbytes is not None:
+                    stat_spec_bytes[spec_type] += nbytes[0]
+                    stat_spec_float64_bytes[spec_type] += nbytes[1]
+
+    return {
+        "learnware_num": len(learnware_list),
+        "object_bytes": object_bytes,
+        "semantic_spec_bytes": semantic_spec_bytes,
+        "semantic_spec_unshared_bytes": semantic_spec_unshared_bytes,
+        "stat_spec_bytes": dict(stat_spec_bytes),
+        "stat_spec_float64_bytes": dict(stat_spec_float64_bytes),
+        "total_bytes": object_bytes + semantic_spec_bytes + sum(stat_spec_bytes.values()),
+    }
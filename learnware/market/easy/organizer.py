@@ -1,23 +1,40 @@
 import copy
 import os
-import tempfile
-import zipfile
-from shutil import copyfile, rmtree
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from shutil import rmtree
 from typing import Dict, List, Tuple, Union
 
+from .blob_store import BlobStore
 from .database_ops import DatabaseOperations
+from .folder_cache import FolderCache
+from .memory import SemanticSpecInterner, get_memory_report
+from .semantic_index import SemanticIndex
+from .snapshot import load_market_snapshot, write_market_snapshot
+from .text_index import TextIndex, get_semantic_spec_texts
 from ..base import BaseChecker, BaseOrganizer
 from ...config import C as conf
 from ...learnware import Learnware, get_learnware_from_dirpath
+from ...learnware.base import register_folder_restorer
 from ...logger import get_module_logger
+from ...utils import unload_modules_in_dirpath
+from ...utils.lock import read_locked, write_locked
 
 logger = get_module_logger("easy_organizer")
 
 
 class EasyOrganizer(BaseOrganizer):
-    def reload_market(self, rebuild=False) -> bool:
+    @write_locked
+    def reload_market(self, rebuild=False, max_workers: int = None) -> bool:
         """Reload the learnware organizer when server restarted.
 
+        Parameters
+        ----------
+        rebuild : bool, optional
+            A flag indicating whether to clear the current market, by default False
+        max_workers : int, optional
+            The number of workers used to load learnwares, by default C.market_reload_workers
+
         Returns
         -------
         bool
@@ -27,31 +44,262 @@ class EasyOrganizer(BaseOrganizer):
         self.learnware_pool_path = os.path.join(self.market_store_path, "learnware_pool")
         self.learnware_zip_pool_path = os.path.join(self.learnware_pool_path, "zips")
         self.learnware_folder_pool_path = os.path.join(self.learnware_pool_path, "unzipped_learnwares")
+        self.snapshot_path = os.path.join(self.market_store_path, "market_snapshot.bin")
+        self.text_index_path = os.path.join(self.market_store_path, "text_index.json")
         self.learnware_list = {}  # id: Learnware
         self.learnware_zip_list = {}
         self.learnware_folder_list = {}
         self.use_flags = {}
         self.count = 0
+        # increased by every modification of the learnwares, which invalidates the cached id tuples
+        self.learnware_generation = 0
+        self._learnware_cache = {}
+        # the cache is filled by the readers, which share the read lock
+        self._learnware_cache_lock = threading.Lock()
+        self.semantic_interner = SemanticSpecInterner()
+        self.semantic_index = SemanticIndex()
+        self.text_index = TextIndex()
         self.dbops = DatabaseOperations(conf.database_url, "market_" + self.market_id)
 
         if rebuild:
             logger.warning("Warning! You are trying to clear current database!")
             try:
                 self.dbops.clear_learnware_table()
+                # the zip files of the pending submissions are in the learnware pool
+                self.dbops.clear_ingestion_task_table()
                 rmtree(self.learnware_pool_path)
+                for path in (self.snapshot_path, self.text_index_path):
+                    if os.path.exists(path):
+                        os.remove(path)
             except Exception as err:
                 logger.error(f"Clear current database failed due to {err}!!")
 
         os.makedirs(self.learnware_pool_path, exist_ok=True)
         os.makedirs(self.learnware_zip_pool_path, exist_ok=True)
         os.makedirs(self.learnware_folder_pool_path, exist_ok=True)
+        self.blob_store = BlobStore(
+            os.path.join(self.learnware_pool_path, "blobs"), hard_link=conf.learnware_pool_hard_link
+        )
+        self.folder_cache = FolderCache(self.blob_store, budget=conf.unzipped_learnware_budget)
+        register_folder_restorer(self.learnware_folder_pool_path, self._restore_learnware_folder)
+
+        if conf.market_snapshot and os.path.exists(self.snapshot_path):
+            if self.load_snapshot(self.snapshot_path, generation=self.dbops.get_generation()):
+                logger.info(f"Reload market {self.market_id} from snapshot {self.snapshot_path}")
+                self._reload_text_index()
+                self._track_learnware_folders()
+                return
+
         (
             self.learnware_list,
             self.learnware_zip_list,
             self.learnware_folder_list,
             self.use_flags,
             self.count,
-        ) = self.dbops.load_market()
+        ) = self.dbops.load_market(max_workers=max_workers)
+        self._invalidate_learnware_cache()
+        self._register_semantic_specs(self.learnware_list.values(), index_texts=False)
+        self._reload_text_index()
+        self._track_learnware_folders()
+
+        # the snapshot is missing or stale here, and it is not written for the empty or rebuilt markets
+        if conf.market_snapshot and not rebuild and self.count > 0:
+            try:
+                self.share_specifications()
+            except Exception as err:
+                logger.warning(f"Save market snapshot failed due to {err}")
+
+    def _track_learnware_folders(self):
+        """Record the unzipped learnware folders in the folder cache, and evict the cold ones beyond the budget"""
+        if self.folder_cache.budget is None:
+            return
+        for learnware_id in sorted(self.learnware_folder_list.keys()):
+            folder_path = self.learnware_folder_list[learnware_id]
+            if os.path.isdir(folder_path):
+                self.folder_cache.add(folder_path)
+        self.folder_cache.evict()
+
+    def _restore_learnware_folder(self, folder_path: str):
+        """Extract the evicted learnware folder again before it is used, called by the learnwares of the market"""
+        zip_path = self.learnware_zip_list.get(os.path.basename(os.path.normpath(folder_path)))
+        if zip_path is not None:
+            self.folder_cache.restore(folder_path, zip_path)
+
+    def _reload_text_index(self):
+        generation = self.dbops.get_generation()
+        text_index = None
+        try:
+            text_index = TextIndex.load(self.text_index_path, generation=generation)
+        except Exception as err:
+            logger.warning(f"Load text index {self.text_index_path} failed due to {err}")
+
+        if text_index is None:
+            text_index = TextIndex()
+            for learnware in self.learnware_list.values():
+                text_index.add(learnware.id, get_semantic_spec_texts(learnware.get_specification().get_semantic_spec()))
+            try:
+                text_index.save(self.text_index_path, generation=generation)
+            except Exception as err:
+                logger.warning(f"Save text index {self.text_index_path} failed due to {err}")
+        self.text_index = text_index
+
+    @read_locked
+    def save_text_index(self):
+        """Save the full-text index of the market, so that it is not rebuilt when the market is reloaded"""
+        self.text_index.save(self.text_index_path, generation=self.dbops.get_generation())
+
+    @write_locked
+    def share_specifications(self):
+        """Save the snapshot of the market and reload the learnwares from it.
+
+        After that the arrays of statistical specifications are views into the memory-mapped snapshot instead of
+        being owned by the process, thus the worker processes forked from or started alongside this process
+        share the same physical pages. It should be called before forking workers if learnwares are added after
+        the market is reloaded.
+        """
+        self.save_snapshot()
+        if not self.load_snapshot(self.snapshot_path):
+            raise RuntimeError(f"Reload market {self.market_id} from snapshot {self.snapshot_path} failed")
+
+    @read_locked
+    def save_snapshot(self, filepath: str = None):
+        """Save the learnwares into a consolidated snapshot file, which makes reloading the market much faster.
+
+        Parameters
+        ----------
+        filepath : str, optional
+            The path of the snapshot file, by default the snapshot path of the market
+        """
+        filepath = self.snapshot_path if filepath is None else filepath
+        write_market_snapshot(
+            filepath,
+            generation=self.dbops.get_generation(),
+            learnware_list=self.learnware_list,
+            zip_list=self.learnware_zip_list,
+            folder_list=self.learnware_folder_list,
+            use_flags=self.use_flags,
+        )
+
+    def load_snapshot(self, filepath: str, generation: int = None) -> bool:
+        """Load the learnwares from a snapshot file, e.g., for read-only search replicas.
+
+        Parameters
+        ----------
+        filepath : str
+            The path of the snapshot file
+        generation : int, optional
+            The expected generation of the market database, by default None which means no validation
+
+        Returns
+        -------
+        bool
+            A flag indicating whether the snapshot is loaded successfully.
+        """
+        try:
+            result = load_market_snapshot(filepath, generation=generation)
+        except Exception as err:
+            logger.warning(f"Load market snapshot {filepath} failed due to {err}")
+            return False
+
+        if result is None:
+            return False
+
+        (
+            self.learnware_list,
+            self.learnware_zip_list,
+            self.learnware_folder_list,
+            self.use_flags,
+        ) = result
+        self.count = len(self.learnware_list)
+        self._invalidate_learnware_cache()
+        self.semantic_index.clear()
+        self._register_semantic_specs(self.learnware_list.values(), index_texts=False)
+        return True
+
+    def _register_semantic_specs(self, learnwares: List[Learnware], index_texts: bool = True):
+        for learnware in learnwares:
+            if conf.semantic_spec_interning:
+                self.semantic_interner.intern_learnware(learnware)
+            self.semantic_index.add(learnware)
+            if index_texts:
+                semantic_spec = learnware.get_specification().get_semantic_spec()
+                self.text_index.add(learnware.id, get_semantic_spec_texts(semantic_spec))
+
+    @read_locked
+    def match_semantic_tags(self, user_semantic_spec: dict, learnware_list: List[Learnware]):
+        """Match the tags of user semantic specification with the learnwares by the inverted semantic index
+
+        Parameters
+        ----------
+        user_semantic_spec : dict
+            The semantic specification of the user
+        learnware_list : List[Learnware]
+            The learnwares to be matched
+
+        Returns
+        -------
+        Optional[Tuple[Set[str], List[Learnware]]]
+            - The ids of the indexed learnwares whose tags are consistent with user_semantic_spec
+            - The learnwares which are not indexed and should be matched one by one
+            None if user_semantic_spec cannot be matched by the index
+        """
+        return self.semantic_index.match_tags(user_semantic_spec, learnware_list)
+
+    @read_locked
+    def get_semantic_texts(self, learnware_list: List[Learnware]) -> Tuple[List[str], List[str]]:
+        """Get the precomputed lowercase names and descriptions of the learnwares
+
+        Parameters
+        ----------
+        learnware_list : List[Learnware]
+            The learnwares
+
+        Returns
+        -------
+        Tuple[List[str], List[str]]
+            The lowercase names and descriptions in the order of learnware_list
+        """
+        return self.semantic_index.get_texts(learnware_list)
+
+    @read_locked
+    def search_text(
+        self, query: str, learnware_list: List[Learnware] = None, top_k: int = None, match_all: bool = False
+    ) -> List[Tuple[str, float]]:
+        """Rank learnwares by BM25 over the keywords in their names, descriptions and input/output descriptions
+
+        Parameters
+        ----------
+        query : str
+            The keywords
+        learnware_list : List[Learnware], optional
+            The learnwares to be ranked, by default None which means all the learnwares in the market
+        top_k : int, optional
+            The maximum number of returned learnwares, by default None which means no limit
+        match_all : bool, optional
+            Whether the learnwares must contain all the keywords, by default False which means any keyword
+
+        Returns
+        -------
+        List[Tuple[str, float]]
+            The ids and scores of the matched learnwares, in descending order of scores
+        """
+        doc_ids = (
+            self.learnware_list.keys() if learnware_list is None else [learnware.id for learnware in learnware_list]
+        )
+        return self.text_index.search(query, doc_ids=doc_ids, top_k=top_k, match_all=match_all)
+
+    @read_locked
+    def get_memory_report(self) -> dict:
+        """Estimate the memory used by the learnwares in the market, see `get_memory_report` for the items
+
+        Returns
+        -------
+        dict
+            The memory report
+        """
+        report = get_memory_report(self.learnware_list)
+        report["interned_semantic_values"] = len(self.semantic_interner)
+        return report
 
     def add_learnware(
         self, zip_path: str, semantic_spec: dict, check_status: int, learnware_id: str = None
@@ -79,50 +327,167 @@ class EasyOrganizer(BaseOrganizer):
             return None, BaseChecker.INVALID_LEARNWARE
 
         semantic_spec = copy.deepcopy(semantic_spec)
-        logger.info("Get new learnware from %s" % (zip_path))
+        learnware_id = "%08d" % self.dbops.allocate_learnware_ids() if learnware_id is None else learnware_id
+        # the files are staged without the lock, so that the searches are not blocked by the copying and unzipping
+        new_learnware = self._stage_learnware(learnware_id, zip_path, semantic_spec)
+        if new_learnware is None:
+            return None, BaseChecker.INVALID_LEARNWARE
 
-        learnware_id = "%08d" % (self.count) if learnware_id is None else learnware_id
         target_zip_dir = os.path.join(self.learnware_zip_pool_path, "%s.zip" % (learnware_id))
         target_folder_dir = os.path.join(self.learnware_folder_pool_path, learnware_id)
-        copyfile(zip_path, target_zip_dir)
+        learnware_status = check_status if check_status is not None else BaseChecker.NONUSABLE_LEARNWARE
+
+        with self.lock.write_lock():
+            self.dbops.add_learnware(
+                id=learnware_id,
+                semantic_spec=semantic_spec,
+                zip_path=target_zip_dir,
+                folder_path=target_folder_dir,
+                use_flag=learnware_status,
+            )
+
+            self._register_semantic_specs([new_learnware])
+            self.learnware_list[learnware_id] = new_learnware
+            self.learnware_zip_list[learnware_id] = target_zip_dir
+            self.learnware_folder_list[learnware_id] = target_folder_dir
+            self.use_flags[learnware_id] = learnware_status
+            self.count += 1
+            self._invalidate_learnware_cache()
+
+        self.folder_cache.add(target_folder_dir)
+        self.folder_cache.evict()
+        return learnware_id, learnware_status
 
-        with zipfile.ZipFile(target_zip_dir, "r") as z_file:
-            z_file.extractall(target_folder_dir)
-        logger.info("Learnware move to %s, and unzip to %s" % (target_zip_dir, target_folder_dir))
+    def _stage_learnware(self, learnware_id: str, zip_path: str, semantic_spec: dict) -> Learnware:
+        """Save the zipped learnware into the pool, unzip it and load the learnware,
+        the staged files are removed if the learnware cannot be loaded
+
+        Parameters
+        ----------
+        learnware_id : str
+            The id of the new learnware
+        zip_path : str
+            Filepath for learnware model, a zipped file.
+        semantic_spec : dict
+            semantic_spec for new learnware, in dictionary format.
+
+        Returns
+        -------
+        Learnware
+            The loaded learnware, None if the learnware is not properly staged
+        """
+        logger.info("Get new learnware from %s" % (zip_path))
+        target_zip_dir = os.path.join(self.learnware_zip_pool_path, "%s.zip" % (learnware_id))
+        target_folder_dir = os.path.join(self.learnware_folder_pool_path, learnware_id)
 
         try:
-            new_learnware = get_learnware_from_dirpath(
+            self.blob_store.save_file(zip_path, target_zip_dir)
+            self.blob_store.extract_zip(zip_path, target_folder_dir)
+            logger.info("Learnware move to %s, and unzip to %s" % (target_zip_dir, target_folder_dir))
+
+            return get_learnware_from_dirpath(
                 id=learnware_id, semantic_spec=semantic_spec, learnware_dirpath=target_folder_dir
             )
         except Exception:
             logger.warning("New learnware is not properly added!")
-            try:
-                os.remove(target_zip_dir)
-                rmtree(target_folder_dir)
-            except Exception:
-                pass
-            return None, BaseChecker.INVALID_LEARNWARE
+            self._remove_staged_learnware(learnware_id)
+            return None
 
-        if new_learnware is None:
-            return None, BaseChecker.INVALID_LEARNWARE
+    def _remove_staged_learnware(self, learnware_id: str):
+        target_zip_dir = os.path.join(self.learnware_zip_pool_path, "%s.zip" % (learnware_id))
+        target_folder_dir = os.path.join(self.learnware_folder_pool_path, learnware_id)
+        self.blob_store.remove(target_zip_dir)
+        self.blob_store.remove(target_folder_dir)
 
-        learnware_status = check_status if check_status is not None else BaseChecker.NONUSABLE_LEARNWARE
+    def add_learnwares(self, items: List[Tuple[str, dict, int]], max_workers: int = None) -> List[Tuple[str, int]]:
+        """Add learnwares into the market in bulk.
 
-        self.dbops.add_learnware(
-            id=learnware_id,
-            semantic_spec=semantic_spec,
-            zip_path=target_zip_dir,
-            folder_path=target_folder_dir,
-            use_flag=learnware_status,
-        )
+        The learnwares are staged in parallel, and the records are saved in one transaction,
+        so either all the staged learnwares are added or none of them.
 
-        self.learnware_list[learnware_id] = new_learnware
-        self.learnware_zip_list[learnware_id] = target_zip_dir
-        self.learnware_folder_list[learnware_id] = target_folder_dir
-        self.use_flags[learnware_id] = learnware_status
-        self.count += 1
-        return learnware_id, learnware_status
+        Parameters
+        ----------
+        items : List[Tuple[str, dict, int]]
+            The list of (zip_path, semantic_spec, check_status) of the learnwares
+        max_workers : int, optional
+            The number of threads for staging the learnwares, by default None
 
+        Returns
+        -------
+        List[Tuple[str, int]]
+            The (model_id, check_status) of each learnware in the order of items, model_id is None for the
+            learnwares which are not added
+        """
+        results = [(None, BaseChecker.INVALID_LEARNWARE)] * len(items)
+        valid_idxs = []
+        for idx, (zip_path, semantic_spec, check_status) in enumerate(items):
+            if check_status == BaseChecker.INVALID_LEARNWARE:
+                logger.warning("Learnware %s is invalid!" % (zip_path))
+                continue
+            valid_idxs.append(idx)
+        if len(valid_idxs) == 0:
+            return results
+
+        first_id = self.dbops.allocate_learnware_ids(len(valid_idxs))
+        pending_items = []
+        for i, idx in enumerate(valid_idxs):
+            zip_path, semantic_spec, check_status = items[idx]
+            pending_items.append((idx, "%08d" % (first_id + i), zip_path, copy.deepcopy(semantic_spec), check_status))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            new_learnwares = list(
+                pool.map(
+                    lambda item: self._stage_learnware(item[1], item[2], item[3]),
+                    pending_items,
+                )
+            )
+
+        records = []
+        for (idx, learnware_id, _, semantic_spec, check_status), new_learnware in zip(pending_items, new_learnwares):
+            if new_learnware is None:
+                continue
+            learnware_status = check_status if check_status is not None else BaseChecker.NONUSABLE_LEARNWARE
+            records.append(
+                (
+                    idx,
+                    new_learnware,
+                    {
+                        "id": learnware_id,
+                        "semantic_spec": semantic_spec,
+                        "zip_path": os.path.join(self.learnware_zip_pool_path, "%s.zip" % (learnware_id)),
+                        "folder_path": os.path.join(self.learnware_folder_pool_path, learnware_id),
+                        "use_flag": learnware_status,
+                    },
+                )
+            )
+        if len(records) == 0:
+            return results
+
+        with self.lock.write_lock():
+            try:
+                self.dbops.add_learnwares([record for _, _, record in records])
+            except Exception:
+                for _, _, record in records:
+                    self._remove_staged_learnware(record["id"])
+                raise
+
+            self.count += len(records)
+            self._register_semantic_specs([new_learnware for _, new_learnware, _ in records])
+            for idx, new_learnware, record in records:
+                learnware_id = record["id"]
+                self.learnware_list[learnware_id] = new_learnware
+                self.learnware_zip_list[learnware_id] = record["zip_path"]
+                self.learnware_folder_list[learnware_id] = record["folder_path"]
+                self.use_flags[learnware_id] = record["use_flag"]
+                results[idx] = (learnware_id, record["use_flag"])
+            self._invalidate_learnware_cache()
+
+        for _, _, record in records:
+            self.folder_cache.add(record["folder_path"])
+        self.folder_cache.evict()
+        return results
+
+    @write_locked
     def delete_learnware(self, id: str) -> bool:
         """Delete Learnware from market
 
@@ -141,20 +506,24 @@ class EasyOrganizer(BaseOrganizer):
             logger.warning("Learnware id:'{}' NOT Found!".format(id))
             return False
 
-        zip_dir = self.learnware_zip_list[id]
-        if os.path.exists(zip_dir):
-            os.remove(zip_dir)
-
         folder_dir = self.learnware_folder_list[id]
-        rmtree(folder_dir, ignore_errors=True)
+        with self.folder_cache.get_folder_lock(folder_dir):
+            self.blob_store.remove(self.learnware_zip_list[id])
+            self.blob_store.remove(folder_dir)
+        self.folder_cache.remove(folder_dir)
+        unload_modules_in_dirpath(folder_dir)
         self.learnware_list.pop(id)
+        self.semantic_index.remove(id)
+        self.text_index.remove(id)
         self.learnware_zip_list.pop(id)
         self.learnware_folder_list.pop(id)
         self.use_flags.pop(id)
+        self._invalidate_learnware_cache()
         self.dbops.delete_learnware(id=id)
 
         return True
 
+    @write_locked
     def update_learnware(self, id: str, zip_path: str = None, semantic_spec: dict = None, check_status: int = None):
         """Update learnware with zip_path, semantic_specification and check_status
 
@@ -195,24 +564,27 @@ class EasyOrganizer(BaseOrganizer):
         target_zip_dir = self.learnware_zip_list[id]
         target_folder_dir = self.learnware_folder_list[id]
         if zip_path is not None:
-            with tempfile.TemporaryDirectory(prefix="learnware_") as tempdir:
-                with zipfile.ZipFile(zip_path, "r") as z_file:
-                    z_file.extractall(tempdir)
-
+            # the new files replace the current ones only if the learnware can be loaded from them
+            with self.folder_cache.get_folder_lock(target_folder_dir):
                 try:
-                    new_learnware = get_learnware_from_dirpath(
-                        id=id, semantic_spec=semantic_spec, learnware_dirpath=tempdir
+                    replaced = self.blob_store.extract_zip(
+                        zip_path,
+                        target_folder_dir,
+                        validate=lambda dirpath: get_learnware_from_dirpath(
+                            id=id, semantic_spec=semantic_spec, learnware_dirpath=dirpath
+                        )
+                        is not None,
                     )
                 except Exception:
                     return BaseChecker.INVALID_LEARNWARE
 
-                if new_learnware is None:
+                if not replaced:
                     return BaseChecker.INVALID_LEARNWARE
 
-            if zip_path != target_zip_dir:
-                copyfile(zip_path, target_zip_dir)
-            with zipfile.ZipFile(target_zip_dir, "r") as z_file:
-                z_file.extractall(target_folder_dir)
+                if zip_path != target_zip_dir:
+                    self.blob_store.save_file(zip_path, target_zip_dir)
+            self.folder_cache.add(target_folder_dir)
+            self.folder_cache.evict(exclude=target_folder_dir)
 
         # Update check_status
         self.use_flags[id] = self.use_flags[id] if check_status is None else check_status
@@ -222,9 +594,12 @@ class EasyOrganizer(BaseOrganizer):
         self.learnware_list[id] = get_learnware_from_dirpath(
             id=id, semantic_spec=semantic_spec, learnware_dirpath=target_folder_dir
         )
+        self._register_semantic_specs([self.learnware_list[id]])
+        self._invalidate_learnware_cache()
 
         return self.use_flags[id]
 
+    @read_locked
     def get_learnware_by_ids(self, ids: Union[str, List[str]]) -> Union[Learnware, List[Learnware]]:
         """Search learnware by id or list of ids.
 
@@ -257,6 +632,7 @@ class EasyOrganizer(BaseOrganizer):
                 logger.warning("Learnware ID '%s' NOT Found!" % (ids))
                 return None
 
+    @read_locked
     def get_learnware_zip_path_by_ids(self, ids: Union[str, List[str]]) -> Union[Learnware, List[Learnware]]:
         """Get Zipped Learnware file by id
 
@@ -289,6 +665,7 @@ class EasyOrganizer(BaseOrganizer):
                 logger.warning("Learnware ID '%s' NOT Found!" % (ids))
                 return None
 
+    @read_locked
     def get_learnware_dir_path_by_ids(self, ids: Union[str, List[str]]) -> Union[Learnware, List[Learnware]]:
         """Get Learnware dir path by id
 
@@ -309,6 +686,7 @@ class EasyOrganizer(BaseOrganizer):
             ret = []
             for id in ids:
                 if id in self.learnware_folder_list:
+                    self._restore_learnware_folder(self.learnware_folder_list[id])
                     ret.append(self.learnware_folder_list[id])
                 else:
                     logger.warning("Learnware ID '%s' NOT Found!" % (id))
@@ -316,11 +694,30 @@ class EasyOrganizer(BaseOrganizer):
             return ret
         else:
             try:
-                return self.learnware_folder_list[ids]
+                folder_path = self.learnware_folder_list[ids]
             except Exception:
                 logger.warning("Learnware ID '%s' NOT Found!" % (ids))
                 return None
+            self._restore_learnware_folder(folder_path)
+            return folder_path
+
+    def _invalidate_learnware_cache(self):
+        self.learnware_generation += 1
+
+    def _get_cached_learnwares(self, check_status: int = None) -> Tuple[Tuple[str, ...], Tuple[Learnware, ...]]:
+        """Get the ids and learnwares with check_status, which are cached until the learnwares are modified"""
+        with self._learnware_cache_lock:
+            cached = self._learnware_cache.get(check_status)
+            if cached is None or cached[0] != self.learnware_generation:
+                if check_status is None:
+                    ids = tuple(self.use_flags.keys())
+                else:
+                    ids = tuple(key for key, value in self.use_flags.items() if value == check_status)
+                cached = (self.learnware_generation, ids, tuple(self.learnware_list[idx] for idx in ids))
+                self._learnware_cache[check_status] = cached
+            return cached[1], cached[2]
 
+    @read_locked
     def get_learnware_ids(self, top: int = None, check_status: int = None) -> List[str]:
         """Get learnware ids
 
@@ -337,21 +734,42 @@ class EasyOrganizer(BaseOrganizer):
         List[str]
             Learnware ids
         """
-        if check_status is None:
-            filtered_ids = list(self.use_flags.keys())
-        elif check_status in [BaseChecker.NONUSABLE_LEARNWARE, BaseChecker.USABLE_LEARNWARE]:
-            filtered_ids = [key for key, value in self.use_flags.items() if value == check_status]
-        else:
+        if check_status is not None and check_status not in [
+            BaseChecker.NONUSABLE_LEARNWARE,
+            BaseChecker.USABLE_LEARNWARE,
+        ]:
             logger.warning(
                 f"check_status must be in [{BaseChecker.NONUSABLE_LEARNWARE}, {BaseChecker.USABLE_LEARNWARE}]!"
             )
             return None
 
+        filtered_ids, _ = self._get_cached_learnwares(check_status)
         if top is None:
-            return filtered_ids
+            return list(filtered_ids)
         else:
-            return filtered_ids[:top]
+            return list(filtered_ids[:top])
+
+    @read_locked
+    def get_learnware_ids_by_semantic_spec(self, semantic_spec: dict, check_status: int = None) -> List[str]:
+        """Select the candidate learnware ids whose tags are consistent with semantic_spec from the database,
+        which does not need the semantic specifications in memory
 
+        Parameters
+        ----------
+        semantic_spec : dict
+            The semantic specification of the user
+        check_status : int, optional
+            - None: select from all learnwares
+            - Others: select from learnwares with check_status
+
+        Returns
+        -------
+        List[str]
+            The candidate learnware ids, None if the tags of semantic_spec cannot be matched in the database
+        """
+        return self.dbops.get_learnware_ids_by_semantic_spec(semantic_spec, use_flag=check_status)
+
+    @read_locked
     def get_learnwares(self, top: int = None, check_status: int = None) -> List[Learnware]:
         """Get learnware list
 
@@ -366,11 +784,15 @@ class EasyOrganizer(BaseOrganizer):
         Returns
         -------
         List[Learnware]
-            Learnware list
+            Learnwares
         """
-        learnware_ids = self.get_learnware_ids(top, check_status)
-        return [self.learnware_list[idx] for idx in learnware_ids]
+        if self.get_learnware_ids(check_status=check_status) is None:
+            return None
+
+        _, learnwares = self._get_cached_learnwares(check_status)
+        return list(learnwares if top is None else learnwares[:top])
 
+    @write_locked
     def reload_learnware(self, learnware_id: str):
         if learnware_id not in self.learnware_list:
             self.count += 1
@@ -383,7 +805,9 @@ class EasyOrganizer(BaseOrganizer):
         self.learnware_list[learnware_id] = get_learnware_from_dirpath(
             id=learnware_id, semantic_spec=semantic_spec, learnware_dirpath=target_folder_dir
         )
+        self._register_semantic_specs([self.learnware_list[learnware_id]])
         self.use_flags[learnware_id] = self.dbops.get_learnware_use_flag(learnware_id)
+        self._invalidate_learnware_cache()
 
     def get_learnware_info_from_storage(self, learnware_id: str) -> Dict:
         """return learnware zip path and semantic_specification from storage
@@ -403,5 +827,6 @@ class EasyOrganizer(BaseOrganizer):
         """
         return self.dbops.get_learnware_info(learnware_id)
 
+    @read_locked
     def __len__(self):
         return len(self.learnware_list)
@@ -3,11 +3,12 @@ from typing import List, Optional, Tuple, Union
 
 import numpy as np
 import torch
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
 from .organizer import EasyOrganizer
 from ..base import BaseSearcher, BaseUserInfo, MultipleSearchItem, SearchResults, SingleSearchItem
 from ..utils import parse_specification_type
+from ...config import C
 from ...learnware import Learnware
 from ...logger import get_module_logger
 from ...specification import RKMEImageSpecification, RKMETableSpecification, RKMETextSpecification, rkme_solve_qp
@@ -15,6 +16,45 @@ from ...specification import RKMEImageSpecification, RKMETableSpecification, RKM
 logger = get_module_logger("easy_seacher")
 
 
+def _filter_by_semantic_index(
+    organizer, user_semantic_spec: dict, learnware_list: List[Learnware], match_func
+) -> List[Learnware]:
+    """Filter learnwares by tags, using the inverted semantic index of the organizer if it is available
+
+    Parameters
+    ----------
+    organizer : BaseOrganizer
+        The organizer of the market
+    user_semantic_spec : dict
+        The semantic specification of the user
+    learnware_list : List[Learnware]
+        The learnwares to be filtered
+    match_func : Callable[[dict, dict], bool]
+        Match the user semantic specification with the semantic specification of one learnware
+
+    Returns
+    -------
+    List[Learnware]
+        The matched learnwares in the order of learnware_list
+    """
+    match_semantic_tags = getattr(organizer, "match_semantic_tags", None)
+    result = None if match_semantic_tags is None else match_semantic_tags(user_semantic_spec, learnware_list)
+    if result is None:
+        return [
+            learnware
+            for learnware in learnware_list
+            if match_func(user_semantic_spec, learnware.get_specification().get_semantic_spec())
+        ]
+
+    matched_ids, unindexed_learnwares = result
+    matched_ids = matched_ids | {
+        learnware.id
+        for learnware in unindexed_learnwares
+        if match_func(user_semantic_spec, learnware.get_specification().get_semantic_spec())
+    }
+    return [learnware for learnware in learnware_list if learnware.id in matched_ids]
+
+
 class EasyExactSemanticSearcher(BaseSearcher):
     def _learnware_id_search(self, learnware_id: str, learnware_list: List[Learnware]) -> List[Learnware]:
         match_learnwares = []
@@ -69,8 +109,10 @@ class EasyExactSemanticSearcher(BaseSearcher):
         if "learnware_id" in user_semantic_spec:
             learnware_list = self._learnware_id_search(user_semantic_spec["learnware_id"]["Values"], learnware_list)
 
-        # Semantic tag match
-        for learnware in learnware_list:
+        # Semantic tag match, the tags are matched by the index and the name and description are matched one by one
+        for learnware in _filter_by_semantic_index(
+            self.learnware_organizer, user_semantic_spec, learnware_list, self._match_semantic_spec
+        ):
             learnware_semantic_spec = learnware.get_specification().get_semantic_spec()
             if self._match_semantic_spec(user_semantic_spec, learnware_semantic_spec):
                 match_learnwares.append(learnware)
@@ -122,6 +164,73 @@ class EasyFuzzSemanticSearcher(BaseSearcher):
                         return False
         return True
 
+    def _get_semantic_texts(self, learnware_list: List[Learnware]) -> Tuple[List[str], List[str]]:
+        get_semantic_texts = getattr(self.learnware_organizer, "get_semantic_texts", None)
+        if get_semantic_texts is not None:
+            return get_semantic_texts(learnware_list)
+
+        name_list, des_list = [], []
+        for learnware in learnware_list:
+            semantic_spec = learnware.get_specification().get_semantic_spec()
+            name_list.append(semantic_spec["Name"]["Values"].lower())
+            des_list.append(semantic_spec["Description"]["Values"].lower())
+        return name_list, des_list
+
+    def _fuzzy_search(
+        self,
+        name_user: str,
+        learnware_list: List[Learnware],
+        name_list: List[str],
+        des_list: List[str],
+        min_score: float,
+    ) -> Tuple[List[Learnware], List[float]]:
+        """Score the names and descriptions by partial ratio in batch
+
+        Returns
+        -------
+        Tuple[List[Learnware], List[float]]
+            The learnwares whose scores are at least min_score and their scores, in the order of learnware_list
+        """
+        if len(learnware_list) == 0:
+            return [], []
+
+        # the scores below score_cutoff are 0 and skipped early by rapidfuzz
+        scores = process.cdist(
+            [name_user],
+            name_list + des_list,
+            scorer=fuzz.partial_ratio,
+            score_cutoff=min_score,
+            dtype=np.float64,
+            workers=-1,
+        )[0]
+        scores = np.maximum(scores[: len(learnware_list)], scores[len(learnware_list) :])
+
+        matched_learnware_fuzz, fuzz_scores = [], []
+        for learnware, score in zip(learnware_list, scores):
+            if score >= min_score:
+                matched_learnware_fuzz.append(learnware)
+                fuzz_scores.append(float(score))
+        return matched_learnware_fuzz, fuzz_scores
+
+    def _text_search(self, query: str, learnware_list: List[Learnware], max_num: int) -> List[Learnware]:
+        """Find the learnwares containing all the keywords of query by the full-text index of the organizer"""
+        search_text = getattr(self.learnware_organizer, "search_text", None)
+        if search_text is None:
+            return []
+
+        learnware_dict = {learnware.id: learnware for learnware in learnware_list}
+        ranked_ids = search_text(query, learnware_list, top_k=max_num, match_all=True)
+        return [learnware_dict[learnware_id] for learnware_id, _ in ranked_ids]
+
+    def _rank_by_text(self, query: str, learnware_list: List[Learnware]) -> List[Learnware]:
+        """Sort the learnwares by the BM25 scores of query, the learnwares with equal scores keep their order"""
+        search_text = getattr(self.learnware_organizer, "search_text", None)
+        if search_text is None or len(learnware_list) <= 1:
+            return learnware_list
+
+        text_scores = dict(search_text(query, learnware_list))
+        return sorted(learnware_list, key=lambda learnware: text_scores.get(learnware.id, 0.0), reverse=True)
+
     def __call__(
         self, learnware_list: List[Learnware], user_info: BaseUserInfo, max_num: int = 50000, min_score: float = 75.0
     ) -> SearchResults:
@@ -143,7 +252,6 @@ class EasyFuzzSemanticSearcher(BaseSearcher):
         List[Learnware]
             The list of returned learnwares
         """
-        matched_learnware_tag = []
         final_result = []
         user_semantic_spec = user_info.get_semantic_spec()
 
@@ -152,24 +260,16 @@ class EasyFuzzSemanticSearcher(BaseSearcher):
             learnware_list = self._learnware_id_search(user_semantic_spec["learnware_id"]["Values"], learnware_list)
 
         # Semantic tag match
-        for learnware in learnware_list:
-            learnware_semantic_spec = learnware.get_specification().get_semantic_spec()
-            if self._match_semantic_spec_tag(user_semantic_spec, learnware_semantic_spec):
-                matched_learnware_tag.append(learnware)
+        matched_learnware_tag = _filter_by_semantic_index(
+            self.learnware_organizer, user_semantic_spec, learnware_list, self._match_semantic_spec_tag
+        )
 
         if len(matched_learnware_tag) > 0:
             if "Name" in user_semantic_spec:
                 name_user = user_semantic_spec["Name"]["Values"].lower()
                 if len(name_user) > 0:
                     # Exact search
-                    name_list = [
-                        learnware.get_specification().get_semantic_spec()["Name"]["Values"].lower()
-                        for learnware in matched_learnware_tag
-                    ]
-                    des_list = [
-                        learnware.get_specification().get_semantic_spec()["Description"]["Values"].lower()
-                        for learnware in matched_learnware_tag
-                    ]
+                    name_list, des_list = self._get_semantic_texts(matched_learnware_tag)
 
                     matched_learnware_exact = []
                     for i in range(len(name_list)):
@@ -178,20 +278,21 @@ class EasyFuzzSemanticSearcher(BaseSearcher):
 
                     if len(matched_learnware_exact) == 0:
                         # Fuzzy search
-                        matched_learnware_fuzz, fuzz_scores = [], []
-                        for i in range(len(name_list)):
-                            score_name = fuzz.partial_ratio(name_user, name_list[i])
-                            score_des = fuzz.partial_ratio(name_user, des_list[i])
-                            final_score = max(score_name, score_des)
-                            if final_score >= min_score:
-                                matched_learnware_fuzz.append(matched_learnware_tag[i])
-                                fuzz_scores.append(final_score)
+                        matched_learnware_fuzz, fuzz_scores = self._fuzzy_search(
+                            name_user, matched_learnware_tag, name_list, des_list, min_score
+                        )
 
                         # Sort by score
                         sort_idx = sorted(list(range(len(fuzz_scores))), key=lambda k: fuzz_scores[k], reverse=True)[
                             :max_num
                         ]
                         final_result = [matched_learnware_fuzz[idx] for idx in sort_idx]
+
+                        if len(final_result) == 0 and C.semantic_text_search:
+                            # Keyword search, e.g., over the feature descriptions of input and output
+                            final_result = self._text_search(name_user, matched_learnware_tag, max_num)
+                    elif C.semantic_text_search:
+                        final_result = self._rank_by_text(name_user, matched_learnware_exact)
                     else:
                         final_result = matched_learnware_exact
                 else:
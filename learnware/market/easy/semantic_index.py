@@ -0,0 +1,260 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from ...learnware import Learnware
+
+# the keys matched by text instead of tags
+TEXT_KEYS = ("Name", "Description")
+
+
+def iter_semantic_postings(semantic_spec: dict):
+    """Yield (postings_name, key, value) for every posting the semantic specification belongs to
+
+    Parameters
+    ----------
+    semantic_spec : dict
+        The semantic specification of a learnware
+
+    Yields
+    ------
+    Tuple[str, str, object]
+        postings_name is one of "key_ids", "empty_ids", "class_postings" and "tag_postings", value is None for
+        "key_ids" and "empty_ids"
+    """
+    for key, spec in semantic_spec.items():
+        if key in TEXT_KEYS:
+            continue
+        yield "key_ids", key, None
+
+        values = spec.get("Values", "")
+        if len(values) == 0:
+            yield "empty_ids", key, None
+            continue
+
+        yield "class_postings", key, values[0] if isinstance(values, list) else values
+        for value in set(values):
+            yield "tag_postings", key, value
+
+
+def parse_tag_constraints(user_semantic_spec: dict) -> Optional[List[Tuple[str, str, list]]]:
+    """Get the tag constraints of user semantic specification
+
+    Parameters
+    ----------
+    user_semantic_spec : dict
+        The semantic specification of the user
+
+    Returns
+    -------
+    Optional[List[Tuple[str, str, list]]]
+        The list of (key, type, values), None if the constraints cannot be matched by postings
+    """
+    constraints = []
+    for key, spec in user_semantic_spec.items():
+        if key in TEXT_KEYS:
+            continue
+        if not isinstance(spec, dict):
+            return None
+
+        user_values = spec.get("Values", "")
+        try:
+            if len(user_values) == 0:
+                continue
+        except TypeError:
+            return None
+
+        key_type = spec.get("Type")
+        if key_type in ("Class", "Tag"):
+            # a string is matched by substring or characters, which is left to the per-learnware matching
+            if not isinstance(user_values, (list, tuple, set)):
+                return None
+            try:
+                set(user_values)
+            except TypeError:
+                return None
+        elif "Type" not in spec:
+            return None
+        constraints.append((key, key_type, user_values))
+    return constraints
+
+
+class SemanticIndex:
+    """Inverted index over the tags of semantic specifications maintained by the organizer.
+
+    For every key (e.g., Data, Task, Library, Scenario, License) the index keeps posting sets of learnware ids:
+
+    - ``key_ids[key]``: learnwares whose semantic specification contains the key
+    - ``empty_ids[key]``: learnwares whose values of the key are empty
+    - ``class_postings[key][value]``: learnwares whose (first) value of the key is value, used by Class keys
+    - ``tag_postings[key][value]``: learnwares whose values of the key contain value, used by Tag keys
+
+    Matching a query is then reduced to unions and intersections of posting sets, the result is exactly the same
+    as matching the tags of every learnware one by one.
+
+    The lowercase names and descriptions are also kept, so that fuzzy matching does not normalize them per query.
+    """
+
+    def __init__(self):
+        self.semantic_specs: Dict[str, dict] = {}
+        self.key_ids: Dict[str, Set[str]] = defaultdict(set)
+        self.empty_ids: Dict[str, Set[str]] = defaultdict(set)
+        self.class_postings: Dict[str, Dict[object, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self.tag_postings: Dict[str, Dict[object, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        # learnwares with values that cannot be indexed, e.g., unhashable values
+        self.unindexed_ids: Set[str] = set()
+
+        # the lowercase names and descriptions used by fuzzy matching
+        self.texts: Dict[str, Tuple[str, str]] = {}
+
+    def __len__(self):
+        return len(self.semantic_specs)
+
+    def __contains__(self, learnware_id: str):
+        return learnware_id in self.semantic_specs
+
+    def add(self, learnware: Learnware):
+        """Add or replace the semantic specification of a learnware in the index
+
+        Parameters
+        ----------
+        learnware : Learnware
+            The learnware to be indexed
+        """
+        self.remove(learnware.id)
+        semantic_spec = learnware.get_specification().get_semantic_spec()
+        self.semantic_specs[learnware.id] = semantic_spec
+        self._add_texts(learnware.id, semantic_spec)
+
+        try:
+            postings = list(iter_semantic_postings(semantic_spec))
+            for _, _, value in postings:
+                hash(value)
+        except Exception:
+            self.unindexed_ids.add(learnware.id)
+            return
+
+        for postings_name, key, value in postings:
+            if postings_name in ("key_ids", "empty_ids"):
+                getattr(self, postings_name)[key].add(learnware.id)
+            else:
+                getattr(self, postings_name)[key][value].add(learnware.id)
+
+    def remove(self, learnware_id: str):
+        """Remove a learnware from the index
+
+        Parameters
+        ----------
+        learnware_id : str
+            The id of the learnware to be removed
+        """
+        semantic_spec = self.semantic_specs.pop(learnware_id, None)
+        if semantic_spec is None:
+            return
+        self.texts.pop(learnware_id, None)
+        if learnware_id in self.unindexed_ids:
+            self.unindexed_ids.discard(learnware_id)
+            return
+
+        for postings_name, key, value in iter_semantic_postings(semantic_spec):
+            if postings_name in ("key_ids", "empty_ids"):
+                postings = getattr(self, postings_name)
+                postings[key].discard(learnware_id)
+                if len(postings[key]) == 0:
+                    del postings[key]
+            else:
+                postings = getattr(self, postings_name)[key]
+                postings[value].discard(learnware_id)
+                if len(postings[value]) == 0:
+                    del postings[value]
+
+    def clear(self):
+        self.__init__()
+
+    def _add_texts(self, learnware_id: str, semantic_spec: dict):
+        try:
+            self.texts[learnware_id] = (
+                semantic_spec["Name"]["Values"].lower(),
+                semantic_spec["Description"]["Values"].lower(),
+            )
+        except Exception:
+            # the texts are left to be read when searching, which raises the same errors as before
+            pass
+
+    def _is_indexed(self, learnware: Learnware) -> bool:
+        # the learnware may have been changed without notifying the index
+        return self.semantic_specs.get(learnware.id) is learnware.get_specification().get_semantic_spec()
+
+    def get_texts(self, learnware_list: List[Learnware]) -> Tuple[List[str], List[str]]:
+        """Get the lowercase names and descriptions of the learnwares
+
+        Parameters
+        ----------
+        learnware_list : List[Learnware]
+            The learnwares
+
+        Returns
+        -------
+        Tuple[List[str], List[str]]
+            The lowercase names and descriptions in the order of learnware_list
+        """
+        names, descriptions = [], []
+        for learnware in learnware_list:
+            texts = self.texts.get(learnware.id) if self._is_indexed(learnware) else None
+            if texts is None:
+                semantic_spec = learnware.get_specification().get_semantic_spec()
+                texts = (semantic_spec["Name"]["Values"].lower(), semantic_spec["Description"]["Values"].lower())
+            names.append(texts[0])
+            descriptions.append(texts[1])
+        return names, descriptions
+
+    def _match_key(self, key: str, key_type: str, user_values, candidate_ids: Set[str]) -> Set[str]:
+        missing_ids = candidate_ids - self.key_ids.get(key, set())
+        empty_ids = self.empty_ids.get(key, set())
+
+        if key_type == "Class":
+            postings = self.class_postings.get(key, {})
+            matched_ids = set().union(*[postings.get(value, ()) for value in user_values])
+        elif key_type == "Tag":
+            postings = self.tag_postings.get(key, {})
+            matched_ids = set().union(*[postings.get(value, ()) for value in set(user_values)])
+        else:
+            matched_ids = candidate_ids - empty_ids
+
+        return missing_ids | (candidate_ids & matched_ids)
+
+    def match_tags(
+        self, user_semantic_spec: dict, learnware_list: List[Learnware]
+    ) -> Optional[Tuple[Set[str], List[Learnware]]]:
+        """Match the tags of the user semantic specification with the learnwares
+
+        Parameters
+        ----------
+        user_semantic_spec : dict
+            The semantic specification of the user
+        learnware_list : List[Learnware]
+            The learnwares to be matched
+
+        Returns
+        -------
+        Optional[Tuple[Set[str], List[Learnware]]]
+            - The ids of the indexed learnwares whose tags are consistent with user_semantic_spec
+            - The learnwares which are not indexed and should be matched one by one
+            None if user_semantic_spec cannot be matched by the index
+        """
+        constraints = parse_tag_constraints(user_semantic_spec)
+        if constraints is None:
+            return None
+
+        candidate_ids, unindexed_learnwares = set(), []
+        for learnware in learnware_list:
+            if self._is_indexed(learnware) and learnware.id not in self.unindexed_ids:
+                candidate_ids.add(learnware.id)
+            else:
+                unindexed_learnwares.append(learnware)
+
+        for key, key_type, user_values in constraints:
+            if len(candidate_ids) == 0:
+                break
+            candidate_ids = self._match_key(key, key_type, user_values, candidate_ids)
+
+        return candidate_ids, unindexed_learnwares
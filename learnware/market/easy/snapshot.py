@@ -0,0 +1,127 @@
+import json
+from collections import defaultdict
+from typing import Dict, Optional
+
+from ...learnware import Learnware, get_learnware_from_dirpath
+from ...logger import get_module_logger
+from ...specification import Specification
+from ...specification.arena import SpecArenaWriter, open_spec_arena, read_spec_arena_header, save_spec_arena
+
+logger = get_module_logger("market_snapshot")
+
+SNAPSHOT_MAGIC = b"LWSNAP01"
+
+
+def _is_json_serializable(value) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def write_market_snapshot(
+    filepath: str,
+    generation: int,
+    learnware_list: Dict[str, Learnware],
+    zip_list: Dict[str, str],
+    folder_list: Dict[str, str],
+    use_flags: Dict[str, int],
+):
+    """Write the learnwares of a market into one consolidated snapshot file.
+
+    The file consists of a json header and one contiguous arena for each type of statistical specification.
+    Arrays are referenced by their offsets in the arena, thus the snapshot can be memory-mapped when loading.
+    Learnwares whose model is instantiated or whose specifications cannot be packed are recorded without
+    specifications, and will be loaded from their folders.
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the snapshot file
+    generation : int
+        The generation of the market database which the snapshot corresponds to
+    """
+    records = []
+    writers = defaultdict(SpecArenaWriter)
+
+    for idx, learnware in learnware_list.items():
+        record = {
+            "id": idx,
+            "semantic_spec": learnware.get_specification().get_semantic_spec(),
+            "zip_path": zip_list[idx],
+            "folder_path": folder_list[idx],
+            "use_flag": use_flags[idx],
+            "model": None,
+            "stat_specs": None,
+        }
+
+        model = learnware.get_model()
+        if isinstance(model, dict) and _is_json_serializable(model):
+            stat_specs = learnware.get_specification().get_stat_spec()
+            try:
+                packed_specs = []
+                for spec_type, stat_spec in stat_specs.items():
+                    packed = writers[spec_type].pack(stat_spec)
+                    packed["name"] = spec_type
+                    packed_specs.append(packed)
+            except Exception as err:
+                # the arrays packed before the failure are left unreferenced in the arenas
+                logger.warning(f"Learnware {idx} is saved in snapshot without specifications due to {err}")
+            else:
+                record["model"] = model
+                record["stat_specs"] = packed_specs
+
+        records.append(record)
+
+    save_spec_arena(filepath, {"generation": generation, "learnwares": records}, writers, magic=SNAPSHOT_MAGIC)
+
+
+def load_market_snapshot(filepath: str, generation: Optional[int] = None):
+    """Load learnwares from a snapshot file, the arrays of specifications are memory-mapped
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the snapshot file
+    generation : int, optional
+        The expected generation of the market database, the snapshot is regarded as stale if it is different
+
+    Returns
+    -------
+    Optional[tuple]
+        learnware_list, zip_list, folder_list and use_flags; None if the snapshot is stale
+    """
+    header, data_offset = read_spec_arena_header(filepath, magic=SNAPSHOT_MAGIC)
+    if generation is not None and header["generation"] != generation:
+        logger.info(f"Market snapshot is stale (generation {header['generation']} != {generation})")
+        return None
+    header, arenas = open_spec_arena(filepath, magic=SNAPSHOT_MAGIC, header=(header, data_offset))
+
+    learnware_list, zip_list, folder_list, use_flags = {}, {}, {}, {}
+    for record in header["learnwares"]:
+        idx = record["id"]
+        if record["stat_specs"] is None:
+            try:
+                learnware_list[idx] = get_learnware_from_dirpath(
+                    id=idx,
+                    semantic_spec=record["semantic_spec"],
+                    learnware_dirpath=record["folder_path"],
+                    ignore_error=False,
+                )
+            except Exception as err:
+                logger.info(f"Load learnware {idx} failed due to {err}")
+                continue
+        else:
+            specification = Specification(semantic_spec=record["semantic_spec"])
+            for packed in record["stat_specs"]:
+                specification.update_stat_spec(**{packed["name"]: arenas[packed["name"]].unpack(packed)})
+            learnware_list[idx] = Learnware(
+                id=idx, model=record["model"], specification=specification, learnware_dirpath=record["folder_path"]
+            )
+
+        zip_list[idx] = record["zip_path"]
+        folder_list[idx] = record["folder_path"]
+        use_flags[idx] = int(record["use_flag"])
+
+    return learnware_list, zip_list, folder_list, use_flags
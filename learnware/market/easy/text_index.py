@@ -0,0 +1,250 @@
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ...logger import get_module_logger
+
+logger = get_module_logger("text_index")
+
+_CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+# CJK characters are single tokens since there are no spaces between words, the others are split by non-word chars
+_TOKEN_PATTERN = re.compile(f"[{_CJK_CHARS}]|[^\\W_{_CJK_CHARS}]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a text into lowercase tokens
+
+    Parameters
+    ----------
+    text : str
+        The text to be tokenized
+
+    Returns
+    -------
+    List[str]
+        The tokens in order
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def get_semantic_spec_texts(semantic_spec: dict) -> List[str]:
+    """Get the texts of a semantic specification indexed for full-text search, i.e., the name, the description
+    and the feature descriptions of the input and output
+
+    Parameters
+    ----------
+    semantic_spec : dict
+        The semantic specification
+
+    Returns
+    -------
+    List[str]
+        The texts
+    """
+    texts = []
+    for key in ("Name", "Description"):
+        spec = semantic_spec.get(key)
+        if isinstance(spec, dict) and isinstance(spec.get("Values"), str):
+            texts.append(spec["Values"])
+
+    for key in ("Input", "Output"):
+        spec = semantic_spec.get(key)
+        if isinstance(spec, dict) and isinstance(spec.get("Description"), dict):
+            texts.extend(value for value in spec["Description"].values() if isinstance(value, str))
+    return texts
+
+
+class TextIndex:
+    """Inverted index with BM25 scoring over the texts of semantic specifications.
+
+    Each learnware is a document, ``postings[term][learnware_id]`` is the term frequency of term in the document.
+    Documents are added, replaced and removed incrementally, and the index is saved as a json file validated by
+    the generation of the market database.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Parameters
+        ----------
+        k1 : float, optional
+            The term frequency saturation of BM25, by default 1.2
+        b : float, optional
+            The document length normalization of BM25, by default 0.75
+        """
+        self.k1 = k1
+        self.b = b
+        self.doc_term_freqs: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_term_freqs)
+
+    def __contains__(self, doc_id: str):
+        return doc_id in self.doc_term_freqs
+
+    def _add_term_freqs(self, doc_id: str, term_freqs: Dict[str, int]):
+        self.remove(doc_id)
+        self.doc_term_freqs[doc_id] = term_freqs
+        self.doc_lengths[doc_id] = sum(term_freqs.values())
+        self.total_length += self.doc_lengths[doc_id]
+        for term, freq in term_freqs.items():
+            self.postings[term][doc_id] = freq
+
+    def add(self, doc_id: str, texts: Iterable[str]):
+        """Add or replace a document
+
+        Parameters
+        ----------
+        doc_id : str
+            The id of the document, i.e., the learnware id
+        texts : Iterable[str]
+            The texts of the document
+        """
+        term_freqs = Counter()
+        for text in texts:
+            term_freqs.update(tokenize(text))
+        self._add_term_freqs(doc_id, dict(term_freqs))
+
+    def remove(self, doc_id: str):
+        """Remove a document if it exists
+
+        Parameters
+        ----------
+        doc_id : str
+            The id of the document
+        """
+        term_freqs = self.doc_term_freqs.pop(doc_id, None)
+        if term_freqs is None:
+            return
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in term_freqs:
+            posting = self.postings[term]
+            posting.pop(doc_id, None)
+            if len(posting) == 0:
+                del self.postings[term]
+
+    def search(
+        self,
+        query: str,
+        doc_ids: Optional[Iterable[str]] = None,
+        top_k: Optional[int] = None,
+        match_all: bool = False,
+    ) -> List[Tuple[str, float]]:
+        """Rank the documents containing the terms of the query by BM25
+
+        Parameters
+        ----------
+        query : str
+            The keywords
+        doc_ids : Optional[Iterable[str]], optional
+            Only rank the documents in doc_ids, by default None which means all the documents
+        top_k : Optional[int], optional
+            The maximum number of returned documents, by default None which means no limit
+        match_all : bool, optional
+            Whether the documents must contain all the terms of the query, by default False which means any term
+
+        Returns
+        -------
+        List[Tuple[str, float]]
+            The ids and scores of the documents in descending order of scores, ties are ordered by ids
+        """
+        doc_num = len(self.doc_term_freqs)
+        if doc_num == 0:
+            return []
+
+        allowed_ids = None if doc_ids is None else set(doc_ids)
+        postings = [self.postings.get(term) for term in set(tokenize(query))]
+        if match_all:
+            if len(postings) == 0 or any(posting is None for posting in postings):
+                return []
+            # only the documents containing the rarest term need to be scored
+            postings.sort(key=len)
+            allowed_ids = set(postings[0]) if allowed_ids is None else allowed_ids & postings[0].keys()
+
+        avg_length = max(self.total_length / doc_num, 1e-8)
+        k1, length_weight = self.k1, self.b / avg_length
+        base_norm = k1 * (1 - self.b)
+        scores, matched_terms = defaultdict(float), Counter()
+        for posting in postings:
+            if posting is None:
+                continue
+
+            doc_freq = len(posting)
+            idf = math.log(1 + (doc_num - doc_freq + 0.5) / (doc_freq + 0.5))
+            if allowed_ids is None:
+                items = posting.items()
+            elif len(allowed_ids) < doc_freq:
+                items = [(doc_id, posting[doc_id]) for doc_id in allowed_ids if doc_id in posting]
+            else:
+                items = [(doc_id, freq) for doc_id, freq in posting.items() if doc_id in allowed_ids]
+
+            for doc_id, freq in items:
+                norm = base_norm + k1 * length_weight * self.doc_lengths[doc_id]
+                scores[doc_id] += idf * freq * (k1 + 1) / (freq + norm)
+                matched_terms[doc_id] += 1
+
+        if match_all:
+            scores = {doc_id: score for doc_id, score in scores.items() if matched_terms[doc_id] == len(postings)}
+
+        if top_k is None:
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return heapq.nsmallest(top_k, scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def save(self, filepath: str, generation: int = None):
+        """Save the index into a json file, which is replaced atomically
+
+        Parameters
+        ----------
+        filepath : str
+            The path of the index file
+        generation : int, optional
+            The generation of the market database the index is consistent with, by default None
+        """
+        content = {"generation": generation, "k1": self.k1, "b": self.b, "docs": self.doc_term_freqs}
+        fd, temp_path = tempfile.mkstemp(prefix=".text_index_", dir=os.path.dirname(os.path.abspath(filepath)))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fout:
+                json.dump(content, fout, ensure_ascii=False)
+            os.replace(temp_path, filepath)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, filepath: str, generation: int = None) -> Optional["TextIndex"]:
+        """Load the index saved by `save`
+
+        Parameters
+        ----------
+        filepath : str
+            The path of the index file
+        generation : int, optional
+            The expected generation of the market database, by default None which means no validation
+
+        Returns
+        -------
+        Optional[TextIndex]
+            The index, None if the file does not exist or is stale
+        """
+        if not os.path.exists(filepath):
+            return None
+
+        with open(filepath, "r", encoding="utf-8") as fin:
+            content = json.load(fin)
+        if generation is not None and content["generation"] != generation:
+            logger.info(f"Text index {filepath} is stale and will be rebuilt")
+            return None
+
+        text_index = cls(k1=content["k1"], b=content["b"])
+        for doc_id, term_freqs in content["docs"].items():
+            text_index._add_term_freqs(doc_id, term_freqs)
+        return text_index
@@ -1,7 +1,9 @@
 import os
+import threading
 import traceback
 from collections import defaultdict
-from typing import List, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Union
 
 import pandas as pd
 
@@ -9,28 +11,45 @@ from .hetero_map import HeteroMap, Trainer
 from ..utils import is_hetero
 from ...base import BaseChecker, BaseUserInfo
 from ...easy import EasyOrganizer
+from ...migrate import BINARY_STAT_SPECS_KEY
+from ....config import C
 from ....learnware import Learnware
 from ....logger import get_module_logger
 from ....specification import HeteroMapTableSpecification
+from ....specification.arena import load_stat_specs, save_stat_specs
+from ....utils.lock import read_locked, write_locked
 
 logger = get_module_logger("hetero_map_table_organizer")
 
 
 class HeteroMapTableOrganizer(EasyOrganizer):
-    def reload_market(self, rebuild=False) -> bool:
+    @write_locked
+    def reload_market(self, rebuild=False, max_workers: int = None) -> bool:
         """Reload the heterogeneous learnware organizer when server restarted.
 
+        Parameters
+        ----------
+        rebuild : bool, optional
+            A flag indicating whether to clear the current market, by default False
+        max_workers : int, optional
+            The number of workers used to load learnwares and hetero specs, by default C.market_reload_workers
+
         Returns
         -------
         bool
             A flag indicating whether the heterogeneous market is reloaded successfully.
         """
-        super(HeteroMapTableOrganizer, self).reload_market(rebuild=rebuild)
+        super(HeteroMapTableOrganizer, self).reload_market(rebuild=rebuild, max_workers=max_workers)
+        # the hetero specs are saved as json unless the market is migrated to npz
+        self.binary_hetero_specs = C.get("binary_hetero_specs", False) or bool(
+            self.dbops.get_meta_value(BINARY_STAT_SPECS_KEY)
+        )
 
         hetero_folder_path = os.path.join(self.market_store_path, "hetero")
         os.makedirs(hetero_folder_path, exist_ok=True)
         self.market_mapping_path = os.path.join(hetero_folder_path, "model.bin")
         self.hetero_specs_path = os.path.join(hetero_folder_path, "hetero_specifications")
+        self.hetero_specs_arena_path = os.path.join(hetero_folder_path, "hetero_specifications.arena")
         os.makedirs(self.hetero_specs_path, exist_ok=True)
 
         if os.path.exists(self.market_mapping_path):
@@ -39,8 +58,13 @@ class HeteroMapTableOrganizer(EasyOrganizer):
             if not rebuild:
                 usable_ids = self.get_learnware_ids(check_status=BaseChecker.USABLE_LEARNWARE)
                 hetero_ids = self._get_hetero_learnware_ids(usable_ids)
-                for hetero_id in hetero_ids:
-                    self._reload_learnware_hetero_spec(hetero_id)
+                if not (C.get("market_snapshot", True) and self._reload_hetero_specs_from_arena(hetero_ids)):
+                    max_workers = C.get("market_reload_workers") if max_workers is None else max_workers
+                    max_workers = os.cpu_count() if max_workers is None else max_workers
+                    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(hetero_ids)))) as executor:
+                        list(executor.map(self._reload_learnware_hetero_spec, hetero_ids))
+                    if C.get("market_snapshot", True) and len(hetero_ids):
+                        self._save_hetero_specs_arena(hetero_ids)
         else:
             logger.warning("No market mapping to reload!")
             self.market_mapping = HeteroMap()
@@ -63,6 +87,8 @@ class HeteroMapTableOrganizer(EasyOrganizer):
         self.auto_update_limit = auto_update_limit
         self.count_down = auto_update_limit
         self.training_args = training_args
+        # the market mapping is trained by one thread at a time, without the lock of the market
+        self._market_mapping_lock = threading.Lock()
 
         super(HeteroMapTableOrganizer, self).reset(market_id, rebuild)
 
@@ -89,34 +115,126 @@ class HeteroMapTableOrganizer(EasyOrganizer):
             - str indicating model_id
             - int indicating the final learnware check_status
         """
+        # the learnware is staged without the lock by EasyOrganizer, and only the hetero specs are updated with it
         learnware_id, learnwere_status = super(HeteroMapTableOrganizer, self).add_learnware(
             zip_path, semantic_spec, check_status, learnware_id
         )
 
-        if learnwere_status == BaseChecker.USABLE_LEARNWARE and len(self._get_hetero_learnware_ids(learnware_id)):
-            self._update_learnware_hetero_spec(learnware_id)
+        update_market_mapping = False
+        with self.lock.write_lock():
+            if learnwere_status == BaseChecker.USABLE_LEARNWARE and len(self._get_hetero_learnware_ids(learnware_id)):
+                self._update_learnware_hetero_spec(learnware_id)
+                update_market_mapping = self._count_down_market_mapping(1)
 
-            if self.auto_update:
-                self.count_down -= 1
-                if self.count_down == 0:
-                    training_learnware_ids = self._get_hetero_learnware_ids(
-                        self.get_learnware_ids(check_status=BaseChecker.USABLE_LEARNWARE)
-                    )
-                    training_learnwares = self.get_learnware_by_ids(training_learnware_ids)
-                    logger.info(f"Verified leanwares for training: {training_learnware_ids}")
-                    updated_market_mapping = self.train(
-                        learnware_list=training_learnwares, save_dir=self.market_mapping_path, **self.training_args
-                    )
-                    logger.info(
-                        f"Market mapping train completed. Now update HeteroMapTableSpecification for {training_learnware_ids}"
-                    )
-                    self.market_mapping = updated_market_mapping
-                    self._update_learnware_hetero_spec(training_learnware_ids)
+        if update_market_mapping:
+            self._update_market_mapping()
+        return learnware_id, learnwere_status
 
-                    self.count_down = self.auto_update_limit
+    def add_learnwares(self, items: List[Tuple[str, dict, int]], max_workers: int = None) -> List[Tuple[str, int]]:
+        """Add learnwares into the heterogeneous learnware market in bulk.
+           The market mapping is updated at most once if `auto_update` is True.
 
-        return learnware_id, learnwere_status
+        Parameters
+        ----------
+        items : List[Tuple[str, dict, int]]
+            The list of (zip_path, semantic_spec, check_status) of the learnwares
+        max_workers : int, optional
+            The number of threads for staging the learnwares, by default None
+
+        Returns
+        -------
+        List[Tuple[str, int]]
+            The (model_id, check_status) of each learnware in the order of items
+        """
+        results = super(HeteroMapTableOrganizer, self).add_learnwares(items, max_workers=max_workers)
+        usable_ids = [
+            learnware_id
+            for learnware_id, learnware_status in results
+            if learnware_status == BaseChecker.USABLE_LEARNWARE and learnware_id is not None
+        ]
+
+        update_market_mapping = False
+        with self.lock.write_lock():
+            hetero_ids = self._get_hetero_learnware_ids(usable_ids)
+            if len(hetero_ids):
+                self._update_learnware_hetero_spec(hetero_ids)
+                update_market_mapping = self._count_down_market_mapping(len(hetero_ids))
+
+        if update_market_mapping:
+            self._update_market_mapping()
+        return results
+
+    def _count_down_market_mapping(self, step: int) -> bool:
+        """Count down the number of new learnwares supporting training, the caller holds the write lock.
+
+        Parameters
+        ----------
+        step : int
+            The number of new learnwares supporting training
+
+        Returns
+        -------
+        bool
+            True if `auto_update` is True and the count reaches zero, then the market mapping should be updated by
+            `_update_market_mapping` after the lock is released
+        """
+        if not self.auto_update:
+            return False
+
+        self.count_down -= step
+        if self.count_down > 0:
+            return False
+        self.count_down = self.auto_update_limit
+        return True
 
+    def _update_market_mapping(self):
+        """Train the market mapping and regenerate the HeteroMapTableSpecifications without blocking the searches.
+
+        The learnwares are taken under the read lock, the market mapping is trained and the specifications are
+        generated without the lock, and only the new market mapping and specifications are swapped in under the
+        write lock.
+        """
+        with self._market_mapping_lock:
+            with self.lock.read_lock():
+                training_learnware_ids = self._get_hetero_learnware_ids(
+                    self.get_learnware_ids(check_status=BaseChecker.USABLE_LEARNWARE)
+                )
+                training_learnwares = self.get_learnware_by_ids(training_learnware_ids)
+            logger.info(f"Verified leanwares for training: {training_learnware_ids}")
+            updated_market_mapping = self.train(
+                learnware_list=training_learnwares, save_dir=self.market_mapping_path, **self.training_args
+            )
+            logger.info(
+                f"Market mapping train completed. Now update HeteroMapTableSpecification for {training_learnware_ids}"
+            )
+            hetero_specs = self._generate_hetero_specs(training_learnware_ids, updated_market_mapping)
+            for idx, hetero_spec in hetero_specs.items():
+                self._save_learnware_hetero_spec(idx, hetero_spec)
+
+            with self.lock.write_lock():
+                self.market_mapping = updated_market_mapping
+                for idx, hetero_spec in hetero_specs.items():
+                    if idx in self.learnware_list:
+                        self.learnware_list[idx].update_stat_spec(hetero_spec.type, hetero_spec)
+                    else:
+                        # the learnware is deleted during the training
+                        for hetero_spec_path in self._get_hetero_spec_paths(idx):
+                            if os.path.exists(hetero_spec_path):
+                                os.remove(hetero_spec_path)
+
+                # the learnwares added during the training are mapped by the new market mapping
+                trained_ids = set(training_learnware_ids)
+                added_ids = [
+                    idx
+                    for idx in self._get_hetero_learnware_ids(
+                        self.get_learnware_ids(check_status=BaseChecker.USABLE_LEARNWARE)
+                    )
+                    if idx not in trained_ids
+                ]
+                if len(added_ids):
+                    self._update_learnware_hetero_spec(added_ids)
+
+    @write_locked
     def delete_learnware(self, id: str) -> bool:
         """Delete learnware from heterogeneous learnware market.
            If a corresponding HeteroMapTableSpecification exists, it is also removed.
@@ -134,13 +252,14 @@ class HeteroMapTableOrganizer(EasyOrganizer):
         """
         flag = super(HeteroMapTableOrganizer, self).delete_learnware(id)
         if flag:
-            hetero_spec_path = os.path.join(self.hetero_specs_path, f"{id}.json")
-            try:
-                os.remove(hetero_spec_path)
-            except FileNotFoundError:
-                pass
+            for hetero_spec_path in self._get_hetero_spec_paths(id):
+                try:
+                    os.remove(hetero_spec_path)
+                except FileNotFoundError:
+                    pass
         return flag
 
+    @write_locked
     def update_learnware(
         self, id: str, zip_path: str = None, semantic_spec: dict = None, check_status: int = None
     ) -> bool:
@@ -170,10 +289,66 @@ class HeteroMapTableOrganizer(EasyOrganizer):
                 self._update_learnware_hetero_spec(id)
         return final_status
 
+    def _get_hetero_specs_arena_meta(self) -> dict:
+        return {
+            "generation": self.dbops.get_generation(),
+            "market_mapping_mtime_ns": os.stat(self.market_mapping_path).st_mtime_ns,
+        }
+
+    def _reload_hetero_specs_from_arena(self, hetero_ids: List[str]) -> bool:
+        """Attach the HeteroMapTableSpecifications memory-mapped from the hetero spec arena to the learnwares.
+
+        Returns
+        -------
+        bool
+            False if the arena does not exist, is stale or misses some of hetero_ids.
+        """
+        if not os.path.exists(self.hetero_specs_arena_path):
+            return False
+
+        try:
+            hetero_specs, meta = load_stat_specs(self.hetero_specs_arena_path)
+        except Exception as err:
+            logger.warning(f"Load hetero spec arena {self.hetero_specs_arena_path} failed due to {err}")
+            return False
+
+        if meta != self._get_hetero_specs_arena_meta() or any(idx not in hetero_specs for idx in hetero_ids):
+            logger.info("Hetero spec arena is stale")
+            return False
+
+        for idx in hetero_ids:
+            self.learnware_list[idx].update_stat_spec(hetero_specs[idx].type, hetero_specs[idx])
+        logger.info(f"Reload {len(hetero_ids)} HeteroMapTableSpecifications from {self.hetero_specs_arena_path}")
+        return True
+
+    def _save_hetero_specs_arena(self, hetero_ids: List[str]):
+        """Save the HeteroMapTableSpecifications into the hetero spec arena and reattach them from the arena, so
+        that the worker processes of the market share their memory.
+        """
+        hetero_specs = {}
+        for idx in hetero_ids:
+            hetero_spec = (
+                self.learnware_list[idx].get_specification().get_stat_spec_by_name(HeteroMapTableSpecification.__name__)
+            )
+            if hetero_spec is not None:
+                hetero_specs[idx] = hetero_spec
+
+        try:
+            save_stat_specs(self.hetero_specs_arena_path, hetero_specs, meta=self._get_hetero_specs_arena_meta())
+            self._reload_hetero_specs_from_arena(list(hetero_specs.keys()))
+        except Exception as err:
+            logger.warning(f"Save hetero spec arena {self.hetero_specs_arena_path} failed due to {err}")
+
+    def _get_hetero_spec_paths(self, learnware_id: str) -> List[str]:
+        """The paths of the npz and the json HeteroMapTableSpecification files of a learnware, the npz file written by
+        the market or `python -m learnware.market.migrate` takes precedence.
+        """
+        return [os.path.join(self.hetero_specs_path, f"{learnware_id}{suffix}") for suffix in (".npz", ".json")]
+
     def _reload_learnware_hetero_spec(self, learnware_id):
         try:
-            hetero_spec_path = os.path.join(self.hetero_specs_path, f"{learnware_id}.json")
-            if os.path.exists(hetero_spec_path):
+            hetero_spec_path = next(filter(os.path.exists, self._get_hetero_spec_paths(learnware_id)), None)
+            if hetero_spec_path is not None:
                 hetero_spec = HeteroMapTableSpecification()
                 hetero_spec.load(hetero_spec_path)
                 self.learnware_list[learnware_id].update_stat_spec(hetero_spec.type, hetero_spec)
@@ -183,6 +358,7 @@ class HeteroMapTableOrganizer(EasyOrganizer):
         except Exception as err:
             logger.error(f"Reload HeteroMapTableSpecification for hetero spec {learnware_id} failed! due to {err}.")
 
+    @write_locked
     def reload_learnware(self, learnware_id: str):
         """Reload learnware into heterogeneous learnware market.
            If a corresponding HeteroMapTableSpecification exists, it is also reloaded.
@@ -196,6 +372,42 @@ class HeteroMapTableOrganizer(EasyOrganizer):
         if len(self._get_hetero_learnware_ids(learnware_id)):
             self._reload_learnware_hetero_spec(learnware_id)
 
+    def _generate_hetero_specs(
+        self, ids: List[str], market_mapping: HeteroMap
+    ) -> Dict[str, HeteroMapTableSpecification]:
+        """Generate the HeteroMapTableSpecifications of learnwares by a market mapping, the failed ones are skipped.
+
+        Parameters
+        ----------
+        ids : List[str]
+            A list of ids of target learnwares
+        market_mapping : HeteroMap
+            The market mapping generating the specifications
+
+        Returns
+        -------
+        Dict[str, HeteroMapTableSpecification]
+            The generated specifications by learnware id
+        """
+        hetero_specs = {}
+        for idx in ids:
+            try:
+                spec = self.learnware_list[idx].get_specification()
+                semantic_spec, stat_spec = spec.get_semantic_spec(), spec.get_stat_spec()["RKMETableSpecification"]
+                features = semantic_spec["Input"]["Description"]
+                hetero_specs[idx] = market_mapping.hetero_mapping(stat_spec, features)
+            except Exception as err:
+                traceback.print_exc()
+                logger.warning(f"Learnware {idx} generate HeteroMapTableSpecification failed!")
+        return hetero_specs
+
+    def _save_learnware_hetero_spec(self, learnware_id: str, hetero_spec: HeteroMapTableSpecification):
+        npz_path, json_path = self._get_hetero_spec_paths(learnware_id)
+        save_path, stale_path = (npz_path, json_path) if self.binary_hetero_specs else (json_path, npz_path)
+        hetero_spec.save(save_path)
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+
     def _update_learnware_hetero_spec(self, ids: Union[str, List[str]]):
         """Update learnware by ids, attempting to generate HeteroMapTableSpecification for them.
 
@@ -209,17 +421,10 @@ class HeteroMapTableOrganizer(EasyOrganizer):
         if isinstance(ids, str):
             ids = [ids]
 
-        for idx in ids:
+        for idx, hetero_spec in self._generate_hetero_specs(ids, self.market_mapping).items():
             try:
-                spec = self.learnware_list[idx].get_specification()
-                semantic_spec, stat_spec = spec.get_semantic_spec(), spec.get_stat_spec()["RKMETableSpecification"]
-                features = semantic_spec["Input"]["Description"]
-                save_path = os.path.join(self.hetero_specs_path, f"{idx}.json")
-
-                hetero_spec = self.market_mapping.hetero_mapping(stat_spec, features)
                 self.learnware_list[idx].update_stat_spec(hetero_spec.type, hetero_spec)
-                hetero_spec.save(save_path)
-
+                self._save_learnware_hetero_spec(idx, hetero_spec)
             except Exception as err:
                 traceback.print_exc()
                 logger.warning(f"Learnware {idx} generate HeteroMapTableSpecification failed!")
@@ -249,6 +454,7 @@ class HeteroMapTableOrganizer(EasyOrganizer):
                 ret.append(idx)
         return ret
 
+    @read_locked
     def generate_hetero_map_spec(self, user_info: BaseUserInfo) -> HeteroMapTableSpecification:
         """Generate HeteroMapTableSpecificaion based on user's input description and statistical information.
 
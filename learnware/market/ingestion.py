@@ -0,0 +1,214 @@
+import itertools
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from shutil import copyfile
+from typing import Dict, List, Optional, Tuple
+
+from .base import BaseChecker, LearnwareMarket
+from ..config import C
+from ..logger import get_module_logger
+
+logger = get_module_logger("ingestion_queue")
+
+
+class IngestionQueue:
+    """Check and add the submitted learnwares in the background.
+
+    The submitted learnwares are saved in the market database, so that the pending ones are resumed after the
+    market is reloaded. The workers take the pending learnwares in the order of priority, then submission, run the
+    checkers with timeouts and add the learnwares through the organizer.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        market: LearnwareMarket,
+        max_workers: Optional[int] = None,
+        checker_timeouts: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        market : LearnwareMarket
+            The market whose organizer is based on EasyOrganizer
+        max_workers : Optional[int], optional
+            The number of background workers, by default C.ingestion_workers.
+            0 means the submitted learnwares are only saved, and checked by the queue started later
+        checker_timeouts : Optional[Dict[str, float]], optional
+            The timeout in seconds of the checkers by name, by default C.ingestion_checker_timeout for all checkers
+        """
+        self.market = market
+        self.dbops = market.learnware_organizer.dbops
+        self.pending_path = os.path.join(market.learnware_organizer.learnware_pool_path, "pending")
+        os.makedirs(self.pending_path, exist_ok=True)
+
+        self.max_workers = C.ingestion_workers if max_workers is None else max_workers
+        self.checker_timeouts = {} if checker_timeouts is None else dict(checker_timeouts)
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+        # the tasks running when the market was stopped are checked again
+        for task in self.dbops.get_ingestion_tasks([self.PENDING, self.RUNNING]):
+            if task["status"] == self.RUNNING:
+                self.dbops.update_ingestion_task(task["id"], status=self.PENDING)
+            self._enqueue(task["id"], task["priority"])
+
+        self._workers = []
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._work, name=f"learnware-ingestion-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _enqueue(self, task_id: str, priority: int):
+        self._queue.put((-priority, next(self._sequence), task_id))
+
+    def submit(
+        self, zip_path: str, semantic_spec: dict, checker_names: Optional[List[str]] = None, priority: int = 0
+    ) -> str:
+        """Submit a learnware, which is checked and added in the background
+
+        Parameters
+        ----------
+        zip_path : str
+            Filepath for learnware model, a zipped file.
+        semantic_spec : dict
+            semantic_spec for new learnware, in dictionary format.
+        checker_names : Optional[List[str]], optional
+            List contains checker names, by default None which means all the checkers of the market
+        priority : int, optional
+            The learnwares with higher priority are checked first, by default 0
+
+        Returns
+        -------
+        str
+            The id of the submission
+        """
+        task_id = uuid.uuid4().hex
+        pending_zip_path = os.path.join(self.pending_path, f"{task_id}.zip")
+        copyfile(zip_path, pending_zip_path)
+        self.dbops.add_ingestion_task(
+            dict(
+                id=task_id,
+                zip_path=pending_zip_path,
+                semantic_spec=semantic_spec,
+                checker_names=checker_names,
+                priority=priority,
+                status=self.PENDING,
+                submit_time=time.time(),
+            )
+        )
+        self._enqueue(task_id, priority)
+        return task_id
+
+    def status(self, task_id: str) -> Optional[dict]:
+        """Get the status of a submission
+
+        Parameters
+        ----------
+        task_id : str
+            The id of the submission
+
+        Returns
+        -------
+        Optional[dict]
+            The submission with keys status, check_status, learnware_id and message, None if it is not found
+        """
+        task = self.dbops.get_ingestion_task(task_id)
+        if task is None:
+            return None
+        return {key: task[key] for key in ("id", "status", "priority", "check_status", "learnware_id", "message")}
+
+    def wait(self, task_id: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """Wait until the submission is finished or failed
+
+        Parameters
+        ----------
+        task_id : str
+            The id of the submission
+        timeout : Optional[float], optional
+            The maximum seconds to wait, by default None which means no limit
+
+        Returns
+        -------
+        Optional[dict]
+            The status of the submission when the waiting ends, see `status`
+        """
+
+        def is_done():
+            task_status = self.status(task_id)
+            return task_status is None or task_status["status"] in (self.FINISHED, self.FAILED)
+
+        with self._condition:
+            self._condition.wait_for(is_done, timeout=timeout)
+        return self.status(task_id)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers, the pending submissions are kept in the database
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Whether to wait for the running submissions, by default True
+        """
+        for _ in self._workers:
+            # the sentinels are taken after all the pending tasks
+            self._queue.put((float("inf"), next(self._sequence), None))
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        self._workers = []
+
+    def _work(self):
+        while True:
+            _, _, task_id = self._queue.get()
+            if task_id is None:
+                return
+
+            try:
+                self._process(task_id)
+            except Exception as err:
+                traceback.print_exc()
+                logger.warning(f"Ingestion of {task_id} failed! Due to {err}.")
+                self.dbops.update_ingestion_task(task_id, status=self.FAILED, message=str(err))
+
+            with self._condition:
+                self._condition.notify_all()
+
+    def _process(self, task_id: str):
+        task = self.dbops.get_ingestion_task(task_id)
+        if task is None or task["status"] != self.PENDING:
+            return
+
+        self.dbops.update_ingestion_task(task_id, status=self.RUNNING)
+        check_status, message = self._check(task)
+
+        learnware_id, check_status = self.market.learnware_organizer.add_learnware(
+            zip_path=task["zip_path"], semantic_spec=task["semantic_spec"], check_status=check_status
+        )
+
+        self.dbops.update_ingestion_task(
+            task_id, status=self.FINISHED, check_status=check_status, learnware_id=learnware_id, message=message
+        )
+        os.remove(task["zip_path"])
+
+    def _check(self, task: dict) -> Tuple[int, str]:
+        checker_names = task["checker_names"]
+        checker_names = list(self.market.learnware_checker.keys()) if checker_names is None else checker_names
+        unknown_names = [name for name in checker_names if name not in self.market.learnware_checker]
+        if len(unknown_names):
+            return BaseChecker.INVALID_LEARNWARE, f"Checkers {unknown_names} are not found"
+
+        checkers = [self.market.learnware_checker[name] for name in checker_names]
+        timeouts = {name: self.checker_timeouts.get(name, C.ingestion_checker_timeout) for name in checker_names}
+        timeouts = {name: timeout for name, timeout in timeouts.items() if timeout is not None}
+        report = self.market._check_learnware_zip(task["zip_path"], task["semantic_spec"], checkers, timeouts)
+        return report.final_status, report.message
@@ -0,0 +1,327 @@
+"""Convert the statistical specifications of an existing market from json into the binary npz format.
+
+Usage::
+
+    python -m learnware.market.migrate --market-id <market_id> [--workers N] [--remove-json]
+
+For every unzipped learnware, the json files of RKME table/text specifications are converted into npz files, the
+arrays are verified to be exactly equal, and then learnware.yaml is atomically replaced to refer to the npz files.
+The HeteroMapTableSpecifications of a heterogeneous market are converted in the same way. Converted learnwares are
+skipped, so the migration can be interrupted and run again. After a migration without failures, the market is marked
+as migrated in its database, and then saves the new HeteroMapTableSpecifications as npz instead of json.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import numpy as np
+
+from .easy.database_ops import DatabaseOperations
+from ..config import C
+from ..logger import get_module_logger
+from ..specification import HeteroMapTableSpecification, RKMETableSpecification
+from ..specification.utils import BINARY_STAT_SPEC_SUFFIX, load_stat_spec_states, save_stat_spec_states
+from ..utils import get_module_by_module_path, read_yaml_to_dict, save_dict_to_yaml
+
+logger = get_module_logger("market_migrate")
+
+# the states which are loaded as tensors by the specifications
+ARRAY_STATE_KEYS = ("z", "beta")
+MIGRATABLE_STAT_SPECS = (RKMETableSpecification, HeteroMapTableSpecification)
+# the key of tb_market_meta which is 1 if the market is migrated
+BINARY_STAT_SPECS_KEY = "binary_stat_specs"
+
+
+def _is_migratable(stat_spec_config: dict) -> bool:
+    try:
+        stat_spec_module = get_module_by_module_path(stat_spec_config["module_path"])
+        stat_spec_cls = getattr(stat_spec_module, stat_spec_config["class_name"])
+    except Exception:
+        return False
+    return isinstance(stat_spec_cls, type) and issubclass(stat_spec_cls, MIGRATABLE_STAT_SPECS)
+
+
+def _read_json_states(json_path: str) -> dict:
+    with open(json_path, "r", encoding="utf-8") as fin:
+        states = json.load(fin)
+    for key in ARRAY_STATE_KEYS:
+        if key in states:
+            states[key] = np.array(states[key])
+    return states
+
+
+def _states_equal(states1: dict, states2: dict) -> bool:
+    if states1.keys() != states2.keys():
+        return False
+
+    for key, value in states1.items():
+        if isinstance(value, np.ndarray) or isinstance(states2[key], np.ndarray):
+            other = states2[key]
+            if not isinstance(value, np.ndarray) or not isinstance(other, np.ndarray):
+                return False
+            if value.dtype != other.dtype or not np.array_equal(value, other):
+                return False
+        elif value != states2[key]:
+            return False
+    return True
+
+
+def migrate_stat_spec_file(json_path: str, npz_path: str) -> dict:
+    """Convert a json specification file into npz and verify that the states are exactly equal
+
+    An existing npz file is reused if it is equal to the json file, thus the conversion is idempotent.
+
+    Returns
+    -------
+    dict
+        The sizes of the two files and the seconds of loading them
+    """
+    start = time.perf_counter()
+    json_states = _read_json_states(json_path)
+    json_load_seconds = time.perf_counter() - start
+
+    if not (os.path.exists(npz_path) and _states_equal(json_states, load_stat_spec_states(npz_path))):
+        save_stat_spec_states(npz_path, json_states)
+
+    start = time.perf_counter()
+    npz_states = load_stat_spec_states(npz_path)
+    npz_load_seconds = time.perf_counter() - start
+
+    if not _states_equal(json_states, npz_states):
+        os.remove(npz_path)
+        raise ValueError(f"{npz_path} is not equal to {json_path} after conversion")
+
+    return {
+        "json_bytes": os.path.getsize(json_path),
+        "npz_bytes": os.path.getsize(npz_path),
+        "json_load_seconds": json_load_seconds,
+        "npz_load_seconds": npz_load_seconds,
+    }
+
+
+def _new_report(path: str) -> dict:
+    return {
+        "path": path,
+        "status": "skipped",
+        "files": 0,
+        "json_bytes": 0,
+        "npz_bytes": 0,
+        "json_load_seconds": 0.0,
+        "npz_load_seconds": 0.0,
+        "seconds": 0.0,
+        "error": None,
+    }
+
+
+def _update_report(report: dict, file_report: dict):
+    report["files"] += 1
+    for key, value in file_report.items():
+        report[key] += value
+
+
+def migrate_learnware_folder(learnware_dirpath: str, remove_json: bool = False) -> dict:
+    """Convert the statistical specifications of an unzipped learnware and update its learnware.yaml
+
+    Parameters
+    ----------
+    learnware_dirpath : str
+        The path of the unzipped learnware folder
+    remove_json : bool, optional
+        Whether to remove the json files after learnware.yaml is updated, by default False
+
+    Returns
+    -------
+    dict
+        The report of the folder, whose status is "migrated", "skipped" or "failed"
+    """
+    report = _new_report(learnware_dirpath)
+    start = time.perf_counter()
+    try:
+        yaml_path = os.path.join(learnware_dirpath, C.learnware_folder_config["yaml_file"])
+        yaml_config = read_yaml_to_dict(yaml_path)
+        stat_spec_configs = yaml_config.get(
+            "stat_specifications",
+            [
+                {
+                    "module_path": "learnware.specification",
+                    "class_name": "RKMETableSpecification",
+                    "file_name": "stat_spec.json",
+                    "kwargs": {},
+                }
+            ],
+        )
+
+        new_stat_spec_configs, json_paths, yaml_updated = [], [], False
+        for stat_spec_config in stat_spec_configs:
+            stat_spec_config = dict(stat_spec_config)
+            file_name = stat_spec_config["file_name"]
+            if file_name.endswith(".json") and _is_migratable(stat_spec_config):
+                npz_name = os.path.splitext(file_name)[0] + BINARY_STAT_SPEC_SUFFIX
+                json_path = os.path.join(learnware_dirpath, file_name)
+                file_report = migrate_stat_spec_file(json_path, os.path.join(learnware_dirpath, npz_name))
+                _update_report(report, file_report)
+                stat_spec_config["file_name"] = npz_name
+                json_paths.append(json_path)
+                yaml_updated = True
+            elif file_name.endswith(BINARY_STAT_SPEC_SUFFIX) and remove_json:
+                # migrated by a previous run which kept the json files
+                json_path = os.path.join(learnware_dirpath, os.path.splitext(file_name)[0] + ".json")
+                if os.path.exists(json_path):
+                    migrate_stat_spec_file(json_path, os.path.join(learnware_dirpath, file_name))
+                    json_paths.append(json_path)
+            new_stat_spec_configs.append(stat_spec_config)
+
+        if yaml_updated:
+            yaml_config["stat_specifications"] = new_stat_spec_configs
+            fd, temp_path = tempfile.mkstemp(prefix=".learnware_", suffix=".yaml", dir=learnware_dirpath)
+            os.close(fd)
+            try:
+                save_dict_to_yaml(yaml_config, temp_path)
+                os.replace(temp_path, yaml_path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            report["status"] = "migrated"
+
+        if remove_json:
+            for json_path in json_paths:
+                os.remove(json_path)
+    except Exception as err:
+        report["status"] = "failed"
+        report["error"] = f"{err}\n{traceback.format_exc()}"
+
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def migrate_hetero_spec_file(json_path: str, remove_json: bool = False) -> dict:
+    """Convert a HeteroMapTableSpecification json file in hetero/hetero_specifications into npz
+
+    Returns
+    -------
+    dict
+        The report of the file, whose status is "migrated", "skipped" or "failed"
+    """
+    report = _new_report(json_path)
+    start = time.perf_counter()
+    try:
+        npz_path = os.path.splitext(json_path)[0] + BINARY_STAT_SPEC_SUFFIX
+        _update_report(report, migrate_stat_spec_file(json_path, npz_path))
+        report["status"] = "migrated"
+        if remove_json:
+            os.remove(json_path)
+    except Exception as err:
+        report["status"] = "failed"
+        report["error"] = f"{err}\n{traceback.format_exc()}"
+
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def _run_migration(tasks: List[tuple], max_workers: int) -> List[dict]:
+    max_workers = max(1, min(max_workers, len(tasks)))
+    if max_workers == 1:
+        return [_run_task(task) for task in tasks]
+
+    chunksize = max(1, len(tasks) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_run_task, tasks, chunksize=chunksize))
+
+
+def _run_task(task: tuple) -> dict:
+    func, *args = task
+    return func(*args)
+
+
+def migrate_market(market_id: str, max_workers: int = None, remove_json: bool = False) -> dict:
+    """Convert the statistical specifications of a market into the binary npz format in parallel
+
+    Parameters
+    ----------
+    market_id : str
+        The id of the market
+    max_workers : int, optional
+        The number of worker processes, by default using all the cores
+    remove_json : bool, optional
+        Whether to remove the json files after conversion, by default False.
+        Note that the json files are still kept in the zipped learnwares.
+
+    Returns
+    -------
+    dict
+        The summary and the reports of every learnware folder and hetero spec file. The market is marked as
+        migrated if no file fails
+    """
+    market_store_path = os.path.join(C.market_root_path, market_id)
+    if not os.path.isdir(market_store_path):
+        raise FileNotFoundError(f"Market {market_id} is not found in {C.market_root_path}")
+    max_workers = os.cpu_count() if max_workers is None else max_workers
+
+    tasks = []
+    folder_pool_path = os.path.join(market_store_path, "learnware_pool", "unzipped_learnwares")
+    if os.path.isdir(folder_pool_path):
+        for name in sorted(os.listdir(folder_pool_path)):
+            if os.path.isdir(os.path.join(folder_pool_path, name)):
+                tasks.append((migrate_learnware_folder, os.path.join(folder_pool_path, name), remove_json))
+
+    hetero_specs_path = os.path.join(market_store_path, "hetero", "hetero_specifications")
+    if os.path.isdir(hetero_specs_path):
+        for name in sorted(os.listdir(hetero_specs_path)):
+            if name.endswith(".json"):
+                tasks.append((migrate_hetero_spec_file, os.path.join(hetero_specs_path, name), remove_json))
+
+    start = time.perf_counter()
+    reports = _run_migration(tasks, max_workers)
+    summary = {"market_id": market_id, "seconds": time.perf_counter() - start}
+    for status in ("migrated", "skipped", "failed"):
+        summary[status] = sum(report["status"] == status for report in reports)
+    for key in ("files", "json_bytes", "npz_bytes", "json_load_seconds", "npz_load_seconds"):
+        summary[key] = sum(report[key] for report in reports)
+
+    if summary["failed"] == 0:
+        DatabaseOperations(C.database_url, "market_" + market_id).set_meta_value(BINARY_STAT_SPECS_KEY, 1)
+    return {"summary": summary, "reports": reports}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the specifications of a market into the binary npz format")
+    parser.add_argument("--market-id", type=str, required=True, help="id of the market to migrate")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes, all cores by default")
+    parser.add_argument("--remove-json", action="store_true", help="remove json files after conversion")
+    parser.add_argument("--report", type=str, default=None, help="path to save the full report in json format")
+    args = parser.parse_args()
+
+    result = migrate_market(args.market_id, max_workers=args.workers, remove_json=args.remove_json)
+    summary = result["summary"]
+    for report in result["reports"]:
+        if report["status"] == "failed":
+            logger.error(f"Migrate {report['path']} failed due to {report['error']}")
+
+    print(
+        f"Market {summary['market_id']}: {summary['migrated']} migrated, {summary['skipped']} skipped, "
+        f"{summary['failed']} failed in {summary['seconds']:.2f}s"
+    )
+    if summary["files"] > 0:
+        print(
+            f"{summary['files']} specification files: json {summary['json_bytes'] / 2**20:.2f}MB -> "
+            f"npz {summary['npz_bytes'] / 2**20:.2f}MB, loading json {summary['json_load_seconds']:.3f}s -> "
+            f"npz {summary['npz_load_seconds']:.3f}s"
+        )
+
+    if args.report is not None:
+        with open(args.report, "w", encoding="utf-8") as fout:
+            json.dump(result, fout, indent=2)
+
+    if summary["failed"] > 0:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
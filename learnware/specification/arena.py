@@ -0,0 +1,267 @@
+import json
+import os
+import struct
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import BaseStatSpecification
+from ..logger import get_module_logger
+from ..utils import get_module_by_module_path, is_torch_available
+
+logger = get_module_logger("spec_arena")
+
+ARENA_MAGIC = b"LWARENA1"
+ARENA_ALIGNMENT = 64
+ARENA_PAGE_SIZE = 4096
+
+
+def _align(offset: int, alignment: int = ARENA_ALIGNMENT) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def _is_json_serializable(value) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _is_torch_tensor(value) -> bool:
+    if not is_torch_available(verbose=False):
+        return False
+
+    import torch
+
+    return torch.is_tensor(value)
+
+
+class SpecArenaWriter:
+    """Collect the arrays of statistical specifications into one contiguous arena"""
+
+    def __init__(self):
+        self.arrays: List[Tuple[int, np.ndarray]] = []
+        self.nbytes = 0
+
+    def pack(self, stat_spec: BaseStatSpecification) -> dict:
+        """Split the states of a statistical specification into json states and arrays appended to the arena
+
+        Parameters
+        ----------
+        stat_spec : BaseStatSpecification
+            The statistical specification to be packed
+
+        Returns
+        -------
+        dict
+            The packed description of the specification, which is json serializable
+
+        Raises
+        ------
+        TypeError
+            If some state is neither an array nor json serializable, nothing is appended to the arena in this case
+        """
+        spec_cls = stat_spec.__class__
+        states, arrays = {}, {}
+        for name, value in stat_spec.get_states().items():
+            if _is_torch_tensor(value):
+                arrays[name] = ("torch", np.ascontiguousarray(value.detach().cpu().numpy()))
+            elif isinstance(value, np.ndarray):
+                arrays[name] = ("numpy", np.ascontiguousarray(value))
+            elif _is_json_serializable(value):
+                states[name] = value
+            else:
+                raise TypeError(f"state {name} of {spec_cls.__name__} cannot be saved in spec arena")
+
+        packed = {"module_path": spec_cls.__module__, "class_name": spec_cls.__name__, "states": states, "arrays": {}}
+        for name, (kind, array) in arrays.items():
+            offset = _align(self.nbytes)
+            packed["arrays"][name] = {
+                "kind": kind,
+                "offset": offset,
+                "shape": list(array.shape),
+                "dtype": array.dtype.str,
+            }
+            self.arrays.append((offset, array))
+            self.nbytes = offset + array.nbytes
+
+        return packed
+
+    def write(self, fout, offset: int):
+        for array_offset, array in self.arrays:
+            fout.seek(offset + array_offset)
+            fout.write(array.tobytes())
+
+
+class SpecArena:
+    """A read-side view of an arena, specifications unpacked from it share the memory of the arena"""
+
+    def __init__(self, data: np.ndarray):
+        """
+        Parameters
+        ----------
+        data : np.ndarray
+            The bytes of the arena as an uint8 array, usually a slice of a memory-mapped file
+        """
+        self.data = data
+
+    def unpack(self, packed: dict) -> BaseStatSpecification:
+        """Construct a statistical specification whose arrays are views into the arena
+
+        Parameters
+        ----------
+        packed : dict
+            The description returned by SpecArenaWriter.pack
+
+        Returns
+        -------
+        BaseStatSpecification
+            The unpacked statistical specification
+        """
+        spec_module = get_module_by_module_path(packed["module_path"])
+        stat_spec = getattr(spec_module, packed["class_name"])()
+
+        for name, value in packed["states"].items():
+            setattr(stat_spec, name, value)
+
+        device = getattr(stat_spec, "_device", None)
+        for name, desc in packed["arrays"].items():
+            dtype = np.dtype(desc["dtype"])
+            nbytes = int(np.prod(desc["shape"], dtype=np.int64)) * dtype.itemsize
+            array = self.data[desc["offset"] : desc["offset"] + nbytes].view(dtype).reshape(desc["shape"])
+            if desc["kind"] == "torch":
+                import torch
+
+                array = torch.from_numpy(array)
+                if device is not None and device.type != "cpu":
+                    array = array.to(device)
+            setattr(stat_spec, name, array)
+
+        return stat_spec
+
+
+def save_spec_arena(filepath: str, header: dict, writers: Dict[str, SpecArenaWriter], magic: bytes = ARENA_MAGIC):
+    """Save arenas and a json header into one file.
+
+    The data section and every arena start at page boundaries, so that the file can be memory-mapped by
+    several processes which then share the same physical pages.
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the arena file, which is replaced atomically
+    header : dict
+        The json serializable header, the key "arenas" is reserved
+    writers : Dict[str, SpecArenaWriter]
+        The arenas to be saved
+    magic : bytes, optional
+        The magic bytes identifying the file format, by default ARENA_MAGIC
+    """
+    arenas, arena_offset = {}, 0
+    for name, writer in writers.items():
+        arenas[name] = {"offset": arena_offset, "nbytes": writer.nbytes}
+        arena_offset = _align(arena_offset + writer.nbytes, ARENA_PAGE_SIZE)
+
+    header_bytes = json.dumps({**header, "arenas": arenas}).encode("utf-8")
+    data_offset = _align(len(magic) + 8 + len(header_bytes), ARENA_PAGE_SIZE)
+
+    # write into a temporary file and rename it, so that readers never see a partial file
+    fd, temp_path = tempfile.mkstemp(prefix=".arena_", dir=os.path.dirname(os.path.abspath(filepath)))
+    try:
+        with os.fdopen(fd, "wb") as fout:
+            fout.write(magic)
+            fout.write(struct.pack("<Q", len(header_bytes)))
+            fout.write(header_bytes)
+            for name, writer in writers.items():
+                writer.write(fout, data_offset + arenas[name]["offset"])
+            fout.truncate(data_offset + arena_offset)
+        os.replace(temp_path, filepath)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def read_spec_arena_header(filepath: str, magic: bytes = ARENA_MAGIC) -> Tuple[dict, int]:
+    """Read the json header of an arena file
+
+    Returns
+    -------
+    Tuple[dict, int]
+        The header and the file offset where the arenas start
+    """
+    with open(filepath, "rb") as fin:
+        if fin.read(len(magic)) != magic:
+            raise ValueError(f"{filepath} is not a valid arena file")
+        (header_size,) = struct.unpack("<Q", fin.read(8))
+        header = json.loads(fin.read(header_size).decode("utf-8"))
+    return header, _align(len(magic) + 8 + header_size, ARENA_PAGE_SIZE)
+
+
+def open_spec_arena(
+    filepath: str, magic: bytes = ARENA_MAGIC, header: Optional[Tuple[dict, int]] = None
+) -> Tuple[dict, Dict[str, SpecArena]]:
+    """Memory-map an arena file.
+
+    The file is mapped copy-on-write: all processes mapping the file share the physical pages of the page cache,
+    and a page is only copied into private memory of the process that writes it.
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the arena file
+    magic : bytes, optional
+        The magic bytes identifying the file format, by default ARENA_MAGIC
+    header : Tuple[dict, int], optional
+        The result of read_spec_arena_header if it has been read, by default None
+
+    Returns
+    -------
+    Tuple[dict, Dict[str, SpecArena]]
+        The header and the arenas
+    """
+    header, data_offset = read_spec_arena_header(filepath, magic) if header is None else header
+
+    arenas = {}
+    file_size = os.path.getsize(filepath)
+    if file_size > data_offset:
+        data = np.memmap(filepath, dtype=np.uint8, mode="c", offset=data_offset, shape=(file_size - data_offset,))
+        for name, arena in header["arenas"].items():
+            arenas[name] = SpecArena(data[arena["offset"] : arena["offset"] + arena["nbytes"]])
+    else:
+        for name in header["arenas"]:
+            arenas[name] = SpecArena(np.zeros(0, dtype=np.uint8))
+
+    return header, arenas
+
+
+def save_stat_specs(filepath: str, stat_specs: Dict[str, BaseStatSpecification], meta: dict = None):
+    """Save statistical specifications of the same type into an arena file
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the arena file
+    stat_specs : Dict[str, BaseStatSpecification]
+        The specifications keyed by any string, e.g., learnware id
+    meta : dict, optional
+        The json serializable meta information saved along with the specifications
+    """
+    writer = SpecArenaWriter()
+    packed = {key: writer.pack(stat_spec) for key, stat_spec in stat_specs.items()}
+    save_spec_arena(filepath, {"meta": {} if meta is None else meta, "specs": packed}, {"specs": writer})
+
+
+def load_stat_specs(filepath: str) -> Tuple[Dict[str, BaseStatSpecification], dict]:
+    """Load statistical specifications saved by save_stat_specs, the arrays are memory-mapped
+
+    Returns
+    -------
+    Tuple[Dict[str, BaseStatSpecification], dict]
+        The specifications and the meta information
+    """
+    header, arenas = open_spec_arena(filepath)
+    arena = arenas["specs"]
+    return {key: arena.unpack(packed) for key, packed in header["specs"].items()}, header["meta"]
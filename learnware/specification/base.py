@@ -6,6 +6,9 @@ from typing import Dict
 class BaseStatSpecification:
     """The Statistical Specification Interface, which provide save and load method"""
 
+    # subclasses declare their own slots to avoid per-instance dicts, those without slots still get a __dict__
+    __slots__ = ("type",)
+
     def __init__(self, type: str):
         """initilize the type of stats specification
         Parameters
@@ -20,7 +23,13 @@ class BaseStatSpecification:
         raise NotImplementedError("generate_stat_spec_from_data is not implemented")
 
     def get_states(self):
-        return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+        states = {}
+        for cls in reversed(type(self).__mro__):
+            for k in cls.__dict__.get("__slots__", ()):
+                if not k.startswith("_") and hasattr(self, k):
+                    states[k] = getattr(self, k)
+        states.update({k: v for k, v in getattr(self, "__dict__", {}).items() if not k.startswith("_")})
+        return states
 
     def dist(self, stat_spec: BaseStatSpecification):
         raise NotImplementedError("dist is not implemented")
@@ -50,6 +59,8 @@ class BaseStatSpecification:
 class Specification:
     """The specification interface, which manages the semantic specifications and statistical specifications"""
 
+    __slots__ = ("semantic_spec", "stat_spec")
+
     def __init__(self, semantic_spec: dict = None, stat_spec: Dict[str, BaseStatSpecification] = None):
         """The initialization method
 
@@ -4,6 +4,8 @@ from ..base import BaseStatSpecification
 
 
 class RegularStatSpecification(BaseStatSpecification):
+    __slots__ = ()
+
     def generate_stat_spec(self, **kwargs):
         self.generate_stat_spec_from_data(**kwargs)
 
@@ -12,6 +12,8 @@ import torch
 from qpsolvers import Problem, solve_problem
 
 from ..base import RegularStatSpecification
+from ...utils import is_binary_stat_spec_file, load_stat_spec_states, save_stat_spec_states
+from ....config import C
 from ....logger import get_module_logger
 from ....utils import allocate_cuda_idx, choose_device
 
@@ -21,6 +23,8 @@ logger = get_module_logger("rkme")
 class RKMETableSpecification(RegularStatSpecification):
     """Reduced Kernel Mean Embedding (RKME) Specification"""
 
+    __slots__ = ("z", "beta", "gamma", "num_points", "_cuda_idx", "_device")
+
     def __init__(self, gamma: float = 0.1, cuda_idx: int = None):
         """Initializing RKME parameters.
 
@@ -415,7 +419,8 @@ class RKMETableSpecification(RegularStatSpecification):
         return S.detach().cpu().numpy()
 
     def save(self, filepath: str):
-        """Save the computed RKME specification to a specified path in JSON format.
+        """Save the computed RKME specification to a specified path in JSON format,
+        or in the binary npz format if the path ends with .npz.
 
         Parameters
         ----------
@@ -424,6 +429,10 @@ class RKMETableSpecification(RegularStatSpecification):
         """
         save_path = filepath
         rkme_to_save = self.get_states()
+        if is_binary_stat_spec_file(save_path):
+            save_stat_spec_states(save_path, rkme_to_save)
+            return
+
         if torch.is_tensor(rkme_to_save["z"]):
             rkme_to_save["z"] = rkme_to_save["z"].detach().cpu().numpy()
         rkme_to_save["z"] = rkme_to_save["z"].tolist()
@@ -434,7 +443,8 @@ class RKMETableSpecification(RegularStatSpecification):
             json.dump(rkme_to_save, fout, separators=(",", ":"))
 
     def load(self, filepath: str) -> bool:
-        """Load a RKME specification file in JSON format from the specified path.
+        """Load a RKME specification file in JSON format (or npz format if the path ends with .npz)
+        from the specified path.
 
         Parameters
         ----------
@@ -449,11 +459,15 @@ class RKMETableSpecification(RegularStatSpecification):
         # Load JSON file:
         load_path = filepath
         if os.path.exists(load_path):
-            with codecs.open(load_path, "r", encoding="utf-8") as fin:
-                obj_text = fin.read()
-            rkme_load = json.loads(obj_text)
-            rkme_load["z"] = torch.from_numpy(np.array(rkme_load["z"]))
-            rkme_load["beta"] = torch.from_numpy(np.array(rkme_load["beta"]))
+            if is_binary_stat_spec_file(load_path):
+                rkme_load = load_stat_spec_states(load_path)
+            else:
+                with codecs.open(load_path, "r", encoding="utf-8") as fin:
+                    obj_text = fin.read()
+                rkme_load = json.loads(obj_text)
+            # the arrays are stored in C.stat_spec_storage_dtype, kernels are always computed in float64
+            rkme_load["z"] = torch.from_numpy(np.array(rkme_load["z"], dtype=C.stat_spec_storage_dtype))
+            rkme_load["beta"] = torch.from_numpy(np.array(rkme_load["beta"], dtype=C.stat_spec_storage_dtype))
 
             for d in self.get_states():
                 if d in rkme_load.keys():
@@ -469,6 +483,8 @@ class RKMEStatSpecification(RKMETableSpecification):
     TODO: modify all learnware in database and remove this nickname
     """
 
+    __slots__ = ()
+
     def __init__(self, gamma: float = 0.1, cuda_idx: int = -1):
         super(RKMEStatSpecification, self).__init__(gamma=gamma, cuda_idx=cuda_idx)
         super(RKMETableSpecification, self).__init__(type=RKMETableSpecification.__name__)
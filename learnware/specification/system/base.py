@@ -2,6 +2,8 @@ from ..base import BaseStatSpecification
 
 
 class SystemStatSpecification(BaseStatSpecification):
+    __slots__ = ()
+
     def generate_stat_spec(self, **kwargs):
         self.generate_stat_spec_from_system(**kwargs)
 
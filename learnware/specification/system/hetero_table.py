@@ -10,6 +10,8 @@ import torch
 from .base import SystemStatSpecification
 from ..regular import RKMETableSpecification
 from ..regular.table.rkme import torch_rbf_kernel
+from ..utils import is_binary_stat_spec_file, load_stat_spec_states, save_stat_spec_states
+from ...config import C
 from ...logger import get_module_logger
 from ...utils import allocate_cuda_idx, choose_device
 
@@ -19,6 +21,8 @@ logger = get_module_logger("hetero_map_table_spec")
 class HeteroMapTableSpecification(SystemStatSpecification):
     """Heterogeneous Map-Table Specification"""
 
+    __slots__ = ("z", "beta", "embedding", "weight", "gamma", "_cuda_idx", "_device")
+
     def __init__(self, gamma: float = 0.1, cuda_idx: int = None):
         """Initializing HeteroMapTableSpecification parameters.
 
@@ -114,7 +118,8 @@ class HeteroMapTableSpecification(SystemStatSpecification):
         return float(term1 - 2 * term2 + term3)
 
     def load(self, filepath: str) -> bool:
-        """Load a HeteroMapTableSpecification file in JSON format from the specified path.
+        """Load a HeteroMapTableSpecification file in JSON format (or npz format if the path ends with .npz)
+        from the specified path.
 
         Parameters
         ----------
@@ -128,11 +133,14 @@ class HeteroMapTableSpecification(SystemStatSpecification):
         """
         load_path = filepath
         if os.path.exists(load_path):
-            with codecs.open(load_path, "r", encoding="utf-8") as fin:
-                obj_text = fin.read()
-            embedding_load = json.loads(obj_text)
-            embedding_load["z"] = torch.from_numpy(np.array(embedding_load["z"]))
-            embedding_load["beta"] = torch.from_numpy(np.array(embedding_load["beta"]))
+            if is_binary_stat_spec_file(load_path):
+                embedding_load = load_stat_spec_states(load_path)
+            else:
+                with codecs.open(load_path, "r", encoding="utf-8") as fin:
+                    obj_text = fin.read()
+                embedding_load = json.loads(obj_text)
+            embedding_load["z"] = torch.from_numpy(np.array(embedding_load["z"], dtype=C.stat_spec_storage_dtype))
+            embedding_load["beta"] = torch.from_numpy(np.array(embedding_load["beta"], dtype=C.stat_spec_storage_dtype))
 
             for d in self.get_states():
                 if d in embedding_load.keys():
@@ -143,7 +151,8 @@ class HeteroMapTableSpecification(SystemStatSpecification):
                     setattr(self, d, embedding_load[d])
 
     def save(self, filepath: str) -> bool:
-        """Save the computed HeteroMapTableSpecification to a specified path in JSON format.
+        """Save the computed HeteroMapTableSpecification to a specified path in JSON format,
+        or in the binary npz format if the path ends with .npz.
 
         Parameters
         ----------
@@ -152,6 +161,10 @@ class HeteroMapTableSpecification(SystemStatSpecification):
         """
         save_path = filepath
         embedding_to_save = self.get_states()
+        if is_binary_stat_spec_file(save_path):
+            save_stat_spec_states(save_path, embedding_to_save)
+            return
+
         if torch.is_tensor(embedding_to_save["z"]):
             embedding_to_save["z"] = embedding_to_save["z"].detach().cpu().numpy()
         embedding_to_save["z"] = embedding_to_save["z"].tolist()
@@ -1,3 +1,6 @@
+import json
+import os
+import tempfile
 from typing import Union
 
 import numpy as np
@@ -28,3 +31,63 @@ def convert_to_numpy(data: Union[np.ndarray, pd.DataFrame, torch.Tensor]):
         raise TypeError(
             "Unsupported data format. Please provide a NumPy array, a Pandas DataFrame, or a PyTorch Tensor."
         )
+
+
+BINARY_STAT_SPEC_SUFFIX = ".npz"
+
+
+def is_binary_stat_spec_file(filepath: str) -> bool:
+    return filepath.endswith(BINARY_STAT_SPEC_SUFFIX)
+
+
+def save_stat_spec_states(filepath: str, states: dict):
+    """Save the states of a statistical specification into a binary npz file.
+
+    Arrays and tensors are saved as raw arrays without any conversion, other states must be json serializable.
+
+    Parameters
+    ----------
+    filepath : str
+        The saved file path, which should end with .npz
+    states : dict
+        The states of the statistical specification, i.e., the result of get_states()
+    """
+    arrays, json_states = {}, {}
+    for name, value in states.items():
+        if isinstance(value, (np.ndarray, torch.Tensor)):
+            arrays[name] = convert_to_numpy(value)
+        else:
+            json_states[name] = value
+
+    # write into a temporary file and rename it, so that the file is never partially written
+    dirpath = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_path = tempfile.mkstemp(prefix=".stat_spec_", suffix=BINARY_STAT_SPEC_SUFFIX, dir=dirpath)
+    try:
+        with os.fdopen(fd, "wb") as fout:
+            np.savez(fout, __states__=np.frombuffer(json.dumps(json_states).encode("utf-8"), dtype=np.uint8), **arrays)
+        os.replace(temp_path, filepath)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def load_stat_spec_states(filepath: str) -> dict:
+    """Load the states of a statistical specification saved by save_stat_spec_states
+
+    Parameters
+    ----------
+    filepath : str
+        The npz file path
+
+    Returns
+    -------
+    dict
+        The states, arrays are loaded as np.ndarray
+    """
+    with np.load(filepath, allow_pickle=False) as data:
+        states = json.loads(data["__states__"].tobytes().decode("utf-8"))
+        for name in data.files:
+            if name != "__states__":
+                states[name] = data[name]
+    return states
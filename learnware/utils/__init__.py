@@ -4,7 +4,7 @@ import zipfile
 from .file import convert_folder_to_zipfile, read_yaml_to_dict, save_dict_to_yaml
 from .gpu import allocate_cuda_idx, choose_device, setup_seed
 from .import_utils import is_torch_available
-from .module import get_module_by_module_path
+from .module import get_module_by_module_path, unload_module_by_module_path, unload_modules_in_dirpath
 
 
 def zip_learnware_folder(path: str, output_name: str):
@@ -26,4 +26,6 @@ __all__ = [
     "setup_seed",
     "is_torch_available",
     "get_module_by_module_path",
+    "unload_module_by_module_path",
+    "unload_modules_in_dirpath",
 ]
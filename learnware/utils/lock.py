@@ -0,0 +1,116 @@
+import functools
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """A reentrant reader/writer lock preferring writers.
+
+    Readers share the lock with each other, and a writer holds it exclusively. New readers wait while a writer is
+    waiting, so that writers are not starved by continuous reads. The lock is reentrant: a thread holding the read
+    lock may read again, and a thread holding the write lock may read or write again. Upgrading a read lock to a
+    write lock is not supported since two upgrading readers would deadlock.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def _get_read_depth(self) -> int:
+        return getattr(self._local, "read_depth", 0)
+
+    def acquire_read(self):
+        read_depth = self._get_read_depth()
+        if read_depth > 0 or self._writer == threading.get_ident():
+            self._local.read_depth = read_depth + 1
+            return
+
+        with self._condition:
+            while self._writer is not None or self._waiting_writers > 0:
+                self._condition.wait()
+            self._readers += 1
+        self._local.read_depth = 1
+        self._local.read_counted = True
+
+    def release_read(self):
+        read_depth = self._get_read_depth()
+        if read_depth <= 0:
+            raise RuntimeError("Cannot release a read lock which is not acquired")
+
+        self._local.read_depth = read_depth - 1
+        if read_depth == 1 and getattr(self._local, "read_counted", False):
+            self._local.read_counted = False
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    def acquire_write(self):
+        thread_id = threading.get_ident()
+        if self._writer == thread_id:
+            self._write_depth += 1
+            return
+        if self._get_read_depth() > 0:
+            raise RuntimeError("Cannot acquire a write lock while holding a read lock")
+
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers > 0:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = thread_id
+            self._write_depth = 1
+
+    def release_write(self):
+        if self._writer != threading.get_ident():
+            raise RuntimeError("Cannot release a write lock which is not acquired")
+
+        self._write_depth -= 1
+        if self._write_depth == 0:
+            with self._condition:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read_lock(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_lock(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def read_locked(method):
+    """Decorate a method to run with the read lock of the instance, i.e., `self.lock`"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.read_lock():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def write_locked(method):
+    """Decorate a method to run with the write lock of the instance, i.e., `self.lock`"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.write_lock():
+            return method(self, *args, **kwargs)
+
+    return wrapper
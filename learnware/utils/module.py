@@ -1,12 +1,49 @@
+import hashlib
 import importlib
 import importlib.util
+import os
 import re
 import sys
+import threading
 from types import ModuleType
-from typing import Union
+from typing import Dict, Tuple, Union
 
+# the executed python files, keyed by the absolute path, with the (inode, mtime, size) of the executed file
+_file_modules: Dict[str, Tuple[Tuple[int, int, int], ModuleType]] = {}
+_file_module_locks: Dict[str, threading.Lock] = {}
+_file_modules_lock = threading.Lock()
 
-def get_module_by_module_path(module_path: Union[str, ModuleType]):
+
+def _get_file_module_name(module_abspath: str) -> str:
+    """Get a unique module name for a python file, so that the files of different learnwares do not collide"""
+    module_stem = re.sub("[^0-9a-zA-Z_]", "_", os.path.splitext(os.path.basename(module_abspath))[0])
+    path_digest = hashlib.sha1(module_abspath.encode("utf-8")).hexdigest()[:16]
+    return f"learnware_module_{path_digest}_{module_stem}"
+
+
+def _get_file_module_lock(module_abspath: str) -> threading.Lock:
+    with _file_modules_lock:
+        return _file_module_locks.setdefault(module_abspath, threading.Lock())
+
+
+def get_module_by_module_path(module_path: Union[str, ModuleType], reload: bool = False):
+    """Get a module by its name or the path of its python file.
+
+    A python file is executed once and reused until it is changed, i.e., its inode, mtime or size differs,
+    or it is unloaded by `unload_module_by_module_path`.
+
+    Parameters
+    ----------
+    module_path : Union[str, ModuleType]
+        The module, the name of the module or the path of the python file
+    reload : bool, optional
+        Whether to execute the python file again even if it is not changed, by default False
+
+    Returns
+    -------
+    ModuleType
+        The module
+    """
     if module_path is None:
         raise ModuleNotFoundError("None is passed in as parameters as module_path")
 
@@ -14,11 +51,67 @@ def get_module_by_module_path(module_path: Union[str, ModuleType]):
         module = module_path
     else:
         if module_path.endswith(".py"):
-            module_name = re.sub("^[^a-zA-Z_]+", "", re.sub("[^0-9a-zA-Z_]", "", module_path[:-3].replace("/", "_")))
-            module_spec = importlib.util.spec_from_file_location(module_name, module_path)
-            module = importlib.util.module_from_spec(module_spec)
-            sys.modules[module_name] = module
-            module_spec.loader.exec_module(module)
+            module_abspath = os.path.abspath(module_path)
+            with _get_file_module_lock(module_abspath):
+                file_stat = os.stat(module_abspath)
+                file_key = (file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+                cached = _file_modules.get(module_abspath)
+                if not reload and cached is not None and cached[0] == file_key:
+                    return cached[1]
+
+                module_name = _get_file_module_name(module_abspath)
+                module_spec = importlib.util.spec_from_file_location(module_name, module_abspath)
+                module = importlib.util.module_from_spec(module_spec)
+                sys.modules[module_name] = module
+                try:
+                    module_spec.loader.exec_module(module)
+                except BaseException:
+                    sys.modules.pop(module_name, None)
+                    _file_modules.pop(module_abspath, None)
+                    raise
+                _file_modules[module_abspath] = (file_key, module)
         else:
             module = importlib.import_module(module_path)
     return module
+
+
+def unload_module_by_module_path(module_path: str) -> bool:
+    """Forget an executed python file, so that it is executed again when it is used
+
+    Parameters
+    ----------
+    module_path : str
+        The path of the python file
+
+    Returns
+    -------
+    bool
+        A flag indicating whether the file was loaded
+    """
+    module_abspath = os.path.abspath(module_path)
+    with _file_modules_lock:
+        cached = _file_modules.pop(module_abspath, None)
+        _file_module_locks.pop(module_abspath, None)
+    if cached is None:
+        return False
+    sys.modules.pop(_get_file_module_name(module_abspath), None)
+    return True
+
+
+def unload_modules_in_dirpath(dirpath: str) -> int:
+    """Forget the executed python files in a directory, e.g., the folder of a removed learnware
+
+    Parameters
+    ----------
+    dirpath : str
+        The directory of the python files
+
+    Returns
+    -------
+    int
+        The number of the unloaded files
+    """
+    dir_abspath = os.path.join(os.path.abspath(dirpath), "")
+    with _file_modules_lock:
+        module_abspaths = [path for path in _file_modules if path.startswith(dir_abspath)]
+    return sum(unload_module_by_module_path(path) for path in module_abspaths)
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from learnware.learnware import Learnware, ModelPool, set_model_pool
+from learnware.model import BaseModel
+from learnware.specification import Specification
+
+MODEL_SOURCE = """
+import numpy as np
+
+from learnware.model import BaseModel
+
+
+class Model(BaseModel):
+    def __init__(self, weight_num):
+        super(Model, self).__init__(input_shape=(4,), output_shape=(1,))
+        self.weights = np.ones(weight_num)
+
+    def predict(self, X):
+        return X.sum(axis=1, keepdims=True) * self.weights[0]
+"""
+
+
+class TestModelPool(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix="learnware_model_pool_")
+        self.learnwares = []
+        for i in range(5):
+            learnware_dirpath = os.path.join(self.tempdir.name, "%08d" % i)
+            os.makedirs(learnware_dirpath)
+            with open(os.path.join(learnware_dirpath, "model_%d.py" % i), "w") as fout:
+                fout.write(MODEL_SOURCE)
+            model_config = {"class_name": "Model", "module_path": "model_%d.py" % i, "kwargs": {"weight_num": 1000}}
+            self.learnwares.append(Learnware("%08d" % i, model_config, Specification(), learnware_dirpath))
+        self.X = np.ones((3, 4))
+
+    def tearDown(self):
+        set_model_pool(None)
+        self.tempdir.cleanup()
+
+    def test_lru_eviction_by_count(self):
+        model_pool = ModelPool(max_models=2)
+        for learnware in self.learnwares[:3]:
+            assert model_pool.predict(learnware, self.X).shape == (3, 1)
+
+        assert isinstance(self.learnwares[0].get_model(), dict)
+        assert all(isinstance(learnware.get_model(), BaseModel) for learnware in self.learnwares[1:3])
+
+        model_pool.predict(self.learnwares[1], self.X)
+        model_pool.predict(self.learnwares[3], self.X)
+        assert isinstance(self.learnwares[2].get_model(), dict)
+        assert isinstance(self.learnwares[1].get_model(), BaseModel)
+
+        stats = model_pool.get_stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"], stats["models"]) == (1, 4, 2, 2)
+        assert stats["load_seconds"] > 0
+
+    def test_eviction_by_bytes(self):
+        model_pool = ModelPool(max_bytes=12000)
+        for learnware in self.learnwares:
+            model_pool.get_model(learnware)
+        stats = model_pool.get_stats()
+        # each model holds 8000 bytes of weights, so only the last one fits
+        assert stats["models"] == 1 and 8000 < stats["bytes"] <= 12000
+        assert isinstance(self.learnwares[-1].get_model(), BaseModel)
+
+    def test_learnware_predict_with_pool(self):
+        model_pool = ModelPool(max_models=1)
+        set_model_pool(model_pool)
+        for learnware in self.learnwares[:2]:
+            assert np.allclose(learnware.predict(self.X), 4)
+        assert isinstance(self.learnwares[0].get_model(), dict)
+        assert model_pool.get_stats()["misses"] == 2
+
+    def test_prewarm(self):
+        model_pool = ModelPool(max_models=3, prewarm_workers=2)
+        for future in model_pool.prewarm(self.learnwares[:3] + self.learnwares[:3]):
+            future.result()
+        stats = model_pool.get_stats()
+        assert stats["misses"] == 3 and stats["hits"] == 3
+
+        threads = [threading.Thread(target=model_pool.predict, args=(self.learnwares[0], self.X)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert model_pool.get_stats()["misses"] == 3
+        model_pool.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
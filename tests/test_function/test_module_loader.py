@@ -0,0 +1,67 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+from learnware.utils import get_module_by_module_path, unload_module_by_module_path, unload_modules_in_dirpath
+
+
+class TestModuleLoader(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix="learnware_module_loader_")
+        self.module_paths = []
+        for i in range(2):
+            learnware_dirpath = os.path.join(self.tempdir.name, "%08d" % i)
+            os.makedirs(learnware_dirpath)
+            self.module_paths.append(os.path.join(learnware_dirpath, "__init__.py"))
+            self._write_module(self.module_paths[-1], i)
+
+    def tearDown(self):
+        unload_modules_in_dirpath(self.tempdir.name)
+        self.tempdir.cleanup()
+
+    @staticmethod
+    def _write_module(module_path: str, value: int):
+        with open(module_path, "w") as fout:
+            fout.write(f"VALUE = {value}\nINSTANCE = object()\n")
+
+    def test_reuse_and_namespace(self):
+        first_module = get_module_by_module_path(self.module_paths[0])
+        second_module = get_module_by_module_path(self.module_paths[1])
+        assert (first_module.VALUE, second_module.VALUE) == (0, 1)
+        assert first_module.__name__ != second_module.__name__
+        assert sys.modules[first_module.__name__] is first_module
+
+        assert get_module_by_module_path(self.module_paths[0]) is first_module
+        assert get_module_by_module_path(self.module_paths[0], reload=True) is not first_module
+
+        modules = []
+        threads = [
+            threading.Thread(target=lambda: modules.append(get_module_by_module_path(self.module_paths[1])))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(module is second_module for module in modules)
+
+    def test_changed_and_unloaded_modules(self):
+        module = get_module_by_module_path(self.module_paths[0])
+        self._write_module(self.module_paths[0], 10)
+        changed_module = get_module_by_module_path(self.module_paths[0])
+        assert changed_module is not module and changed_module.VALUE == 10
+
+        assert unload_module_by_module_path(self.module_paths[0])
+        assert changed_module.__name__ not in sys.modules
+        assert not unload_module_by_module_path(self.module_paths[0])
+        assert get_module_by_module_path(self.module_paths[0]) is not changed_module
+
+        get_module_by_module_path(self.module_paths[1])
+        assert unload_modules_in_dirpath(self.tempdir.name) == 2
+        assert unload_modules_in_dirpath(self.tempdir.name) == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import itertools
+import random
+import unittest
+
+from rapidfuzz import fuzz
+
+from learnware.learnware import Learnware
+from learnware.market.easy.searcher import EasyExactSemanticSearcher, EasyFuzzSemanticSearcher
+from learnware.market.easy.semantic_index import SemanticIndex
+from learnware.specification import Specification, generate_semantic_spec
+
+DATA_TYPES = ["Table", "Image", "Text"]
+TASK_TYPES = ["Classification", "Regression", "Clustering"]
+LIBRARY_TYPES = ["Scikit-learn", "PyTorch", "Others"]
+SCENARIOS = ["Business", "Financial", "Health", "Education", "Others"]
+LICENSES = ["MIT", "Apache-2.0", "Others"]
+
+
+def random_semantic_spec(rng: random.Random, learnware_id: str):
+    def choice(values):
+        return rng.choice(values + [None])
+
+    return generate_semantic_spec(
+        name=f"learnware_{learnware_id}",
+        description=rng.choice(["sales forecast", "image recognition", ""]),
+        data_type=choice(DATA_TYPES),
+        task_type=choice(TASK_TYPES),
+        library_type=choice(LIBRARY_TYPES),
+        scenarios=rng.sample(SCENARIOS, rng.randint(0, 3)),
+        license=choice(LICENSES),
+    )
+
+
+class TestSemanticIndex(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.learnwares = []
+        for i in range(200):
+            learnware_id = "%08d" % i
+            semantic_spec = random_semantic_spec(rng, learnware_id)
+            if i % 17 == 0:
+                semantic_spec.pop("Scenario")
+            if i % 23 == 0:
+                # unhashable values are left to the per-learnware matching
+                semantic_spec["Data"]["Values"] = [["Table"]]
+            self.learnwares.append(Learnware(learnware_id, None, Specification(semantic_spec=semantic_spec), ""))
+
+        self.index = SemanticIndex()
+        for learnware in self.learnwares:
+            self.index.add(learnware)
+
+        self.user_specs = []
+        for data_type, task_type, scenarios in itertools.product(
+            DATA_TYPES[:2] + [None], TASK_TYPES[:2] + [None], [[], ["Business"], ["Health", "Education"]]
+        ):
+            self.user_specs.append(
+                generate_semantic_spec(
+                    data_type=data_type, task_type=task_type, scenarios=scenarios, license=["MIT", "Others"]
+                )
+            )
+
+    def _match(self, match_func, user_spec, learnware_list):
+        matched_ids, unindexed_learnwares = self.index.match_tags(user_spec, learnware_list)
+        matched_ids |= {
+            learnware.id
+            for learnware in unindexed_learnwares
+            if match_func(user_spec, learnware.get_specification().get_semantic_spec())
+        }
+        return matched_ids
+
+    def test_match_tags(self):
+        fuzz_searcher = EasyFuzzSemanticSearcher(None)
+        exact_searcher = EasyExactSemanticSearcher(None)
+        for user_spec in self.user_specs:
+            expected_ids = {
+                learnware.id
+                for learnware in self.learnwares
+                if fuzz_searcher._match_semantic_spec_tag(user_spec, learnware.get_specification().get_semantic_spec())
+            }
+            assert self._match(fuzz_searcher._match_semantic_spec_tag, user_spec, self.learnwares) == expected_ids
+
+            expected_ids = {
+                learnware.id
+                for learnware in self.learnwares
+                if exact_searcher._match_semantic_spec(user_spec, learnware.get_specification().get_semantic_spec())
+            }
+            assert self._match(exact_searcher._match_semantic_spec, user_spec, self.learnwares) == expected_ids
+
+    def test_remove_and_update(self):
+        fuzz_searcher = EasyFuzzSemanticSearcher(None)
+        for learnware in self.learnwares[::3]:
+            self.index.remove(learnware.id)
+        for learnware in self.learnwares[1::3]:
+            learnware.update_semantic_spec(generate_semantic_spec(data_type="Text", scenarios=["Others"]))
+        for learnware in self.learnwares[2::6]:
+            self.index.add(learnware)
+
+        learnware_list = self.learnwares[1::3] + self.learnwares[2::3]
+        for user_spec in self.user_specs:
+            expected_ids = {
+                learnware.id
+                for learnware in learnware_list
+                if fuzz_searcher._match_semantic_spec_tag(user_spec, learnware.get_specification().get_semantic_spec())
+            }
+            assert self._match(fuzz_searcher._match_semantic_spec_tag, user_spec, learnware_list) == expected_ids
+
+    def test_fuzzy_search(self):
+        rng = random.Random(1)
+
+        def random_text(max_len):
+            return "".join(rng.choice("abcDE fgh01-中文") for _ in range(rng.randint(0, max_len)))
+
+        learnware_list = []
+        for i in range(300):
+            semantic_spec = generate_semantic_spec(name=random_text(12), description=random_text(60))
+            learnware_list.append(Learnware("%08d" % i, None, Specification(semantic_spec=semantic_spec), ""))
+        index = SemanticIndex()
+        for learnware in learnware_list[::2]:
+            index.add(learnware)
+
+        name_list, des_list = index.get_texts(learnware_list)
+        searcher = EasyFuzzSemanticSearcher(None)
+        assert (name_list, des_list) == searcher._get_semantic_texts(learnware_list)
+
+        for _ in range(20):
+            query = random_text(15).lower()
+            for min_score in (0, 60, 75, 100):
+                matched, scores = searcher._fuzzy_search(query, learnware_list, name_list, des_list, min_score)
+                matched_brute, scores_brute = [], []
+                for i, learnware in enumerate(learnware_list):
+                    score = max(fuzz.partial_ratio(query, name_list[i]), fuzz.partial_ratio(query, des_list[i]))
+                    if score >= min_score:
+                        matched_brute.append(learnware)
+                        scores_brute.append(score)
+                assert matched == matched_brute and scores == scores_brute
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import random
+import tempfile
+import unittest
+
+from sqlalchemy import text
+
+from learnware.market.easy.database_ops import DatabaseOperations
+from learnware.market.easy.searcher import EasyFuzzSemanticSearcher
+from learnware.specification import generate_semantic_spec
+
+SCENARIOS = ["Business", "Financial", "Health", "Education", "Others"]
+
+
+class TestSemanticTable(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix="learnware_")
+        self.dbops = DatabaseOperations(f"sqlite:///{self.tempdir.name}", "market_test")
+
+        rng = random.Random(0)
+        self.semantic_specs = {}
+        for i in range(60):
+            semantic_spec = generate_semantic_spec(
+                name=f"learnware_{i}",
+                data_type=rng.choice(["Table", "Image", None]),
+                task_type=rng.choice(["Classification", "Regression", None]),
+                scenarios=rng.sample(SCENARIOS, rng.randint(0, 2)),
+                license=rng.choice(["MIT", "Others", None]),
+            )
+            if i % 7 == 0:
+                semantic_spec.pop("Task")
+            if i % 11 == 0:
+                semantic_spec["Data"]["Values"] = [["Table"]]
+            self.add_learnware("%08d" % i, semantic_spec, use_flag=i % 2)
+
+        self.user_specs = [
+            generate_semantic_spec(data_type=data_type, task_type=task_type, scenarios=scenarios)
+            for data_type in ("Table", None)
+            for task_type in ("Regression", None)
+            for scenarios in ([], ["Business", "Health"])
+        ]
+
+    def tearDown(self):
+        self.dbops.engine.dispose()
+        self.tempdir.cleanup()
+
+    def add_learnware(self, id, semantic_spec, use_flag):
+        self.semantic_specs[id] = semantic_spec
+        self.dbops.add_learnware(id, semantic_spec, zip_path="", folder_path="", use_flag=use_flag)
+
+    def check_candidates(self):
+        searcher = EasyFuzzSemanticSearcher(None)
+        for user_spec in self.user_specs:
+            expected_ids = sorted(
+                [
+                    id
+                    for id, semantic_spec in self.semantic_specs.items()
+                    if searcher._match_semantic_spec_tag(user_spec, semantic_spec)
+                    or semantic_spec["Data"]["Values"] == [["Table"]]
+                ],
+                reverse=True,
+            )
+            assert self.dbops.get_learnware_ids_by_semantic_spec(user_spec) == expected_ids
+            assert self.dbops.get_learnware_ids_by_semantic_spec(user_spec, use_flag=1) == [
+                id for id in expected_ids if int(id) % 2 == 1
+            ]
+
+    def test_semantic_table(self):
+        self.check_candidates()
+
+        for i in range(0, 60, 3):
+            id = "%08d" % i
+            self.semantic_specs[id] = generate_semantic_spec(data_type="Table", scenarios=["Business"])
+            self.dbops.update_learnware_semantic_specification(id, self.semantic_specs[id])
+        for i in range(1, 60, 5):
+            id = "%08d" % i
+            self.semantic_specs.pop(id)
+            self.dbops.delete_learnware(id)
+        self.check_candidates()
+
+    def test_build_semantic_table(self):
+        with self.dbops.engine.connect() as conn:
+            conn.execute(text("DELETE FROM tb_learnware_semantic;"))
+            conn.execute(text("DELETE FROM tb_market_meta WHERE key='semantic_table_version';"))
+            conn.commit()
+
+        self.dbops.engine.dispose()
+        self.dbops = DatabaseOperations(f"sqlite:///{self.tempdir.name}", "market_test")
+        self.check_candidates()
+
+
+if __name__ == "__main__":
+    unittest.main()
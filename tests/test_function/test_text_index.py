@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from learnware.market.easy.text_index import TextIndex, get_semantic_spec_texts, tokenize
+from learnware.specification import generate_semantic_spec
+
+
+class TestTextIndex(unittest.TestCase):
+    def setUp(self):
+        self.text_index = TextIndex()
+        self.text_index.add("00000000", ["Sales forecast", "Predict the daily sales of stores"])
+        self.text_index.add("00000001", ["Length of stay", "Predict the length of hospital stay of patients"])
+        self.text_index.add("00000002", ["Sales", "sales sales sales of the stores"])
+        semantic_spec = generate_semantic_spec(
+            name="Readmission",
+            description="Hospital readmission",
+            input_description={"Dimension": 2, "Description": {"0": "age of patient", "1": "number of diagnoses"}},
+        )
+        self.text_index.add("00000003", get_semantic_spec_texts(semantic_spec))
+
+    def test_tokenize(self):
+        assert tokenize("Length-of_stay (days), 中文") == ["length", "of", "stay", "days", "中", "文"]
+
+    def test_search(self):
+        ranked_ids = [doc_id for doc_id, _ in self.text_index.search("sales")]
+        assert ranked_ids == ["00000002", "00000000"]
+
+        ranked_ids = [doc_id for doc_id, _ in self.text_index.search("hospital diagnoses")]
+        assert ranked_ids[0] == "00000003" and set(ranked_ids) == {"00000001", "00000003"}
+        assert self.text_index.search("hospital diagnoses", match_all=True)[0][0] == "00000003"
+        assert len(self.text_index.search("hospital diagnoses", match_all=True)) == 1
+        assert self.text_index.search("sales", doc_ids=["00000000", "00000001"], top_k=1)[0][0] == "00000000"
+        assert self.text_index.search("unknown") == []
+
+    def test_update_and_persist(self):
+        self.text_index.add("00000002", ["Weather forecast"])
+        self.text_index.remove("00000000")
+        assert self.text_index.search("sales") == []
+        assert [doc_id for doc_id, _ in self.text_index.search("forecast")] == ["00000002"]
+
+        with tempfile.TemporaryDirectory(prefix="learnware_") as tempdir:
+            index_path = os.path.join(tempdir, "text_index.json")
+            self.text_index.save(index_path, generation=5)
+            assert TextIndex.load(index_path, generation=6) is None
+
+            loaded_index = TextIndex.load(index_path, generation=5)
+            for query in ("forecast", "hospital stay", "age of patient"):
+                assert loaded_index.search(query) == self.text_index.search(query)
+
+
+if __name__ == "__main__":
+    unittest.main()
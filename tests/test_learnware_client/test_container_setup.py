@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from learnware.client.container import LearnwaresContainer, ModelContainer, ModelDockerContainer
+from learnware.learnware import Learnware
+from learnware.specification import Specification
+
+
+class SlowModelContainer(ModelContainer):
+    def __init__(self, learnware_id: str, tracker: dict):
+        super(SlowModelContainer, self).__init__({}, "", build=False)
+        self.conda_env = f"env_{learnware_id}"
+        self.learnware_id = learnware_id
+        self.tracker = tracker
+
+    def _setup_env_and_metadata(self):
+        with self.tracker["lock"]:
+            self.tracker["running"] += 1
+            self.tracker["max_running"] = max(self.tracker["max_running"], self.tracker["running"])
+        time.sleep(0.2)
+        with self.tracker["lock"]:
+            self.tracker["running"] -= 1
+        if self.learnware_id == "failed":
+            raise RuntimeError("The env is broken")
+        self.reset(input_shape=(1,), output_shape=(1,))
+
+
+class TestContainerSetup(unittest.TestCase):
+    def test_concurrent_setup(self):
+        learnware_ids = ["first", "failed", "second", "third"]
+        learnware_list = [
+            Learnware(learnware_id, {"class_name": "Model"}, Specification(), "") for learnware_id in learnware_ids
+        ]
+        tracker = {"lock": threading.Lock(), "running": 0, "max_running": 0}
+        env_container = LearnwaresContainer(learnware_list, ignore_error=True)
+
+        start = time.perf_counter()
+        results = env_container._initialize_model_containers(
+            [SlowModelContainer(learnware_id, tracker) for learnware_id in learnware_ids], max_workers=2
+        )
+        # the failure is isolated, and the envs are set up by the bounded pool
+        assert results == [True, False, True, True]
+        assert tracker["max_running"] == 2
+        assert time.perf_counter() - start < 0.2 * len(learnware_ids)
+
+        env_container.ignore_error = False
+        with self.assertRaises(RuntimeError):
+            env_container._initialize_model_containers([SlowModelContainer("failed", tracker)], max_workers=2)
+
+    def test_docker_daemon_location(self):
+        # the host folders are mounted only by the local daemons, the remote ones receive tar archives
+        for docker_host, is_local in [
+            (None, True),
+            ("unix:///var/run/docker.sock", True),
+            ("npipe:////./pipe/docker_engine", True),
+            ("tcp://10.0.0.1:2376", False),
+            ("ssh://user@remote", False),
+        ]:
+            environ = {key: value for key, value in os.environ.items() if key != "DOCKER_HOST"}
+            if docker_host is not None:
+                environ["DOCKER_HOST"] = docker_host
+            with mock.patch.dict(os.environ, environ, clear=True):
+                assert ModelDockerContainer._is_local_docker_daemon() == is_local
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from learnware.client import env_cache
+from learnware.client.env_cache import CondaEnvCache, get_env_key
+
+
+class TestCondaEnvCache(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix="learnware_env_cache_")
+        self.env_root = os.path.join(self.tempdir.name, "envs")
+        self.installed_envs, self.removed_envs = [], []
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def _write_learnware(self, name: str, file_name: str, content: str) -> str:
+        learnware_dirpath = os.path.join(self.tempdir.name, name)
+        os.makedirs(learnware_dirpath)
+        with open(os.path.join(learnware_dirpath, file_name), "w") as fout:
+            fout.write(content)
+        return learnware_dirpath
+
+    def _install_environment(self, learnware_dirpath, conda_env):
+        self.installed_envs.append(conda_env)
+        os.makedirs(os.path.join(self.env_root, conda_env))
+        with open(os.path.join(self.env_root, conda_env, "package"), "wb") as fout:
+            fout.write(b"0" * 100)
+
+    def _remove_enviroment(self, conda_env):
+        self.removed_envs.append(conda_env)
+        if os.path.isdir(os.path.join(self.env_root, conda_env)):
+            os.remove(os.path.join(self.env_root, conda_env, "package"))
+            os.rmdir(os.path.join(self.env_root, conda_env))
+
+    def _get_env_prefix(self, conda_env):
+        env_prefix = os.path.join(self.env_root, conda_env)
+        return env_prefix if os.path.isdir(env_prefix) else None
+
+    def test_env_key(self):
+        first_dirpath = self._write_learnware("first", "requirements.txt", "numpy>=1.20\nScikit_Learn == 1.2\n")
+        second_dirpath = self._write_learnware(
+            "second", "requirements.txt", "# the packages\nscikit-learn==1.2\n\nnumpy >= 1.20  # array\nnumpy>=1.20\n"
+        )
+        third_dirpath = self._write_learnware("third", "requirements.txt", "numpy>=1.21\nscikit-learn==1.2\n")
+        assert get_env_key(first_dirpath) == get_env_key(second_dirpath)
+        assert get_env_key(first_dirpath) != get_env_key(third_dirpath)
+
+        first_yaml_dirpath = self._write_learnware(
+            "first_yaml",
+            "environment.yaml",
+            "name: a\ndependencies:\n  - python=3.8\n  - pip:\n    - torch\n    - numpy\n",
+        )
+        second_yaml_dirpath = self._write_learnware(
+            "second_yaml",
+            "environment.yaml",
+            "name: b\ndependencies:\n  - pip:\n    - Numpy\n    - torch\n  - python=3.8\n",
+        )
+        assert get_env_key(first_yaml_dirpath) == get_env_key(second_yaml_dirpath)
+
+        with self.assertRaises(Exception):
+            get_env_key(self.tempdir.name)
+
+    def test_reference_and_eviction(self):
+        learnware_dirpaths = [
+            self._write_learnware(f"learnware_{i}", "requirements.txt", f"package_{i % 3}\n") for i in range(4)
+        ]
+        index_path = os.path.join(self.tempdir.name, "cache", "conda_envs.json")
+        with mock.patch.object(env_cache, "install_environment", self._install_environment), mock.patch.object(
+            env_cache, "remove_enviroment", self._remove_enviroment
+        ), mock.patch.object(CondaEnvCache, "_get_env_prefix", staticmethod(self._get_env_prefix)):
+            cache = CondaEnvCache(index_path, budget=150)
+            conda_envs = [cache.acquire(learnware_dirpath) for learnware_dirpath in learnware_dirpaths]
+            # the learnwares with the same requirements share the env
+            assert conda_envs[0] == conda_envs[3] and len(set(conda_envs)) == 3
+            assert len(self.installed_envs) == 3
+
+            # the envs in use are never evicted, and the released ones are evicted in LRU order
+            cache.release(conda_envs[0])
+            cache.release(conda_envs[1])
+            cache.release(conda_envs[2])
+            assert self.removed_envs == [conda_envs[1]]
+            cache.release(conda_envs[3])
+            assert self.removed_envs == [conda_envs[1], conda_envs[2]]
+
+            # the index is reused by another process
+            cache = CondaEnvCache(index_path, budget=150)
+            assert cache.acquire(learnware_dirpaths[3]) == conda_envs[3]
+            assert len(self.installed_envs) == 3
+            cache.release(conda_envs[3])
+            assert cache.collect_garbage(budget=0) == 1
+            assert cache.index == {}
+
+
+if __name__ == "__main__":
+    unittest.main()
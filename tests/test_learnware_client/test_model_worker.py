@@ -0,0 +1,109 @@
+import os
+import pickle
+import socket
+import struct
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from learnware.client.container import DockerExecStream, ModelWorker
+from learnware.client.scripts.model_worker import read_frame, write_frame
+
+MODEL_SOURCE = """
+import numpy as np
+
+from learnware.model import BaseModel
+
+
+class Model(BaseModel):
+    def __init__(self, bias):
+        super(Model, self).__init__(input_shape=(4,), output_shape=(1,))
+        self.bias = bias
+
+    def fit(self, X, y):
+        print("fitting the model")
+        self.bias = float(np.mean(y))
+
+    def predict(self, X):
+        if X.shape[1] != 4:
+            raise ValueError("The input must have 4 features")
+        return X.sum(axis=1, keepdims=True) + self.bias
+"""
+
+
+class TestModelWorker(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix="learnware_model_worker_")
+        module_path = os.path.join(self.tempdir.name, "__init__.py")
+        with open(module_path, "w") as fout:
+            fout.write(MODEL_SOURCE)
+        self.model_config = {"class_name": "Model", "module_path": module_path, "kwargs": {"bias": 1.0}}
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_persistent_model(self):
+        model_worker = ModelWorker(sys.executable, self.model_config)
+        try:
+            assert model_worker.metadata == {"input_shape": (4,), "output_shape": (1,)}
+            X = np.ones((5, 4))
+            assert np.allclose(model_worker.call("predict", X=X), 5)
+
+            # the state of the model is kept between the calls, and the prints do not break the protocol
+            model_worker.call("fit", X=X, y=np.full(5, 3.0))
+            assert np.allclose(model_worker.call("predict", X=X), 7)
+
+            with self.assertRaises(ValueError):
+                model_worker.call("predict", X=np.ones((5, 3)))
+        finally:
+            model_worker.close()
+        assert model_worker.process.returncode == 0
+
+    def test_shared_arrays(self):
+        shm_names = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else None
+        model_worker = ModelWorker(sys.executable, self.model_config, share_min_bytes=1024)
+        try:
+            X = np.random.rand(1000, 4)
+            # the large input and output are exchanged by shared memory, the small ones are pickled
+            assert np.allclose(model_worker.call("predict", X=X), X.sum(axis=1, keepdims=True) + 1)
+            assert np.allclose(model_worker.call("predict", X=X[:2]), X[:2].sum(axis=1, keepdims=True) + 1)
+            with self.assertRaises(ValueError):
+                model_worker.call("predict", X=np.ones((1000, 3)))
+        finally:
+            model_worker.close()
+        if shm_names is not None:
+            assert set(os.listdir("/dev/shm")) <= shm_names
+
+    def test_docker_exec_stream(self):
+        host_socket, docker_socket = socket.socketpair()
+        stream = DockerExecStream(host_socket)
+        try:
+            data = pickle.dumps({"status": "success", "result": np.arange(1000)}, protocol=4)
+            frame = struct.pack(">Q", len(data)) + data
+            # docker splits the output into stdout and stderr frames of any size
+            for start in range(0, len(frame), 1000):
+                docker_socket.sendall(struct.pack(">BxxxL", 2, 5) + b"error")
+                chunk = frame[start : start + 1000]
+                docker_socket.sendall(struct.pack(">BxxxL", 1, len(chunk)) + chunk)
+            response = read_frame(stream)
+            assert response["status"] == "success" and np.array_equal(response["result"], np.arange(1000))
+
+            write_frame(stream, {"method": "close"})
+            with docker_socket.makefile("rb") as docker_input:
+                assert read_frame(docker_input) == {"method": "close"}
+
+            docker_socket.close()
+            assert read_frame(stream) is None
+        finally:
+            stream.close()
+
+    def test_failed_model(self):
+        model_config = dict(self.model_config, kwargs={})
+        with self.assertRaises(TypeError):
+            ModelWorker(sys.executable, model_config)
+
+
+if __name__ == "__main__":
+    unittest.main()
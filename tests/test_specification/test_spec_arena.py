@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+from learnware.specification import RKMETableSpecification, generate_stat_spec
+from learnware.specification.arena import load_stat_specs, save_stat_specs
+
+
+class TestSpecArena(unittest.TestCase):
+    def test_spec_arena(self):
+        specs = {
+            f"{i:08d}": generate_stat_spec(type="table", X=np.random.uniform(-1, 1, size=(200, 10 + i)))
+            for i in range(5)
+        }
+
+        with tempfile.TemporaryDirectory(prefix="learnware_") as tempdir:
+            arena_path = os.path.join(tempdir, "specs.arena")
+            save_stat_specs(arena_path, specs, meta={"generation": 3})
+            loaded_specs, meta = load_stat_specs(arena_path)
+
+            assert meta == {"generation": 3}
+            assert list(loaded_specs.keys()) == list(specs.keys())
+            for key, spec in specs.items():
+                loaded_spec = loaded_specs[key]
+                assert isinstance(loaded_spec, RKMETableSpecification)
+                assert loaded_spec.type == spec.type and loaded_spec.gamma == spec.gamma
+                assert torch.equal(loaded_spec.z.cpu(), spec.z.cpu())
+                assert torch.equal(loaded_spec.beta.cpu(), spec.beta.cpu())
+                assert abs(loaded_spec.dist(spec)) < 1e-8
+
+            # writes to a memory-mapped specification stay private to the process
+            loaded_specs["00000000"].beta[0] = 100
+            reloaded_specs, _ = load_stat_specs(arena_path)
+            assert torch.equal(reloaded_specs["00000000"].beta.cpu(), specs["00000000"].beta.cpu())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import logging
 import os
 import pickle
 import tempfile
+import threading
 import unittest
 import zipfile
 
@@ -117,7 +118,20 @@ class TestHeteroWorkflow(unittest.TestCase):
         hetero_market = self._init_learnware_market(
             organizer_kwargs={"auto_update": True, "auto_update_limit": learnware_num}
         )
+        organizer = hetero_market.learnware_organizer
+        train, reader_blocked = organizer.train, []
+
+        def train_with_reader(*args, **kwargs):
+            # the market is readable while the market mapping is trained
+            reader = threading.Thread(target=organizer.get_learnware_ids)
+            reader.start()
+            reader.join(timeout=10)
+            reader_blocked.append(reader.is_alive())
+            return train(*args, **kwargs)
+
+        organizer.train = train_with_reader
         hetero_market = self._upload_delete_learnware(hetero_market, learnware_num, delete)
+        assert reader_blocked == [False]
         # organizer=hetero_market.learnware_organizer
         # organizer.train(hetero_market.learnware_organizer.learnware_list.values())
         return hetero_market
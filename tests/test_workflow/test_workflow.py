@@ -1,7 +1,10 @@
+import asyncio
 import logging
 import os
 import pickle
 import tempfile
+import threading
+import time
 import unittest
 import zipfile
 
@@ -11,7 +14,15 @@ from sklearn.datasets import load_digits
 from sklearn.model_selection import train_test_split
 
 import learnware
-from learnware.market import BaseUserInfo, instantiate_learnware_market
+from learnware.config import C
+from learnware.market import (
+    AsyncLearnwareMarket,
+    BaseChecker,
+    BaseUserInfo,
+    EasyStatChecker,
+    instantiate_learnware_market,
+)
+from learnware.market.base import check_learnware_zip
 from learnware.reuse import AveragingReuser, EnsemblePruningReuser, FeatureAugmentReuser, JobSelectorReuser
 from learnware.specification import RKMETableSpecification, generate_rkme_table_spec, generate_semantic_spec
 from learnware.tests.templates import LearnwareTemplate, PickleModelTemplate, StatSpecTemplate
@@ -99,6 +110,7 @@ class TestWorkflow(unittest.TestCase):
         curr_inds = easy_market.get_learnware_ids()
         print("Available ids After Uploading Learnwares:", curr_inds)
         assert len(curr_inds) == self.learnware_num, f"The number of learnwares must be {self.learnware_num}!"
+        assert isinstance(curr_inds, list) and isinstance(easy_market.get_learnwares(), list)
 
         if delete:
             for learnware_id in curr_inds:
@@ -112,6 +124,430 @@ class TestWorkflow(unittest.TestCase):
 
         return easy_market
 
+    def test_add_learnwares_in_bulk(self, learnware_num=5):
+        easy_market = self._init_learnware_market()
+        self.test_prepare_learnware_randomly(learnware_num)
+
+        items = []
+        for idx, zip_path in enumerate(self.zip_path_list):
+            semantic_spec = generate_semantic_spec(
+                name=f"learnware_{idx}",
+                description=f"test_learnware_number_{idx}",
+                input_description={
+                    "Dimension": 64,
+                    "Description": {f"{i}": f"The value in the grid {i // 8}{i % 8}." for i in range(64)},
+                },
+                output_description={
+                    "Dimension": 10,
+                    "Description": {f"{i}": "The probability for each digit for 0 to 9." for i in range(10)},
+                },
+                **self.universal_semantic_config,
+            )
+            items.append((zip_path, semantic_spec))
+
+        with tempfile.TemporaryDirectory(prefix="learnware_") as tempdir:
+            invalid_zippath = os.path.join(tempdir, "invalid.zip")
+            with zipfile.ZipFile(invalid_zippath, "w") as z_file:
+                z_file.writestr("learnware.yaml", "model: {}")
+            items.insert(2, (invalid_zippath, items[0][1]))
+            results = easy_market.add_learnwares(items, max_workers=2)
+
+        assert len(results) == learnware_num + 1
+        assert results[2] == (None, easy_market.learnware_checker["EasySemanticChecker"].INVALID_LEARNWARE)
+        added_ids = [learnware_id for learnware_id, _ in results if learnware_id is not None]
+        assert added_ids == ["%08d" % i for i in range(learnware_num)]
+        assert len(easy_market) == learnware_num
+
+        for learnware_id, (_, semantic_spec) in zip(added_ids, items[:2] + items[3:]):
+            learnware = easy_market.get_learnware_by_ids(learnware_id)
+            assert learnware.get_specification().get_semantic_spec()["Name"] == semantic_spec["Name"]
+
+        # the snapshot is written by the first reload of the non-empty market, and reused afterwards
+        snapshot_path = easy_market.learnware_organizer.snapshot_path
+        assert not os.path.exists(snapshot_path)
+        reloaded_market = instantiate_learnware_market(market_id="sklearn_digits_easy", name="easy", rebuild=False)
+        assert sorted(reloaded_market.get_learnware_ids()) == added_ids
+        snapshot_mtime = os.stat(snapshot_path).st_mtime_ns
+        reloaded_market = instantiate_learnware_market(market_id="sklearn_digits_easy", name="easy", rebuild=False)
+        assert sorted(reloaded_market.get_learnware_ids()) == added_ids
+        assert os.stat(snapshot_path).st_mtime_ns == snapshot_mtime
+
+    def test_submit_learnwares(self, learnware_num=3):
+        easy_market = self._init_learnware_market()
+        self.test_prepare_learnware_randomly(learnware_num)
+
+        def get_semantic_spec(idx):
+            return generate_semantic_spec(
+                name=f"learnware_{idx}",
+                description=f"test_learnware_number_{idx}",
+                input_description={
+                    "Dimension": 64,
+                    "Description": {f"{i}": f"The value in the grid {i // 8}{i % 8}." for i in range(64)},
+                },
+                output_description={
+                    "Dimension": 10,
+                    "Description": {f"{i}": "The probability for each digit for 0 to 9." for i in range(10)},
+                },
+                **self.universal_semantic_config,
+            )
+
+        # the submissions are saved without workers, and resumed by the queue started later
+        easy_market.start_ingestion_queue(max_workers=0)
+        task_ids = [
+            easy_market.submit_learnware(zip_path, get_semantic_spec(idx))
+            for idx, zip_path in enumerate(self.zip_path_list)
+        ]
+        assert all(easy_market.get_submission_status(task_id)["status"] == "pending" for task_id in task_ids)
+        easy_market.ingestion_queue.shutdown()
+
+        easy_market = instantiate_learnware_market(market_id="sklearn_digits_easy", name="easy", rebuild=False)
+        easy_market.start_ingestion_queue(max_workers=2, checker_timeouts={"EasyStatChecker": 600})
+        task_ids.append(
+            easy_market.submit_learnware(self.zip_path_list[0], get_semantic_spec(0), checker_names=["Unknown"])
+        )
+        results = [easy_market.wait_submission(task_id, timeout=600) for task_id in task_ids]
+        easy_market.ingestion_queue.shutdown()
+
+        assert all(result["status"] == "finished" for result in results)
+        assert all(
+            result["check_status"] == easy_market.learnware_checker["EasyStatChecker"].USABLE_LEARNWARE
+            for result in results[:-1]
+        )
+        assert results[-1]["learnware_id"] is None
+        assert sorted(easy_market.get_learnware_ids()) == sorted(result["learnware_id"] for result in results[:-1])
+
+    def test_check_result_cache(self):
+        easy_market = self._init_learnware_market()
+        self.test_prepare_learnware_randomly(1)
+        easy_market.get_check_result_cache().invalidate()
+
+        class CountingStatChecker(EasyStatChecker):
+            call_num = 0
+
+            def __call__(self, learnware):
+                CountingStatChecker.call_num += 1
+                return super(CountingStatChecker, self).__call__(learnware)
+
+        easy_market.learnware_checker = {"CountingStatChecker": CountingStatChecker()}
+        semantic_spec = generate_semantic_spec(
+            name="learnware_0",
+            input_description={"Dimension": 64, "Description": {}},
+            output_description={"Dimension": 10, "Description": {}},
+            **self.universal_semantic_config,
+        )
+        check_status = easy_market.check_learnware(self.zip_path_list[0], semantic_spec, ["CountingStatChecker"])
+        assert check_status == EasyStatChecker.USABLE_LEARNWARE and CountingStatChecker.call_num == 1
+
+        # the names are not checked by the stat checker
+        semantic_spec["Name"]["Values"] = "learnware_renamed"
+        assert (
+            easy_market.check_learnware(self.zip_path_list[0], semantic_spec, ["CountingStatChecker"]) == check_status
+        )
+        assert CountingStatChecker.call_num == 1
+
+        semantic_spec["Output"]["Dimension"] = 3
+        assert easy_market.check_learnware(self.zip_path_list[0], semantic_spec, ["CountingStatChecker"]) == -1
+        assert CountingStatChecker.call_num == 2
+
+        # the invalid results may be transient, so they are not cached
+        assert easy_market.check_learnware(self.zip_path_list[0], semantic_spec, ["CountingStatChecker"]) == -1
+        assert CountingStatChecker.call_num == 3
+
+        semantic_spec["Output"]["Dimension"] = 10
+        assert easy_market.get_check_result_cache().invalidate("CountingStatChecker") == 1
+        easy_market.check_learnware(self.zip_path_list[0], semantic_spec, ["CountingStatChecker"])
+        assert CountingStatChecker.call_num == 4
+
+    def test_checker_pipeline(self):
+        self.test_prepare_learnware_randomly(1)
+        semantic_spec = generate_semantic_spec(name="learnware_0", **self.universal_semantic_config)
+        finish_times = {}
+
+        class SleepChecker(BaseChecker):
+            seconds, status = 1, BaseChecker.USABLE_LEARNWARE
+
+            def __call__(self, learnware):
+                time.sleep(self.seconds)
+                finish_times[self.__class__.__name__] = time.perf_counter()
+                return self.status, "Success"
+
+        class FirstChecker(SleepChecker):
+            pass
+
+        class SecondChecker(SleepChecker):
+            pass
+
+        class DependentChecker(SleepChecker):
+            prerequisites = ("FirstChecker",)
+            seconds = 0
+
+        class InvalidChecker(SleepChecker):
+            seconds, status = 0, BaseChecker.INVALID_LEARNWARE
+
+        checkers = [DependentChecker(), FirstChecker(), SecondChecker()]
+        start = time.perf_counter()
+        report = check_learnware_zip(self.zip_path_list[0], semantic_spec, checkers)
+        assert report.final_status == BaseChecker.USABLE_LEARNWARE
+        assert time.perf_counter() - start < 1.8, "The independent checkers should run concurrently"
+        assert finish_times["DependentChecker"] >= finish_times["FirstChecker"]
+        assert set(report.timings) == {"DependentChecker", "FirstChecker", "SecondChecker"}
+
+        finish_times.clear()
+        start = time.perf_counter()
+        report = check_learnware_zip(self.zip_path_list[0], semantic_spec, [FirstChecker(), InvalidChecker()])
+        assert report.final_status == BaseChecker.INVALID_LEARNWARE and report.results[0] is None
+        assert time.perf_counter() - start < 0.9, "The pipeline should stop at the invalid result"
+        # the discarded checker keeps the unzipped learnware, and does not change the returned report
+        time.sleep(1.2)
+        assert "FirstChecker" in finish_times and "FirstChecker" not in report.timings
+        assert EasyStatChecker.prerequisites == ("EasySemanticChecker",)
+
+        report = check_learnware_zip(
+            self.zip_path_list[0], semantic_spec, [FirstChecker()], timeouts={"FirstChecker": 0.1}
+        )
+        assert report.final_status == BaseChecker.INVALID_LEARNWARE and report.results == [None]
+
+    def test_concurrent_add_and_search(self, learnware_num=3, thread_num=8, repeat=3):
+        easy_market = self._init_learnware_market()
+        self.test_prepare_learnware_randomly(learnware_num)
+        semantic_spec = generate_semantic_spec(
+            name="learnware", description="test_learnware_concurrency", **self.universal_semantic_config
+        )
+        user_info = BaseUserInfo(semantic_spec=generate_semantic_spec(name="learnware"))
+        added_ids, deleted_ids, errors = [], [], []
+        stop_event = threading.Event()
+
+        def add_learnwares(thread_idx):
+            for i in range(repeat):
+                for zip_path in self.zip_path_list:
+                    learnware_id, _ = easy_market.add_learnware(zip_path, semantic_spec, checker_names=[])
+                    added_ids.append(learnware_id)
+                if thread_idx % 2 == 0:
+                    assert easy_market.delete_learnware(learnware_id)
+                    deleted_ids.append(learnware_id)
+
+        def search_learnwares():
+            while not stop_event.is_set():
+                learnware_ids = easy_market.get_learnware_ids()
+                assert len(set(learnware_ids)) == len(learnware_ids)
+                single_results = easy_market.search_learnware(user_info).get_single_results()
+                assert all(item.learnware.id is not None for item in single_results)
+
+        def run(func, *args):
+            try:
+                func(*args)
+            except Exception as err:
+                errors.append(err)
+
+        searchers = [threading.Thread(target=run, args=(search_learnwares,)) for _ in range(4)]
+        adders = [threading.Thread(target=run, args=(add_learnwares, i)) for i in range(thread_num)]
+        for thread in searchers + adders:
+            thread.start()
+        for thread in adders:
+            thread.join()
+        stop_event.set()
+        for thread in searchers:
+            thread.join()
+
+        assert len(errors) == 0, f"Concurrent operations failed: {errors}"
+        assert len(set(added_ids)) == len(added_ids) == thread_num * repeat * learnware_num
+        expected_ids = sorted(set(added_ids) - set(deleted_ids))
+        assert sorted(easy_market.get_learnware_ids()) == expected_ids
+        assert len(easy_market.search_learnware(user_info).get_single_results()) == len(expected_ids)
+
+        reloaded_market = instantiate_learnware_market(market_id="sklearn_digits_easy", name="easy", rebuild=False)
+        assert sorted(reloaded_market.get_learnware_ids()) == expected_ids
+
+    def test_learnware_blob_store(self, learnware_num=2):
+        for hard_link in (False, True):
+            C.learnware_pool_hard_link = hard_link
+            try:
+                self._test_learnware_blob_store(learnware_num, hard_link)
+            finally:
+                C.learnware_pool_hard_link = False
+
+    def _test_learnware_blob_store(self, learnware_num, hard_link):
+        easy_market = self._init_learnware_market()
+        self.test_prepare_learnware_randomly(learnware_num)
+        semantic_spec = generate_semantic_spec(
+            name="learnware",
+            description="test_learnware_blob_store",
+            input_description={
+                "Dimension": 64,
+                "Description": {f"{i}": f"The value in the grid {i // 8}{i % 8}." for i in range(64)},
+            },
+            output_description={
+                "Dimension": 10,
+                "Description": {f"{i}": "The probability for each digit for 0 to 9." for i in range(10)},
+            },
+            **self.universal_semantic_config,
+        )
+        organizer = easy_market.learnware_organizer
+
+        # the identical uploads share the blobs of the zip and the unzipped learnware if hard-linked
+        first_id, _ = easy_market.add_learnware(self.zip_path_list[0], semantic_spec)
+        first_usage = organizer.blob_store.get_usage()
+        second_id, _ = easy_market.add_learnware(self.zip_path_list[0], semantic_spec)
+        second_usage = organizer.blob_store.get_usage()
+        assert second_usage["blob_num"] == first_usage["blob_num"]
+        assert second_usage["blob_bytes"] == first_usage["blob_bytes"]
+        assert second_usage["linked_bytes"] == 2 * first_usage["linked_bytes"]
+        # the copied files are written without blobs
+        assert (first_usage["blob_num"] > 0) == hard_link
+        first_zip_path, second_zip_path = easy_market.get_learnware_zip_path_by_ids([first_id, second_id])
+        first_dirpath, second_dirpath = easy_market.get_learnware_dir_path_by_ids([first_id, second_id])
+        assert os.path.samefile(first_zip_path, second_zip_path) == hard_link
+        for file_name in os.listdir(first_dirpath):
+            file_path = os.path.join(first_dirpath, file_name)
+            if os.path.isfile(file_path):
+                assert os.path.samefile(file_path, os.path.join(second_dirpath, file_name)) == hard_link
+                # the shared files must not be modified in place
+                assert bool(os.stat(file_path).st_mode & 0o222) != hard_link
+
+        # the updated learnware stops sharing the replaced files
+        assert easy_market.update_learnware(second_id, zip_path=self.zip_path_list[1], checker_names=[]) is not None
+        assert not os.path.samefile(first_zip_path, second_zip_path)
+        assert not os.path.samefile(os.path.join(first_dirpath, "model.pkl"), os.path.join(second_dirpath, "model.pkl"))
+        assert easy_market.get_learnware_by_ids(second_id).get_model() is not None
+        assert sorted(os.listdir(organizer.learnware_folder_pool_path)) == sorted([first_id, second_id])
+
+        reloaded_market = instantiate_learnware_market(market_id="sklearn_digits_easy", name="easy", rebuild=False)
+        assert sorted(reloaded_market.get_learnware_ids()) == sorted([first_id, second_id])
+
+        for learnware_id in (first_id, second_id):
+            assert easy_market.delete_learnware(learnware_id)
+        assert organizer.blob_store.get_usage()["blob_num"] == 0
+        assert len(os.listdir(organizer.learnware_folder_pool_path)) == 0
+
+    def test_unzipped_learnware_budget(self, learnware_num=3):
+        # every folder exceeds the budget, so only the folder in use is kept unzipped
+        C.unzipped_learnware_budget = 1
+        try:
+            easy_market = self._init_learnware_market()
+            self.test_prepare_learnware_randomly(learnware_num)
+            semantic_spec = generate_semantic_spec(
+                name="learnware",
+                description="test_unzipped_learnware_budget",
+                input_description={
+                    "Dimension": 64,
+                    "Description": {f"{i}": f"The value in the grid {i // 8}{i % 8}." for i in range(64)},
+                },
+                output_description={
+                    "Dimension": 10,
+                    "Description": {f"{i}": "The probability for each digit for 0 to 9." for i in range(10)},
+                },
+                **self.universal_semantic_config,
+            )
+            learnware_ids = [easy_market.add_learnware(zip_path, semantic_spec)[0] for zip_path in self.zip_path_list]
+            organizer = easy_market.learnware_organizer
+            folder_paths = [organizer.learnware_folder_list[learnware_id] for learnware_id in learnware_ids]
+            for folder_path in folder_paths:
+                assert organizer.folder_cache.is_evicted(folder_path)
+                assert os.path.exists(os.path.join(folder_path, "learnware.yaml"))
+                assert not os.path.exists(os.path.join(folder_path, "model.pkl"))
+
+            X, _ = load_digits(return_X_y=True)
+            learnware = easy_market.get_learnware_by_ids(learnware_ids[0])
+            assert learnware.predict(X[:5]).shape == (5, 10)
+            assert not organizer.folder_cache.is_evicted(folder_paths[0])
+
+            assert easy_market.get_learnware_dir_path_by_ids(learnware_ids[1]) == folder_paths[1]
+            assert os.path.exists(os.path.join(folder_paths[1], "model.pkl"))
+            assert organizer.folder_cache.is_evicted(folder_paths[0])
+
+            # the concurrent users of an evicted folder wait for one extraction
+            extract_zip, extract_num = organizer.blob_store.extract_zip, []
+
+            def counted_extract_zip(*args, **kwargs):
+                extract_num.append(1)
+                time.sleep(0.1)
+                return extract_zip(*args, **kwargs)
+
+            organizer.blob_store.extract_zip = counted_extract_zip
+            learnware = easy_market.get_learnware_by_ids(learnware_ids[2])
+            threads = [threading.Thread(target=learnware.get_dirpath) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            organizer.blob_store.extract_zip = extract_zip
+            assert len(extract_num) == 1
+            assert os.path.exists(os.path.join(folder_paths[2], "model.pkl"))
+
+            reloaded_market = instantiate_learnware_market(market_id="sklearn_digits_easy", name="easy", rebuild=False)
+            assert sorted(reloaded_market.get_learnware_ids()) == sorted(learnware_ids)
+            learnware = reloaded_market.get_learnware_by_ids(learnware_ids[1])
+            assert learnware.predict(X[:5]).shape == (5, 10)
+        finally:
+            C.unzipped_learnware_budget = None
+
+    def test_async_market(self, learnware_num=3):
+        easy_market = self._init_learnware_market()
+        self.test_prepare_learnware_randomly(learnware_num)
+        semantic_spec = generate_semantic_spec(
+            name="learnware",
+            description="test_async_market",
+            input_description={
+                "Dimension": 64,
+                "Description": {f"{i}": f"The value in the grid {i // 8}{i % 8}." for i in range(64)},
+            },
+            output_description={
+                "Dimension": 10,
+                "Description": {f"{i}": "The probability for each digit for 0 to 9." for i in range(10)},
+            },
+            **self.universal_semantic_config,
+        )
+        user_info = BaseUserInfo(semantic_spec=generate_semantic_spec(name="learnware"))
+
+        async def run():
+            async with AsyncLearnwareMarket(easy_market, max_searches=2, max_writes=2) as async_market:
+                add_results = await asyncio.gather(
+                    *[async_market.add_learnware(zip_path, semantic_spec) for zip_path in self.zip_path_list]
+                )
+                assert all(check_status == BaseChecker.USABLE_LEARNWARE for _, check_status in add_results)
+                learnware_ids = [learnware_id for learnware_id, _ in add_results]
+                assert sorted(await async_market.get_learnware_ids()) == sorted(learnware_ids)
+
+                search_results = await asyncio.gather(*[async_market.search_learnware(user_info) for _ in range(4)])
+                assert all(len(result.get_single_results()) == learnware_num for result in search_results)
+
+                new_semantic_spec = dict(semantic_spec)
+                new_semantic_spec["Name"] = {"Values": "updated_learnware", "Type": "String"}
+                check_status = await async_market.update_learnware(learnware_ids[0], semantic_spec=new_semantic_spec)
+                assert check_status == BaseChecker.USABLE_LEARNWARE
+                learnware = await async_market.get_learnware_by_ids(learnware_ids[0])
+                assert learnware.get_specification().get_semantic_spec()["Name"]["Values"] == "updated_learnware"
+
+                # the learnware is not added when the call is cancelled before the organizer stage
+                add_task = asyncio.create_task(async_market.add_learnware(self.zip_path_list[0], semantic_spec))
+                await asyncio.sleep(0)
+                add_task.cancel()
+                try:
+                    await add_task
+                except asyncio.CancelledError:
+                    pass
+                assert sorted(await async_market.get_learnware_ids()) == sorted(learnware_ids)
+
+                assert await async_market.delete_learnware(learnware_ids[-1])
+                return learnware_ids[:-1]
+
+        expected_ids = asyncio.run(run())
+        assert sorted(easy_market.get_learnware_ids()) == sorted(expected_ids)
+
+        # the facade built outside the event loop is shared by the contending calls of several loops
+        async_market = AsyncLearnwareMarket(easy_market, max_searches=1)
+
+        async def search():
+            searches = asyncio.gather(*[async_market.search_learnware(user_info) for _ in range(4)])
+            return await asyncio.wait_for(searches, timeout=60)
+
+        try:
+            for _ in range(2):
+                search_results = asyncio.run(search())
+                assert all(len(result.get_single_results()) == len(expected_ids) for result in search_results)
+        finally:
+            async_market.close()
+
     def test_search_semantics(self, learnware_num=5):
         easy_market = self.test_upload_delete_learnware(learnware_num, delete=False)
         print("Total Item:", len(easy_market))
@@ -206,6 +642,14 @@ def suite():
     _suite = unittest.TestSuite()
     # _suite.addTest(TestWorkflow("test_prepare_learnware_randomly"))
     # _suite.addTest(TestWorkflow("test_upload_delete_learnware"))
+    _suite.addTest(TestWorkflow("test_add_learnwares_in_bulk"))
+    _suite.addTest(TestWorkflow("test_submit_learnwares"))
+    _suite.addTest(TestWorkflow("test_check_result_cache"))
+    _suite.addTest(TestWorkflow("test_checker_pipeline"))
+    _suite.addTest(TestWorkflow("test_concurrent_add_and_search"))
+    _suite.addTest(TestWorkflow("test_async_market"))
+    _suite.addTest(TestWorkflow("test_learnware_blob_store"))
+    _suite.addTest(TestWorkflow("test_unzipped_learnware_budget"))
     _suite.addTest(TestWorkflow("test_search_semantics"))
     _suite.addTest(TestWorkflow("test_stat_search"))
     _suite.addTest(TestWorkflow("test_learnware_reuse"))